@@ -66,7 +66,7 @@ def debug_assessment_data():
     # Check audit criteria scores by criteria
     print("9. Audit Criteria Scores by Criteria:")
     for criteria in audit_criteria:
-        scores = audit_criteria_scores.filter(criteria_name=criteria.name)
+        scores = audit_criteria_scores.filter(criterion__name=criteria.name)
         count = scores.count()
         avg_score = scores.aggregate(avg=Avg('score'))['avg'] if count > 0 else 0
         print(f"   - {criteria.name}: {count} scores, avg: {avg_score:.1f}")
@@ -1,6 +1,19 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
-from .models import User, PendingUser, Facility, StaffMember, StaffQualification, AssessmentCriteria, Indicator, Patient, Assessment, IndicatorScore, Audit, AuditCriteria, Report, MetricSnapshot, Feedback, FeedbackComment
+from .models import User, PendingUser, Facility, StaffMember, StaffQualification, AssessmentCriteria, Indicator, Patient, Assessment, IndicatorScore, Audit, AuditCriteria, AuditCriterionName, Report, MetricSnapshot, Feedback, FeedbackComment, SlowQuery
+from .signals import touch_parents
+
+
+class ChildRowAdmin(admin.ModelAdmin):
+    """Admin for the child models in signals.TOUCH_PARENT: deletes bump the parent's updated_at."""
+
+    def delete_model(self, request, obj):
+        touch_parents(type(obj), type(obj)._default_manager.filter(pk=obj.pk))
+        super().delete_model(request, obj)
+
+    def delete_queryset(self, request, queryset):
+        touch_parents(queryset.model, queryset)
+        super().delete_queryset(request, queryset)
 
 # Register User model with custom admin interface
 @admin.register(User)
@@ -43,7 +56,7 @@ class StaffMemberAdmin(admin.ModelAdmin):
     search_fields = ('name', 'id', 'email')
 
 # Register StaffQualification
-admin.site.register(StaffQualification)
+admin.site.register(StaffQualification, ChildRowAdmin)
 
 # Register AssessmentCriteria
 @admin.register(AssessmentCriteria)
@@ -54,7 +67,7 @@ class AssessmentCriteriaAdmin(admin.ModelAdmin):
 
 # Register Indicator
 @admin.register(Indicator)
-class IndicatorAdmin(admin.ModelAdmin):
+class IndicatorAdmin(ChildRowAdmin):
     list_display = ('name', 'criteria', 'weight')
     list_filter = ('criteria',)
     search_fields = ('name',)
@@ -75,7 +88,7 @@ class AssessmentAdmin(admin.ModelAdmin):
     date_hierarchy = 'assessment_date'
 
 # Register IndicatorScore
-admin.site.register(IndicatorScore)
+admin.site.register(IndicatorScore, ChildRowAdmin)
 
 # Register Audit
 @admin.register(Audit)
@@ -86,7 +99,18 @@ class AuditAdmin(admin.ModelAdmin):
     date_hierarchy = 'audit_date'
 
 # Register AuditCriteria
-admin.site.register(AuditCriteria)
+@admin.register(AuditCriteria)
+class AuditCriteriaAdmin(ChildRowAdmin):
+    # __str__ shows the criterion name and audit the facility name; join them instead of a query per row
+    list_display = ('__str__', 'audit', 'score')
+    list_select_related = ('criterion', 'audit__facility')
+    list_filter = ('criterion',)
+    search_fields = ('criterion__name', 'audit__facility__name')
+    raw_id_fields = ('audit',)
+
+@admin.register(AuditCriterionName)
+class AuditCriterionNameAdmin(admin.ModelAdmin):
+    search_fields = ('name',)
 
 # Register Report
 @admin.register(Report)
@@ -110,8 +134,14 @@ class FeedbackAdmin(admin.ModelAdmin):
     readonly_fields = ('created_at', 'updated_at')
 
 @admin.register(FeedbackComment)
-class FeedbackCommentAdmin(admin.ModelAdmin):
+class FeedbackCommentAdmin(ChildRowAdmin):
     list_display = ('feedback', 'added_by', 'created_at')
     list_filter = ('created_at',)
     search_fields = ('comment', 'added_by__username', 'feedback__title')
 
+@admin.register(SlowQuery)
+class SlowQueryAdmin(admin.ModelAdmin):
+    list_display = ('fingerprint', 'count', 'total_ms', 'max_ms', 'last_seen')
+    search_fields = ('fingerprint',)
+    readonly_fields = ('fingerprint_hash', 'fingerprint', 'sample_sql', 'plan', 'origins', 'count', 'total_ms', 'max_ms', 'first_seen', 'last_seen')
+    ordering = ('-total_ms',)
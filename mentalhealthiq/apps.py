@@ -1,7 +1,14 @@
-
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate, pre_migrate
 
 
 class MentalHealthIQConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'mentalhealthiq'
+
+    def ready(self):
+        from . import signals  # noqa: F401
+        from .search import resume_search_triggers, suspend_search_triggers
+
+        pre_migrate.connect(suspend_search_triggers, sender=self)
+        post_migrate.connect(resume_search_triggers, sender=self)
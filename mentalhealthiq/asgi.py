@@ -5,6 +5,9 @@ It exposes the ASGI callable as a module-level variable named ``application``.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.1/howto/deployment/asgi/
+
+Serve with an ASGI server (e.g. ``uvicorn mentalhealthiq.asgi:application``)
+so the /api/events/ server-sent event streams do not tie up worker threads.
 """
 
 import os
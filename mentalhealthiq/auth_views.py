@@ -7,6 +7,7 @@ from django.contrib.auth.hashers import make_password
 from django.views.decorators.csrf import csrf_exempt
 from .models import User, PendingUser
 from .serializers import UserSerializer, PendingUserSerializer
+from .pagination import sub_resource_response
 from django.views.decorators.http import require_http_methods
 from django.http import JsonResponse
 
@@ -255,10 +256,9 @@ def register_view(request):
 @api_view(['GET'])
 @permission_classes([AllowAny])
 def system_users_view(request):
-    """Return list of all system users."""
+    """Return list of all system users (supports ?page=, ?pagination=keyset and ?stream=true)."""
     users = User.objects.all()
-    serializer = UserSerializer(users, many=True)
-    return Response(serializer.data)
+    return sub_resource_response(request, users, UserSerializer, ('-date_joined', '-id'))
 
 @api_view(['POST'])
 @permission_classes([AllowAny])
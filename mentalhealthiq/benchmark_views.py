@@ -19,6 +19,8 @@ from .serializers import (
     BenchmarkComparisonSerializer,
     FacilityRankingSerializer
 )
+from .concurrency import run_concurrently
+from .views import AnalyticsReplicaMixin
 
 class BenchmarkCriteriaViewSet(viewsets.ModelViewSet):
     """
@@ -28,7 +30,7 @@ class BenchmarkCriteriaViewSet(viewsets.ModelViewSet):
     serializer_class = BenchmarkCriteriaSerializer
     permission_classes = [AllowAny]
 
-class BenchmarkComparisonViewSet(viewsets.ModelViewSet):
+class BenchmarkComparisonViewSet(AnalyticsReplicaMixin, viewsets.ModelViewSet):
     """
     ViewSet for comparing facilities based on simplified metrics.
     """
@@ -39,39 +41,44 @@ class BenchmarkComparisonViewSet(viewsets.ModelViewSet):
     @staticmethod
     def _calculate_facility_metrics(facility, start_date):
         """Calculate simplified metrics for a facility."""
-        # Calculate audit scores (90-day window)
         audit_window = start_date - timedelta(days=90)
-        audit_scores = Audit.objects.filter(
-            facility=facility,
-            audit_date__gte=audit_window,
-            status='completed'
-        ).aggregate(
-            avg_score=Avg('overall_score'),
-            count=Count('id')
-        )
-
-        # Calculate patient coverage
-        total_patients = Patient.objects.filter(
-            facility=facility,
-            status='Active'
-        ).count()
-
-        patients_with_assessment = Patient.objects.filter(
-            facility=facility,
-            status='Active',
-            assessments__isnull=False
-        ).distinct().count()
-
-        # Calculate recent assessments (30 days)
         assessment_window = start_date - timedelta(days=30)
-        recent_assessments = Assessment.objects.filter(
-            facility=facility,
-            assessment_date__gte=assessment_window,
-            status='completed'
-        ).aggregate(
-            count=Count('id'),
-            avg_score=Avg('score')
+
+        # The four queries are independent; run them side by side
+        results = run_concurrently(
+            # Calculate audit scores (90-day window)
+            audit_scores=lambda: Audit.objects.filter(
+                facility=facility,
+                audit_date__gte=audit_window,
+                status='completed'
+            ).aggregate(
+                avg_score=Avg('overall_score'),
+                count=Count('id')
+            ),
+            # Calculate patient coverage
+            total_patients=Patient.objects.filter(
+                facility=facility,
+                status='Active'
+            ).count,
+            patients_with_assessment=Patient.objects.filter(
+                facility=facility,
+                status='Active',
+                assessments__isnull=False
+            ).distinct().count,
+            # Calculate recent assessments (30 days)
+            recent_assessments=lambda: Assessment.objects.filter(
+                facility=facility,
+                assessment_date__gte=assessment_window,
+                status='completed'
+            ).aggregate(
+                count=Count('id'),
+                avg_score=Avg('score')
+            ),
         )
+        audit_scores = results['audit_scores']
+        total_patients = results['total_patients']
+        patients_with_assessment = results['patients_with_assessment']
+        recent_assessments = results['recent_assessments']
 
         coverage_percentage = (
             (patients_with_assessment / total_patients * 100)
@@ -139,7 +146,7 @@ class BenchmarkComparisonViewSet(viewsets.ModelViewSet):
             status=status.HTTP_201_CREATED
         )
 
-class FacilityRankingViewSet(viewsets.ModelViewSet):
+class FacilityRankingViewSet(AnalyticsReplicaMixin, viewsets.ModelViewSet):
     """
     ViewSet for managing facility rankings.
     """
@@ -0,0 +1,102 @@
+"""
+Run independent ORM queries at the same time.
+
+Statistics endpoints compute several aggregates that do not depend on each
+other. run_concurrently() sends them to a small shared thread pool so the
+endpoint takes about as long as its slowest query instead of the sum of
+all of them. A thread pool rather than asyncio: Django's async ORM runs
+every query through one thread-sensitive executor, so gathering async
+queries does not overlap them, while database drivers release the GIL
+while a query runs.
+
+Each worker thread keeps its own database connection open between tasks
+(at most AGGREGATE_QUERY_WORKERS of them), since opening one per query would
+cost more than the overlap saves on small aggregates; connections that have
+gone bad are dropped before the next task. Connections from a pool
+(PostgreSQL OPTIONS['pool']) are handed back after every task instead, so
+idle workers do not hold pool slots. Inside a transaction, or on an
+in-memory SQLite database, other connections cannot see the caller's data,
+so the queries run one after another on the caller's connection instead.
+
+Tasks run in a copy of the caller's context, so context variables such as
+the request route used by the slow-query log carry over to the pool, and
+their queries count towards the request's performance record (perf.py).
+"""
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
+import contextvars
+import threading
+
+from django.conf import settings
+from django.db import connection, connections
+
+from . import perf
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=getattr(settings, 'AGGREGATE_QUERY_WORKERS', 4),
+                    thread_name_prefix='aggregate-query',
+                )
+    return _executor
+
+
+def can_use_threads():
+    if connection.in_atomic_block:
+        return False
+    return not (connection.vendor == 'sqlite' and connection.is_in_memory_db())
+
+
+def _run_with_own_connection(func):
+    for conn in connections.all(initialized_only=True):
+        if conn.connection is not None and conn.errors_occurred:
+            if not conn.is_usable():
+                conn.close()
+            conn.errors_occurred = False
+    try:
+        metrics = perf.current_metrics()
+        with ExitStack() as stack:
+            if metrics is not None:
+                for conn in connections.all():
+                    stack.enter_context(conn.execute_wrapper(metrics))
+            return func()
+    finally:
+        for conn in connections.all(initialized_only=True):
+            if conn.settings_dict['OPTIONS'].get('pool'):
+                conn.close()
+
+
+def shutdown():
+    """
+    Stop the pool and let its threads, and their connections, go; the next
+    run_concurrently() starts a new one. Needed when the database settings
+    change under a running process (benchmark_endpoints).
+    """
+    global _executor
+    with _executor_lock:
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown(wait=True)
+
+
+def run_concurrently(**queries):
+    """
+    Call each zero-argument callable, concurrently where possible, and
+    return their results under the same keyword names. The first exception
+    raised by any of them is re-raised.
+    """
+    if len(queries) < 2 or not can_use_threads():
+        return {name: func() for name, func in queries.items()}
+    executor = get_executor()
+    futures = {
+        name: executor.submit(contextvars.copy_context().run, _run_with_own_connection, func)
+        for name, func in queries.items()
+    }
+    return {name: future.result() for name, future in futures.items()}
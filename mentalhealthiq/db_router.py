@@ -0,0 +1,107 @@
+"""
+Read-replica routing for analytics traffic.
+
+Reports, metrics and benchmark views run large aggregates that should not
+compete with clinical writes. Code that only reads opts in with
+``use_replica()`` (a context manager and decorator): inside it, ReplicaRouter
+sends reads to the REPLICA_DATABASE alias. Writes always go to 'default'.
+AnalyticsReplicaMixin (views.py) wraps GET/HEAD/OPTIONS of the analytic
+viewsets, and the analysis management commands wrap their handle().
+
+Read-your-writes:
+
+* Inside one request (or command), the first write pins every later read
+  to 'default', so a report computed right after a save sees the save.
+* ReplicaPinningMiddleware keeps a client on 'default' for
+  REPLICA_PIN_SECONDS after any request that wrote, via a short-lived
+  cookie, which covers replication lag between a POST and the next GET.
+  Clients that do not send cookies only get the in-request pinning.
+
+Without a REPLICA_DATABASE entry in DATABASES everything reads from
+'default'. With SQLite the replica is a second, query-only connection to
+the same file; the database runs in WAL mode so those readers never block
+the writer. The routing state lives in a context variable, so it follows
+queries into run_concurrently() pools.
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+_state = ContextVar('replica_routing', default=None)
+
+
+class RoutingState:
+    """Routing for one request or command; shared by every thread in its context."""
+
+    def __init__(self, pinned=False):
+        self.replica_depth = 0
+        self.pinned = pinned
+        self.wrote = False
+
+
+def replica_alias():
+    """The replica's DATABASES alias, or None if no replica is configured."""
+    alias = getattr(settings, 'REPLICA_DATABASE', 'replica')
+    return alias if alias in settings.DATABASES else None
+
+
+def pin_seconds():
+    return getattr(settings, 'REPLICA_PIN_SECONDS', 5)
+
+
+def start_request(pinned=False):
+    state = RoutingState(pinned)
+    return state, _state.set(state)
+
+
+def finish_request(token):
+    _state.reset(token)
+
+
+@contextmanager
+def use_replica():
+    """Send reads made inside the block to the replica, until something writes."""
+    state = _state.get()
+    token = None
+    if state is None:
+        state, token = start_request()
+    state.replica_depth += 1
+    try:
+        yield state
+    finally:
+        state.replica_depth -= 1
+        if token is not None:
+            finish_request(token)
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        state = _state.get()
+        if state is None:
+            return None
+        if state.pinned:
+            # Also overrides the hint of an instance that was loaded from the replica
+            return DEFAULT_DB_ALIAS
+        if state.replica_depth:
+            return replica_alias()
+        return None
+
+    def db_for_write(self, model, **hints):
+        state = _state.get()
+        if state is not None:
+            state.pinned = state.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {DEFAULT_DB_ALIAS, replica_alias()}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # The replica receives its schema from the primary
+        if db == replica_alias():
+            return False
+        return None
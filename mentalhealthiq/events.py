@@ -0,0 +1,151 @@
+"""
+Live events for dashboards, pushed over server-sent events (/api/events/).
+
+Snapshots and rankings are written by Celery workers and assessments by
+any web process, so events cannot come from in-process signals. Instead
+each server process runs one EventBroker that, while at least one client is
+connected, polls for new rows every ``SSE_POLL_INTERVAL`` seconds and fans
+them out to every subscriber. The database sees one small indexed query per
+table per interval no matter how many dashboards are open:
+
+* ``snapshot``: new MetricSnapshot rows (by id)
+* ``ranking``: new FacilityRanking rows (by id)
+* ``assessment``: assessments whose updated_at moved, with their current
+  status (by (updated_at, id))
+
+Delivery is best effort: a client that reconnects should refetch through
+the REST API rather than expect missed events to be replayed. The stream
+needs an ASGI server (asgi.py, e.g. ``uvicorn mentalhealthiq.asgi:application``);
+under WSGI each open stream would hold a worker thread.
+"""
+import asyncio
+import logging
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+
+from .models import Assessment, FacilityRanking, MetricSnapshot
+from .pagination import seek_filter
+from .serializers import FacilityRankingSerializer, MetricSnapshotSerializer
+
+logger = logging.getLogger(__name__)
+
+EVENT_TYPES = ('snapshot', 'ranking', 'assessment')
+ASSESSMENT_ORDERING = ('updated_at', 'id')
+POLL_BATCH_SIZE = 500
+
+
+def poll_interval():
+    return getattr(settings, 'SSE_POLL_INTERVAL', 2)
+
+
+def heartbeat_interval():
+    return getattr(settings, 'SSE_HEARTBEAT_INTERVAL', 15)
+
+
+def initial_marks():
+    """High-water marks at 'now', so new subscribers only see what happens next."""
+    last_assessment = (Assessment.objects.order_by('-updated_at', '-id')
+                       .values_list(*ASSESSMENT_ORDERING).first())
+    return {
+        'snapshot': MetricSnapshot.objects.order_by('-id').values_list('id', flat=True).first() or 0,
+        'ranking': FacilityRanking.objects.order_by('-id').values_list('id', flat=True).first() or 0,
+        'assessment': list(last_assessment) if last_assessment else None,
+    }
+
+
+def poll_events(marks):
+    """Return (events, new marks) for everything written after ``marks``."""
+    events, marks = [], dict(marks)
+
+    snapshots = list(MetricSnapshot.objects.filter(id__gt=marks['snapshot'])
+                     .select_related('facility').order_by('id')[:POLL_BATCH_SIZE])
+    for snapshot, data in zip(snapshots, MetricSnapshotSerializer(snapshots, many=True).data):
+        events.append({'type': 'snapshot', 'id': f'snapshot-{snapshot.id}',
+                       'facility_id': snapshot.facility_id, 'data': data})
+    if snapshots:
+        marks['snapshot'] = snapshots[-1].id
+
+    rankings = list(FacilityRanking.objects.filter(id__gt=marks['ranking'])
+                    .select_related('facility').order_by('id')[:POLL_BATCH_SIZE])
+    for ranking, data in zip(rankings, FacilityRankingSerializer(rankings, many=True).data):
+        events.append({'type': 'ranking', 'id': f'ranking-{ranking.id}',
+                       'facility_id': ranking.facility_id, 'data': data})
+    if rankings:
+        marks['ranking'] = rankings[-1].id
+
+    assessments = Assessment.objects.all()
+    if marks['assessment']:
+        assessments = assessments.filter(seek_filter(ASSESSMENT_ORDERING, marks['assessment']))
+    assessments = list(assessments.order_by(*ASSESSMENT_ORDERING).values(
+        'id', 'patient_id', 'facility_id', 'status', 'scheduled_date', 'assessment_date', 'updated_at'
+    )[:POLL_BATCH_SIZE])
+    for row in assessments:
+        events.append({'type': 'assessment', 'id': f'assessment-{row["id"]}',
+                       'facility_id': row['facility_id'], 'data': row})
+    if assessments:
+        marks['assessment'] = [assessments[-1]['updated_at'], assessments[-1]['id']]
+
+    return events, marks
+
+
+class Subscription:
+    """One connected client: a bounded queue plus its facility/type filter."""
+    queue_size = 256
+
+    def __init__(self, facility_id=None, types=EVENT_TYPES):
+        self.facility_id = facility_id
+        self.types = set(types)
+        self.queue = asyncio.Queue(maxsize=self.queue_size)
+        self.overflowed = False
+
+    def offer(self, event):
+        if event['type'] not in self.types:
+            return
+        if self.facility_id is not None and event['facility_id'] != self.facility_id:
+            return
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # A client this far behind is told to reload instead of slowing everyone down
+            self.overflowed = True
+
+
+class EventBroker:
+    """Polls for new rows while anyone is subscribed and fans them out."""
+
+    def __init__(self):
+        self.subscribers = set()
+        self.marks = None
+        self.task = None
+
+    def subscribe(self, facility_id=None, types=EVENT_TYPES):
+        subscription = Subscription(facility_id, types)
+        self.subscribers.add(subscription)
+        if self.task is None or self.task.done():
+            self.task = asyncio.get_running_loop().create_task(self.run())
+        return subscription
+
+    def unsubscribe(self, subscription):
+        self.subscribers.discard(subscription)
+
+    async def run(self):
+        try:
+            if self.marks is None:
+                self.marks = await sync_to_async(initial_marks)()
+            while self.subscribers:
+                await asyncio.sleep(poll_interval())
+                try:
+                    events, self.marks = await sync_to_async(poll_events)(self.marks)
+                except Exception:
+                    logger.exception('Polling for live events failed')
+                    continue
+                for event in events:
+                    for subscription in list(self.subscribers):
+                        subscription.offer(event)
+        finally:
+            # Nobody is listening; the next subscriber starts from 'now'
+            self.marks = None
+
+
+broker = EventBroker()
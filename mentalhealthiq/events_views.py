@@ -0,0 +1,65 @@
+import asyncio
+
+from django.http import JsonResponse, StreamingHttpResponse
+from django.utils import timezone
+from django.views.decorators.http import require_GET
+
+from .events import EVENT_TYPES, broker, heartbeat_interval
+from .renderers import json_dumps
+
+
+def format_event(event_type, data, event_id=None):
+    """Encode one server-sent event."""
+    lines = [f'event: {event_type}']
+    if event_id:
+        lines.append(f'id: {event_id}')
+    lines.append(f'data: {json_dumps(data).decode("utf-8")}')
+    return ('\n'.join(lines) + '\n\n').encode('utf-8')
+
+
+@require_GET
+async def live_events_view(request):
+    """
+    Server-sent event stream of new metric snapshots, ranking updates and
+    assessment changes.
+
+    Query params: facility (only events for that facility) and types (comma
+    separated subset of snapshot, ranking, assessment). Serve through asgi.py.
+    """
+    types = EVENT_TYPES
+    if request.GET.get('types'):
+        types = [name.strip() for name in request.GET['types'].split(',') if name.strip()]
+        unknown = sorted(set(types) - set(EVENT_TYPES))
+        if unknown:
+            return JsonResponse({
+                'error': f"Unknown types: {', '.join(unknown)}. Valid types: {', '.join(EVENT_TYPES)}"
+            }, status=400)
+    try:
+        facility_id = int(request.GET['facility']) if request.GET.get('facility') else None
+    except ValueError:
+        return JsonResponse({'error': 'facility must be an integer'}, status=400)
+
+    async def stream():
+        subscription = broker.subscribe(facility_id=facility_id, types=types)
+        try:
+            yield b'retry: 3000\n\n'
+            yield format_event('ready', {'facility': facility_id, 'types': list(types),
+                                         'server_time': timezone.now()})
+            while True:
+                try:
+                    event = await asyncio.wait_for(subscription.queue.get(), timeout=heartbeat_interval())
+                except asyncio.TimeoutError:
+                    # Comment line keeps proxies from closing an idle connection
+                    yield b': keep-alive\n\n'
+                    continue
+                if subscription.overflowed:
+                    yield format_event('reset', {'reason': 'Client fell behind; reload the data'})
+                    return
+                yield format_event(event['type'], event['data'], event['id'])
+        finally:
+            broker.unsubscribe(subscription)
+
+    response = StreamingHttpResponse(stream(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
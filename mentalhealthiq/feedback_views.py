@@ -15,12 +15,13 @@ class FeedbackViewSet(BaseViewSet):
     ordering_fields = ['created_at', 'updated_at']
 
     def get_queryset(self):
+        queryset = super().get_queryset().order_by('-created_at')
         user = self.request.user
         if not user.is_authenticated:
-            return Feedback.objects.all().order_by('-created_at')
+            return queryset
         if user.role in ['admin', 'superuser']:
-            return Feedback.objects.all().order_by('-created_at')
-        return Feedback.objects.filter(submitted_by=user).order_by('-created_at')
+            return queryset
+        return queryset.filter(submitted_by=user)
 
     def perform_create(self, serializer):
         if self.request.user.is_authenticated:
@@ -1,7 +1,9 @@
 # mentalhealthiq/filters.py
 import django_filters
 from django.db import models
+from rest_framework import filters as drf_filters
 from .models import Facility, Patient, Assessment, AssessmentCriteria, Audit
+from .search import search_patients
 from django.utils import timezone
 
 class FacilityFilter(django_filters.FilterSet):
@@ -29,12 +31,19 @@ class PatientFilter(django_filters.FilterSet):
         fields = '__all__'
 
     def custom_search(self, queryset, name, value):
-        return queryset.filter(
-            models.Q(first_name__icontains=value) |
-            models.Q(last_name__icontains=value) |
-            models.Q(national_id__icontains=value) |
-            models.Q(facility__name__icontains=value)
-        )
+        return search_patients(queryset, value)
+
+
+class PatientSearchFilter(drf_filters.SearchFilter):
+    """?search= for patients, answered from the full-text index and ranked by relevance"""
+
+    def filter_queryset(self, request, queryset, view):
+        term = ' '.join(self.get_search_terms(request))
+        if not term:
+            return queryset
+        # An explicit ?ordering= wins over relevance
+        rank = not request.query_params.get('ordering')
+        return search_patients(queryset, term, rank=rank)
 
 
 class AssessmentFilter(django_filters.FilterSet):
@@ -0,0 +1,388 @@
+"""
+Scripted load tests against a running server.
+
+Each scenario replays what one screen of the React app requests, in the
+same order and with the same query parameters:
+
+- dashboard: the landing page (StatsOverview): facilities, staff, the first
+  page of patients, twelve months of assessment statistics and the audit
+  statistics.
+- assessment_list: the assessments screen, paging through the list ten rows
+  at a time, newest first, sometimes with a search term.
+- statistics: the assessment and audit trends pages for a random time range.
+- evaluator_submission: an evaluator picks a patient from a facility, opens
+  the evaluation form and submits a completed assessment with its indicator
+  scores through /api/assessments/bulk/. This writes to the database.
+
+run() starts ``users`` virtual users, each on its own thread with its own
+keep-alive HTTP connection. A user repeatedly picks a scenario by weight,
+plays it, and pauses for a think time between scenarios. Every request is
+recorded, and summarize() turns the records into throughput, latency
+percentiles and error rates, overall and per request.
+
+local_server() starts ``manage.py runserver`` on a free local port in a
+subprocess, so a load test needs nothing but this project and its database.
+"""
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+import http.client
+import json
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from urllib.parse import urlencode, urlsplit
+import uuid
+
+from django.conf import settings
+
+from .perf import percentile
+
+SEARCH_TERMS = ('follow', 'review', 'session', 'plan')
+TIME_RANGES = {'3months': 91, '6months': 182, '12months': 365}
+RATINGS = (100, 75, 50, 25, 0)
+
+
+@dataclass
+class Record:
+    scenario: str
+    name: str
+    status: int
+    ms: float
+    size: int
+    error: str = ''
+
+
+class RequestFailed(Exception):
+    """A request in a scenario failed; the rest of the scenario is skipped."""
+
+
+class Session:
+    """One virtual user's keep-alive connection; records every request made on it."""
+
+    def __init__(self, base_url, timeout, records):
+        parts = urlsplit(base_url)
+        self.host = parts.hostname
+        self.port = parts.port or 80
+        self.prefix = parts.path.rstrip('/')
+        self.timeout = timeout
+        self.records = records
+        self.scenario = ''
+        self.connection = None
+
+    def close(self):
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
+
+    def request(self, method, path, name=None, params=None, body=None):
+        """Send one request and return the decoded JSON body; raises RequestFailed on errors."""
+        url = self.prefix + path
+        if params:
+            url += '?' + urlencode(params)
+        headers = {'Accept': 'application/json'}
+        payload = None
+        if body is not None:
+            payload = json.dumps(body).encode()
+            headers['Content-Type'] = 'application/json'
+
+        name = name or f'{method} {path}'
+        start = time.perf_counter()
+        try:
+            if self.connection is None:
+                self.connection = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+            self.connection.request(method, url, body=payload, headers=headers)
+            response = self.connection.getresponse()
+            content = response.read()
+            if response.will_close:
+                self.close()
+        except (OSError, http.client.HTTPException) as e:
+            self.close()
+            error = f'{type(e).__name__}: {e}'
+            self.records.append(Record(self.scenario, name, 0, (time.perf_counter() - start) * 1000, 0, error))
+            raise RequestFailed(f'{name}: {error}') from e
+
+        elapsed = (time.perf_counter() - start) * 1000
+        error = '' if response.status < 400 else f'HTTP {response.status}'
+        self.records.append(Record(self.scenario, name, response.status, elapsed, len(content), error))
+        if error:
+            raise RequestFailed(f'{name}: {error}')
+        try:
+            return json.loads(content) if content else None
+        except ValueError:
+            return None
+
+    def get(self, path, name=None, params=None):
+        return self.request('GET', path, name, params)
+
+    def post(self, path, body, name=None):
+        return self.request('POST', path, name, body=body)
+
+
+def results_of(data):
+    """The rows of a paginated or plain list response."""
+    if isinstance(data, dict):
+        return data.get('results') or []
+    return data or []
+
+
+class Catalog:
+    """Ids the scenarios pick from, discovered through the API before the test starts."""
+
+    def __init__(self, facilities, criteria):
+        self.facilities = facilities
+        self.criteria = criteria
+        self._patients = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def discover(cls, session):
+        facilities = [row['id'] for row in results_of(session.get('/api/facilities/', params={'page_size': 100}))]
+        criteria = [
+            (row['id'], [indicator['id'] for indicator in row.get('indicators') or []])
+            for row in results_of(session.get('/api/assessment-criteria/', params={'page_size': 100}))
+        ]
+        return cls(facilities, [(criteria_id, indicators) for criteria_id, indicators in criteria if indicators])
+
+    def patients(self, session, facility):
+        """Active patients of a facility, fetched the first time a user asks for them."""
+        with self._lock:
+            cached = self._patients.get(facility)
+        if cached is None:
+            data = session.get(f'/api/facilities/{facility}/patients/', 'GET /api/facilities/{id}/patients/',
+                               params={'page': 1, 'page_size': 100})
+            cached = [row['id'] for row in results_of(data) if row.get('status', 'Active') == 'Active']
+            with self._lock:
+                self._patients[facility] = cached
+        return cached
+
+
+def date_range(days):
+    end = date.today()
+    return {'params[startDate]': (end - timedelta(days=days)).isoformat(), 'params[endDate]': end.isoformat()}
+
+
+def dashboard(session, catalog, rng):
+    session.get('/api/facilities/')
+    session.get('/api/staff/')
+    session.get('/api/patients/', 'GET /api/patients/?page', params={'page': 1, 'page_size': 10})
+    session.get('/api/reports/assessment-statistics/', params=date_range(TIME_RANGES['12months']))
+    session.get('/api/reports/audit-statistics/')
+
+
+def assessment_list(session, catalog, rng):
+    params = {'page_size': 10, 'ordering': '-assessment_date'}
+    if rng.random() < 0.2:
+        params['search'] = rng.choice(SEARCH_TERMS)
+    for page in range(1, rng.randint(2, 6) + 1):
+        data = session.get('/api/assessments/', 'GET /api/assessments/?page', params={'page': page, **params})
+        if not (isinstance(data, dict) and data.get('next')):
+            break
+        time.sleep(rng.uniform(0, 0.2))
+
+
+def statistics(session, catalog, rng):
+    params = date_range(TIME_RANGES[rng.choice(list(TIME_RANGES))])
+    session.get('/api/reports/assessment-statistics/', params=params)
+    session.get('/api/reports/audit-statistics/', params=params)
+
+
+def evaluator_submission(session, catalog, rng):
+    if not catalog.facilities or not catalog.criteria:
+        return
+    facility = rng.choice(catalog.facilities)
+    patients = catalog.patients(session, facility)
+    if not patients:
+        return
+    patient = rng.choice(patients)
+    session.get(f'/api/patients/{patient}/', 'GET /api/patients/{id}/')
+    session.get('/api/assessment-criteria/')
+    criteria, indicators = rng.choice(catalog.criteria)
+    scores = [rng.choice(RATINGS) for _ in indicators]
+    session.post('/api/assessments/bulk/', [{
+        'id': str(uuid.UUID(int=rng.getrandbits(128), version=4)),
+        'patient': patient,
+        'facility': facility,
+        'criteria': criteria,
+        'status': 'completed',
+        'assessment_date': datetime.now(dt_timezone.utc).isoformat(),
+        'score': round(sum(scores) / len(scores), 1),
+        'notes': 'Load test submission',
+        'indicator_scores': [
+            {'indicator': indicator, 'score': score} for indicator, score in zip(indicators, scores)
+        ],
+    }])
+
+
+SCENARIOS = {
+    'dashboard': dashboard,
+    'assessment_list': assessment_list,
+    'statistics': statistics,
+    'evaluator_submission': evaluator_submission,
+}
+
+# Relative weights, roughly how often each screen is opened
+DEFAULT_MIX = {'dashboard': 3, 'assessment_list': 4, 'statistics': 2, 'evaluator_submission': 1}
+
+
+def run(base_url, users, duration, mix=None, ramp_up=0, think_time=1.0, seed=0, timeout=30, progress=None):
+    """
+    Play scenarios with ``users`` concurrent virtual users for ``duration``
+    seconds and return the summary (see summarize()).
+
+    Users start evenly spread over ``ramp_up`` seconds and pause between
+    scenarios for a random time averaging ``think_time`` seconds; requests
+    inside a scenario follow each other without a pause, as the app sends
+    them. ``progress`` is called about once a second with the number of
+    requests and errors so far and the elapsed time.
+    """
+    mix = {name: weight for name, weight in (mix or DEFAULT_MIX).items() if weight > 0}
+    names, weights = list(mix), list(mix.values())
+
+    discovery = Session(base_url, timeout, [])
+    catalog = Catalog.discover(discovery)
+    discovery.close()
+
+    records = []
+    iterations = defaultdict(Counter)
+    lock = threading.Lock()
+    start = time.perf_counter()
+    deadline = start + duration
+
+    def virtual_user(index):
+        rng = random.Random(f'{seed}-{index}')
+        user_records = []
+        session = Session(base_url, timeout, user_records)
+        time.sleep(ramp_up * index / max(users, 1))
+        try:
+            while time.perf_counter() < deadline:
+                name = rng.choices(names, weights)[0]
+                session.scenario = name
+                try:
+                    SCENARIOS[name](session, catalog, rng)
+                    outcome = 'completed'
+                except RequestFailed:
+                    outcome = 'failed'
+                with lock:
+                    iterations[name][outcome] += 1
+                    records.extend(user_records)
+                user_records.clear()
+                if think_time:
+                    time.sleep(min(rng.expovariate(1 / think_time), max(0, deadline - time.perf_counter())))
+        finally:
+            session.close()
+
+    threads = [
+        threading.Thread(target=virtual_user, args=(index,), name=f'loadtest-user-{index}', daemon=True)
+        for index in range(users)
+    ]
+    for thread in threads:
+        thread.start()
+    while any(thread.is_alive() for thread in threads):
+        time.sleep(1)
+        if progress is not None:
+            with lock:
+                requests, errors = len(records), sum(1 for record in records if record.error)
+            progress(requests, errors, time.perf_counter() - start)
+    for thread in threads:
+        thread.join()
+    return summarize(records, iterations, time.perf_counter() - start, users)
+
+
+def _latency(durations):
+    durations = sorted(durations)
+    if not durations:
+        return {'p50_ms': 0, 'p95_ms': 0, 'p99_ms': 0, 'max_ms': 0}
+    return {
+        'p50_ms': round(percentile(durations, 0.50), 1),
+        'p95_ms': round(percentile(durations, 0.95), 1),
+        'p99_ms': round(percentile(durations, 0.99), 1),
+        'max_ms': round(durations[-1], 1),
+    }
+
+
+def summarize(records, iterations, elapsed, users):
+    """Throughput, latency percentiles and error rates, overall and per request name."""
+    by_name = defaultdict(list)
+    for record in records:
+        by_name[record.name].append(record)
+    errors = [record for record in records if record.error]
+
+    requests = {}
+    for name, rows in sorted(by_name.items()):
+        failed = sum(1 for row in rows if row.error)
+        requests[name] = {
+            'count': len(rows),
+            'rps': round(len(rows) / elapsed, 2),
+            'errors': failed,
+            'error_rate': round(failed / len(rows), 4),
+            **_latency([row.ms for row in rows if not row.error]),
+            'avg_bytes': round(sum(row.size for row in rows) / len(rows)),
+        }
+
+    return {
+        'users': users,
+        'duration_s': round(elapsed, 1),
+        'requests': len(records),
+        'rps': round(len(records) / elapsed, 2) if elapsed else 0,
+        'errors': len(errors),
+        'error_rate': round(len(errors) / len(records), 4) if records else 0,
+        **_latency([record.ms for record in records if not record.error]),
+        'scenarios': {
+            name: {
+                'iterations': sum(counts.values()),
+                'failed': counts['failed'],
+                'per_minute': round(sum(counts.values()) * 60 / elapsed, 1),
+            }
+            for name, counts in sorted(iterations.items())
+        },
+        'by_request': requests,
+        'error_samples': dict(Counter(f'{record.name}: {record.error}' for record in errors).most_common(10)),
+    }
+
+
+def free_port(host='127.0.0.1'):
+    with socket.socket() as sock:
+        sock.bind((host, 0))
+        return sock.getsockname()[1]
+
+
+@contextmanager
+def local_server(host='127.0.0.1', port=None, startup_timeout=60):
+    """
+    Run ``manage.py runserver`` (threaded, no autoreload) in a subprocess with
+    this process's settings and yield its base URL; the server is stopped on exit.
+    """
+    port = port or free_port(host)
+    log = tempfile.TemporaryFile()
+    server = subprocess.Popen(
+        [sys.executable, str(settings.BASE_DIR / 'manage.py'), 'runserver', '--noreload', f'{host}:{port}'],
+        stdout=log, stderr=subprocess.STDOUT,
+    )
+    try:
+        deadline = time.monotonic() + startup_timeout
+        while True:
+            if server.poll() is not None:
+                log.seek(0)
+                raise RuntimeError('Server exited during startup:\n' + log.read().decode(errors='replace'))
+            try:
+                socket.create_connection((host, port), timeout=1).close()
+                break
+            except OSError:
+                if time.monotonic() > deadline:
+                    raise RuntimeError(f'Server did not accept connections within {startup_timeout}s')
+                time.sleep(0.2)
+        yield f'http://{host}:{port}'
+    finally:
+        server.terminate()
+        try:
+            server.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            server.kill()
+            server.wait()
+        log.close()
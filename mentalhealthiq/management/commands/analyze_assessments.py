@@ -1,110 +1,235 @@
-from django.core.management.base import BaseCommand
-from django.utils import timezone
-from django.db.models import Count, Q, Avg
-from mentalhealthiq.models import Assessment, Facility
+import json
+from collections import Counter, defaultdict
 from datetime import timedelta
 
+from django.core.management.base import BaseCommand, CommandError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Case, Count, IntegerField, Sum, Value, When
+from django.db.models.functions import ExtractHour
+from django.utils import timezone
+from mentalhealthiq.db_router import use_replica
+from mentalhealthiq.models import Assessment, Facility, MetricSnapshot
+
+HOURS_WINDOW_DAYS = 90
+
+
+def time_windows(current_time):
+    """(name, start, days) per window; days is None where no daily average or trend is shown."""
+    return [
+        ('today', current_time.replace(hour=0, minute=0, second=0, microsecond=0), None),
+        ('last_7_days', current_time - timedelta(days=7), 7),
+        ('last_30_days', current_time - timedelta(days=30), 30),
+        ('last_90_days', current_time - timedelta(days=90), 90),
+        ('all_time', None, None),
+    ]
+
+
+def midpoint(start, end):
+    return start + (end - start) / 2
+
+
+class WindowScan:
+    """
+    Every window's figures from one pass over the assessments.
+
+    The window starts and half-window midpoints cut the timeline into
+    segments, and a single CASE expression puts each assessment in its
+    segment. The scan groups by segment and status (and facility, for
+    per-facility results), so each row is classified once instead of being
+    tested against a filter per statistic; windows and trend halves are
+    then sums of consecutive segments. The hour of day is only extracted
+    for assessments in the last HOURS_WINDOW_DAYS days, with the portable
+    ExtractHour in the current time zone.
+    """
+
+    def __init__(self, current_time):
+        self.current_time = current_time
+        self.windows = time_windows(current_time)
+        bounds = set()
+        for _name, start, days in self.windows:
+            if start:
+                bounds.add(start)
+            if days:
+                bounds.add(midpoint(start, current_time))
+        # Segment i + 1 starts at bounds[i]; segment 0 is everything older
+        self.bounds = sorted(bounds)
+        self.hours_start = current_time - timedelta(days=HOURS_WINDOW_DAYS)
+
+    def segment(self, moment):
+        return self.bounds.index(moment) + 1
+
+    def rows(self, assessments, group_by=()):
+        # Oldest first: most rows predate every bound and stop at the first test
+        segment = Case(
+            *[When(scheduled_date__lt=bound, then=Value(index)) for index, bound in enumerate(self.bounds)],
+            default=Value(len(self.bounds)),
+            output_field=IntegerField(),
+        )
+        hour = Case(
+            When(scheduled_date__gte=self.hours_start, then=ExtractHour('scheduled_date')),
+            default=None,
+            output_field=IntegerField(),
+        )
+        return assessments.filter(scheduled_date__lte=self.current_time).annotate(
+            segment=segment, hour=hour,
+        ).values(*group_by, 'segment', 'status', 'hour').annotate(
+            count=Count('id'), score_sum=Sum('score'),
+        ).order_by()
+
+    @staticmethod
+    def tally(rows):
+        tally = {'counts': defaultdict(Counter), 'scores': Counter(), 'hours': Counter()}
+        for row in rows:
+            tally['counts'][row['segment']][row['status']] += row['count']
+            if row['status'] == 'completed':
+                tally['scores'][row['segment']] += row['score_sum'] or 0
+            if row['hour'] is not None:
+                tally['hours'][row['hour']] += row['count']
+        return tally
+
+    def report(self, tally):
+        counts, scores = tally['counts'], tally['scores']
+
+        def total(first, last=None):
+            """Status counts and completed score sum over segments first..last."""
+            statuses, score_sum = Counter(), 0
+            for segment in range(first, (len(self.bounds) if last is None else last) + 1):
+                statuses.update(counts.get(segment, {}))
+                score_sum += scores.get(segment, 0)
+            return statuses, score_sum
+
+        windows = {}
+        for name, start, days in self.windows:
+            first = self.segment(start) if start else 0
+            statuses, score_sum = total(first)
+            count = sum(statuses.values())
+            completed = statuses['completed']
+            window = {
+                'start': start,
+                'end': self.current_time,
+                'total': count,
+                'completed': completed,
+                'missed': statuses['missed'],
+                'scheduled': statuses['scheduled'],
+                'completion_rate': completed / count * 100 if count else 0,
+                'average_score': score_sum / completed if completed else 0,
+            }
+            if days:
+                middle = self.segment(midpoint(start, self.current_time))
+                first_half = sum(total(first, middle - 1)[0].values())
+                second_half = sum(total(middle)[0].values())
+                window['daily_average'] = count / days
+                window['trend'] = {
+                    'direction': ('Increasing' if second_half > first_half
+                                  else 'Decreasing' if second_half < first_half else 'Stable'),
+                    'first_half': first_half,
+                    'second_half': second_half,
+                }
+            windows[name] = window
+        return {
+            'windows': windows,
+            'hour_distribution': [
+                {'hour': hour, 'count': tally['hours'][hour]} for hour in sorted(tally['hours'])
+            ],
+        }
+
+
 class Command(BaseCommand):
     help = 'Analyze assessment completion rates across different time windows'
 
     def add_arguments(self, parser):
-        parser.add_argument(
+        scope = parser.add_mutually_exclusive_group()
+        scope.add_argument(
             '--facility',
             type=str,
             help='Facility ID to analyze (optional)',
         )
+        scope.add_argument(
+            '--all-facilities',
+            action='store_true',
+            help='Analyze every facility separately, in the same pass over the assessments',
+        )
+        parser.add_argument(
+            '--json',
+            action='store_true',
+            help='Print the analysis as JSON',
+        )
 
+    @use_replica()
     def handle(self, *args, **options):
         current_time = timezone.now()
         facility_id = options.get('facility')
+        facility = None
 
         # Base queryset
         assessments = Assessment.objects.all()
         if facility_id:
             try:
                 facility = Facility.objects.get(id=facility_id)
-                assessments = assessments.filter(facility=facility)
-                self.stdout.write(f"\nAnalyzing assessments for facility: {facility.name}\n")
-            except Facility.DoesNotExist:
-                self.stdout.write(self.style.ERROR(f"Facility with ID {facility_id} not found"))
-                return
-
-        # Time windows to analyze
-        windows = {
-            'today': (current_time.replace(hour=0, minute=0, second=0, microsecond=0), current_time),
-            'last_7_days': (current_time - timedelta(days=7), current_time),
-            'last_30_days': (current_time - timedelta(days=30), current_time),
-            'last_90_days': (current_time - timedelta(days=90), current_time),
-            'all_time': (None, current_time)
-        }
-
+            except (Facility.DoesNotExist, ValueError):
+                raise CommandError(f"Facility with ID {facility_id} not found")
+            assessments = assessments.filter(facility=facility)
+
+        scan = WindowScan(current_time)
+        if options['all_facilities']:
+            rows = list(scan.rows(assessments, group_by=('facility_id',)))
+            report = scan.report(scan.tally(rows))
+            by_facility = defaultdict(list)
+            for row in rows:
+                by_facility[row['facility_id']].append(row)
+            names = dict(Facility.objects.filter(id__in=by_facility).values_list('id', 'name'))
+            report['facilities'] = [
+                {'id': facility_id, 'name': names.get(facility_id),
+                 **scan.report(scan.tally(by_facility[facility_id]))}
+                for facility_id in sorted(by_facility)
+            ]
+        else:
+            report = scan.report(scan.tally(scan.rows(assessments)))
+
+        if facility is not None:
+            latest = MetricSnapshot.objects.filter(facility=facility).order_by('-timestamp').first()
+            report['facility'] = {
+                'id': facility.id,
+                'name': facility.name,
+                'capacity_utilization': latest.capacity_utilization if latest else None,
+            }
+
+        if options['json']:
+            self.stdout.write(json.dumps({'generated_at': current_time, **report}, cls=DjangoJSONEncoder, indent=2))
+            return
+
+        if facility is not None:
+            self.stdout.write(f"\nAnalyzing assessments for facility: {facility.name}\n")
         self.stdout.write("\n=== Assessment Completion Analysis ===\n")
+        self.write_windows(report['windows'])
+        if facility is not None:
+            self.stdout.write("\n=== Facility-Specific Insights ===")
+            if report['facility']['capacity_utilization'] is not None:
+                self.stdout.write(f"Current Capacity Utilization: {report['facility']['capacity_utilization']:.1f}%")
+        self.write_hours(report['hour_distribution'])
+
+        for entry in report.get('facilities', []):
+            self.stdout.write(f"\n\n=== Facility {entry['id']}: {entry['name']} ===")
+            self.write_windows(entry['windows'])
+            self.write_hours(entry['hour_distribution'])
 
-        for window_name, (start_date, end_date) in windows.items():
-            # Base query for this time window
-            window_query = assessments
-            if start_date:
-                window_query = window_query.filter(scheduled_date__range=(start_date, end_date))
-            else:
-                window_query = window_query.filter(scheduled_date__lte=end_date)
-
-            # Get counts
-            total_count = window_query.count()
-            completed_count = window_query.filter(status='completed').count()
-            missed_count = window_query.filter(status='missed').count()
-            scheduled_count = window_query.filter(status='scheduled').count()
-
-            # Calculate completion rate
-            completion_rate = (completed_count / total_count * 100) if total_count > 0 else 0
-
-            # Calculate average score for completed assessments
-            avg_score = window_query.filter(status='completed').aggregate(
-                avg_score=Avg('score')
-            )['avg_score'] or 0
-
-            # Output statistics
+    def write_windows(self, windows):
+        for window_name, window in windows.items():
             self.stdout.write(f"\n{window_name.replace('_', ' ').title()}:")
-            self.stdout.write(f"Total Assessments: {total_count}")
-            self.stdout.write(f"Completed: {completed_count}")
-            self.stdout.write(f"Missed: {missed_count}")
-            self.stdout.write(f"Scheduled: {scheduled_count}")
-            self.stdout.write(f"Completion Rate: {completion_rate:.1f}%")
-            self.stdout.write(f"Average Score: {avg_score:.1f}")
-
-            # Additional insights
-            if window_name != 'today':
-                # Calculate daily average
-                days = 7 if window_name == 'last_7_days' else 30 if window_name == 'last_30_days' else 90 if window_name == 'last_90_days' else None
-                if days:
-                    daily_avg = total_count / days
-                    self.stdout.write(f"Daily Average: {daily_avg:.1f} assessments")
-
-                # Trend analysis (comparing first half to second half)
-                if start_date:
-                    mid_date = start_date + (end_date - start_date) / 2
-                    first_half = window_query.filter(scheduled_date__lt=mid_date).count()
-                    second_half = window_query.filter(scheduled_date__gte=mid_date).count()
-                    trend = "Increasing" if second_half > first_half else "Decreasing" if second_half < first_half else "Stable"
-                    self.stdout.write(f"Trend: {trend} ({first_half} vs {second_half})")
-
-        # Facility-specific insights if analyzing a single facility
-        if facility_id:
-            self.stdout.write("\n=== Facility-Specific Insights ===")
-            capacity_util = facility.capacity_utilization if hasattr(facility, 'capacity_utilization') else None
-            if capacity_util is not None:
-                self.stdout.write(f"Current Capacity Utilization: {capacity_util:.1f}%")
-
-            # Get assessment distribution by hour of day (last 90 days)
-            hour_distribution = assessments.filter(
-                scheduled_date__range=(current_time - timedelta(days=90), current_time)
-            ).extra(
-                select={'hour': "EXTRACT(hour FROM scheduled_date)"}
-            ).values('hour').annotate(count=Count('id')).order_by('hour')
-
-            if hour_distribution:
-                self.stdout.write("\nAssessment Distribution by Hour (Last 90 Days):")
-                for item in hour_distribution:
-                    hour = item['hour']
-                    count = item['count']
-                    self.stdout.write(f"{hour:02d}:00 - {hour:02d}:59: {count} assessments") 
- 
\ No newline at end of file
+            self.stdout.write(f"Total Assessments: {window['total']}")
+            self.stdout.write(f"Completed: {window['completed']}")
+            self.stdout.write(f"Missed: {window['missed']}")
+            self.stdout.write(f"Scheduled: {window['scheduled']}")
+            self.stdout.write(f"Completion Rate: {window['completion_rate']:.1f}%")
+            self.stdout.write(f"Average Score: {window['average_score']:.1f}")
+            if 'daily_average' in window:
+                self.stdout.write(f"Daily Average: {window['daily_average']:.1f} assessments")
+                trend = window['trend']
+                self.stdout.write(f"Trend: {trend['direction']} ({trend['first_half']} vs {trend['second_half']})")
+
+    def write_hours(self, hours):
+        if hours:
+            self.stdout.write(f"\nAssessment Distribution by Hour (Last {HOURS_WINDOW_DAYS} Days):")
+            for item in hours:
+                hour = item['hour']
+                self.stdout.write(f"{hour:02d}:00 - {hour:02d}:59: {item['count']} assessments")
@@ -0,0 +1,262 @@
+import json
+import logging
+import os
+import tempfile
+import time
+import tracemalloc
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connection, connections
+from django.test import Client
+from django.test.utils import override_settings, setup_databases, teardown_databases
+from django.utils import timezone
+
+from mentalhealthiq import concurrency, perf
+from mentalhealthiq.models import Assessment, Audit, BenchmarkComparison, Facility, FacilityRanking, Patient
+from mentalhealthiq.synthetic import (
+    ASSESSMENTS_PER_PATIENT, PER_FACILITY, PER_SCALE, clear_data, generate, search_indexes_suspended,
+)
+from mentalhealthiq.urls import router
+
+# Detail actions whose pk is not one of the viewset's own objects
+ACTION_OBJECTS = {
+    ('metrics', 'detailed'): Facility.objects.all(),
+    ('metrics', 'history'): Facility.objects.all(),
+}
+
+# The write actions worth timing, with their request bodies; other POST
+# actions are bulk edits that would change the dataset under the benchmark
+POST_ACTIONS = {
+    ('facility-rankings', 'calculate_rankings'): lambda facilities: {},
+    ('benchmark-comparisons', 'compare_facilities'): lambda facilities: {
+        'facility_a': facilities[0], 'facility_b': facilities[-1],
+    },
+}
+
+
+def scale_label(scale):
+    return f'{scale:g}'.replace('.', '_')
+
+
+def endpoints():
+    """
+    (name, method, path, body, queryset) for every router endpoint. Detail
+    paths contain {pk}, filled in per dataset from the first row of queryset.
+    """
+    reads, writes = [], []
+    for prefix, viewset, _basename in router.registry:
+        reads.append((f'GET /api/{prefix}/', 'get', f'/api/{prefix}/', None, None))
+        objects = viewset.queryset
+        reads.append((f'GET /api/{prefix}/{{pk}}/', 'get', f'/api/{prefix}/{{pk}}/', None, objects))
+        for action in viewset.get_extra_actions():
+            path = f'/api/{prefix}/{{pk}}/{action.url_path}/' if action.detail else f'/api/{prefix}/{action.url_path}/'
+            if 'get' in action.mapping:
+                target = ACTION_OBJECTS.get((prefix, action.url_path), objects) if action.detail else None
+                reads.append((f'GET {path}', 'get', path, None, target))
+            if (prefix, action.url_path) in POST_ACTIONS:
+                writes.append((f'POST {path}', 'post', path, POST_ACTIONS[(prefix, action.url_path)], None))
+    return reads + writes
+
+
+class Command(BaseCommand):
+    help = ('Build synthetic databases at several scale factors and time every router endpoint '
+            '(latency percentiles, queries, peak memory); optionally compare against a baseline')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scales', default='0.1,1',
+                            help='Comma-separated scale factors (default 0.1,1; see generate_data)')
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--repeat', type=int, default=20, help='Timed requests per endpoint (default 20)')
+        parser.add_argument('--warmup', type=int, default=2, help='Untimed requests per endpoint first')
+        parser.add_argument('--endpoints', help='Only endpoints whose name contains this text')
+        parser.add_argument('--output', help='Write the JSON report to this file')
+        parser.add_argument('--compare', metavar='BASELINE', help='JSON report to compare against; '
+                                                                  'fails when an endpoint regressed')
+        parser.add_argument('--threshold', type=float, default=0.25,
+                            help='Relative p95 latency / memory growth counted as a regression (default 0.25)')
+        parser.add_argument('--min-ms', type=float, default=2.0,
+                            help='Ignore p95 changes smaller than this many ms (timer noise)')
+        parser.add_argument('--data-dir', default=os.path.join(tempfile.gettempdir(), 'mentalhealthiq-benchmarks'),
+                            help='Where SQLite benchmark databases are kept between runs')
+        parser.add_argument('--rebuild', action='store_true', help='Regenerate the datasets even if present')
+        parser.add_argument('--workers', type=int, default=1, help='Processes used to generate datasets')
+
+    def handle(self, *args, **options):
+        try:
+            scales = [float(value) for value in options['scales'].split(',')]
+        except ValueError:
+            raise CommandError('--scales must be comma-separated numbers')
+        baseline = None
+        if options['compare']:
+            with open(options['compare']) as baseline_file:
+                baseline = json.load(baseline_file)
+
+        report = {
+            'generated_at': timezone.now().isoformat(),
+            'vendor': connection.vendor,
+            'seed': options['seed'],
+            'repeat': options['repeat'],
+            'scales': {},
+        }
+        os.makedirs(options['data_dir'], exist_ok=True)
+        for scale in scales:
+            report['scales'][f'{scale:g}'] = self.run_scale(scale, options)
+
+        if options['output']:
+            with open(options['output'], 'w') as output:
+                json.dump(report, output, indent=2)
+            self.stdout.write(f"Report written to {options['output']}")
+
+        if baseline is not None:
+            regressions = self.compare(baseline, report, options['threshold'], options['min_ms'])
+            if regressions:
+                raise CommandError(f'{regressions} endpoint regression(s) against {options["compare"]}')
+            self.stdout.write(self.style.SUCCESS('No regressions against the baseline'))
+
+    def run_scale(self, scale, options):
+        """Point the default database at this scale's dataset, benchmark, and point it back."""
+        default = connections[DEFAULT_DB_ALIAS]
+        if default.vendor == 'sqlite':
+            name = os.path.join(options['data_dir'], f'benchmark_sf{scale_label(scale)}.sqlite3')
+        else:
+            name = f"{settings.DATABASES[DEFAULT_DB_ALIAS]['NAME']}_benchmark_sf{scale_label(scale)}"
+        default.settings_dict['TEST']['NAME'] = name
+        # Pool threads hold connections to whatever database they last used
+        concurrency.shutdown()
+        old_config = setup_databases(verbosity=0, interactive=False, keepdb=True, serialized_aliases=set())
+        try:
+            self.stdout.write(self.style.MIGRATE_HEADING(f'Scale {scale:g} ({name})'))
+            self.ensure_dataset(scale, options)
+            result = {
+                'rows': {
+                    'facilities': Facility.objects.count(),
+                    'patients': Patient.objects.count(),
+                    'assessments': Assessment.objects.count(),
+                    'audits': Audit.objects.count(),
+                },
+                'endpoints': self.run_endpoints(options),
+            }
+        finally:
+            concurrency.shutdown()
+            teardown_databases(old_config, verbosity=0, keepdb=True)
+        return result
+
+    def ensure_dataset(self, scale, options):
+        facilities = max(1, round(PER_SCALE['facilities'] * scale))
+        expected = facilities * PER_FACILITY['patients'] * ASSESSMENTS_PER_PATIENT
+        if not options['rebuild'] and Assessment.objects.count() == expected:
+            return
+        self.stdout.write(f'  Generating {expected} assessments...')
+        start = time.perf_counter()
+        with search_indexes_suspended():
+            clear_data()
+            generate(scale=scale, seed=options['seed'], workers=max(1, options['workers']))
+        self.stdout.write(f'  Dataset ready in {time.perf_counter() - start:.1f}s')
+
+    def run_endpoints(self, options):
+        facilities = list(Facility.objects.order_by('pk').values_list('pk', flat=True)[:2])
+        started = timezone.now()
+        results = {}
+        hosts = [*settings.ALLOWED_HOSTS, 'testserver']
+        # Error statuses are in the report; don't log every repetition
+        request_logger = logging.getLogger('django.request')
+        level = request_logger.level
+        request_logger.setLevel(logging.CRITICAL)
+        try:
+            with override_settings(PERF_MONITORING=True, ALLOWED_HOSTS=hosts):
+                client = Client()
+                for name, method, path, body, target in endpoints():
+                    if options['endpoints'] and options['endpoints'] not in name:
+                        continue
+                    if target is not None:
+                        pk = target.order_by('pk').values_list('pk', flat=True).first()
+                        if pk is None:
+                            continue
+                        path = path.format(pk=pk)
+                    data = body(facilities) if body else None
+                    results[name] = self.measure(client, method, path, data, options)
+                    self.write_result(name, results[name])
+        finally:
+            request_logger.setLevel(level)
+            # Leave the dataset as generated for the next run
+            BenchmarkComparison.objects.filter(created_at__gte=started).delete()
+            FacilityRanking.objects.filter(created_at__gte=started).delete()
+        return results
+
+    def request(self, client, method, path, data):
+        if method == 'post':
+            response = client.post(path, data, content_type='application/json')
+        else:
+            response = client.get(path)
+        # Streaming responses do their work while being consumed
+        body = b''.join(response.streaming_content) if response.streaming else response.content
+        return response, len(body)
+
+    def measure(self, client, method, path, data, options):
+        for _ in range(options['warmup']):
+            self.request(client, method, path, data)
+
+        durations, queries, db_ms = [], [], []
+        for _ in range(options['repeat']):
+            start = time.perf_counter()
+            response, size = self.request(client, method, path, data)
+            durations.append((time.perf_counter() - start) * 1000)
+            record = perf.get_buffer()[-1]
+            queries.append(record['queries'])
+            db_ms.append(record['db_ms'])
+
+        # Peak Python heap for one request, measured apart: tracing slows everything down
+        tracemalloc.start()
+        try:
+            self.request(client, method, path, data)
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+        durations.sort()
+        return {
+            'path': path,
+            'status': response.status_code,
+            'p50_ms': round(perf.percentile(durations, 0.50), 2),
+            'p95_ms': round(perf.percentile(durations, 0.95), 2),
+            'p99_ms': round(perf.percentile(durations, 0.99), 2),
+            'max_ms': round(durations[-1], 2),
+            'queries': max(queries),
+            'db_ms': round(sum(db_ms) / len(db_ms), 2),
+            'bytes': size,
+            'peak_kib': round(peak / 1024, 1),
+        }
+
+    def write_result(self, name, result):
+        style = self.style.ERROR if result['status'] >= 500 else (lambda text: text)
+        self.stdout.write(style(
+            f"  {name:<62} {result['status']:>3}  p50 {result['p50_ms']:8.2f}  p95 {result['p95_ms']:8.2f} ms  "
+            f"{result['queries']:>4} q  {result['bytes'] / 1024:8.1f} KiB  peak {result['peak_kib']:9.1f} KiB"
+        ))
+
+    def compare(self, baseline, report, threshold, min_ms):
+        regressions = 0
+        self.stdout.write(self.style.MIGRATE_HEADING('Comparison with baseline'))
+        for scale, current in report['scales'].items():
+            base_scale = baseline.get('scales', {}).get(scale)
+            if base_scale is None:
+                self.stdout.write(self.style.WARNING(f'  Scale {scale}: not in the baseline'))
+                continue
+            for name, result in current['endpoints'].items():
+                base = base_scale['endpoints'].get(name)
+                if base is None:
+                    continue
+                problems = []
+                if result['p95_ms'] > base['p95_ms'] * (1 + threshold) and result['p95_ms'] - base['p95_ms'] > min_ms:
+                    problems.append(f"p95 {base['p95_ms']:.1f} -> {result['p95_ms']:.1f} ms")
+                if result['queries'] > base['queries']:
+                    problems.append(f"queries {base['queries']} -> {result['queries']}")
+                if result['peak_kib'] > base['peak_kib'] * (1 + threshold) and result['peak_kib'] - base['peak_kib'] > 64:
+                    problems.append(f"peak {base['peak_kib']:.0f} -> {result['peak_kib']:.0f} KiB")
+                if result['status'] != base['status']:
+                    problems.append(f"status {base['status']} -> {result['status']}")
+                if problems:
+                    regressions += 1
+                    self.stdout.write(self.style.ERROR(f"  [{scale}] {name}: {'; '.join(problems)}"))
+        return regressions
@@ -0,0 +1,74 @@
+import time
+import uuid
+from decimal import Decimal
+from itertools import cycle, islice
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+
+from mentalhealthiq.models import Assessment
+from mentalhealthiq.renderers import FastJSONRenderer, MessagePackRenderer, msgpack, orjson
+from mentalhealthiq.serializers import AssessmentSerializer
+
+class Command(BaseCommand):
+    help = 'Compare serialization throughput of the stock JSON renderer and the fast renderers'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=2000, help='Rows per rendered payload')
+        parser.add_argument('--repeat', type=int, default=20, help='Renders per renderer')
+
+    def handle(self, *args, **options):
+        rows, repeat = options['rows'], options['repeat']
+        payloads = {
+            'assessment list': self.assessment_payload(rows),
+            'raw python values': self.raw_payload(rows),
+        }
+
+        renderers = [('JSONRenderer (stdlib)', JSONRenderer())]
+        renderers.append(('FastJSONRenderer' + ('' if orjson else ' (no orjson: stdlib)'), FastJSONRenderer()))
+        if msgpack is not None:
+            renderers.append(('MessagePackRenderer', MessagePackRenderer()))
+        else:
+            self.stdout.write(self.style.WARNING('msgpack is not installed; skipping MessagePackRenderer'))
+
+        for name, data in payloads.items():
+            self.stdout.write(self.style.MIGRATE_HEADING(f'{name}: {len(data["results"])} rows x {repeat} renders'))
+            baseline = None
+            for label, renderer in renderers:
+                renderer.render(data, renderer.media_type, {})
+                start = time.perf_counter()
+                for _ in range(repeat):
+                    output = renderer.render(data, renderer.media_type, {})
+                elapsed = (time.perf_counter() - start) / repeat
+                baseline = baseline or elapsed
+                self.stdout.write(
+                    f'  {label:<32} {elapsed * 1000:8.2f} ms/render  '
+                    f'{len(output) / elapsed / 1e6:8.1f} MB/s  '
+                    f'{len(data["results"]) / elapsed:10.0f} rows/s  '
+                    f'{len(output) / 1024:8.1f} KiB  x{baseline / elapsed:.1f}'
+                )
+
+    def assessment_payload(self, rows):
+        """A serialized assessment list page, cycling real rows up to the requested size."""
+        queryset = AssessmentSerializer.setup_eager_loading(Assessment.objects.all(), set(AssessmentSerializer().fields))
+        sample = AssessmentSerializer(queryset[:min(rows, 500)], many=True).data
+        if not sample:
+            self.stdout.write(self.style.WARNING('No assessments in the database; only raw values are benchmarked'))
+        return {'count': rows, 'next': None, 'previous': None, 'results': list(islice(cycle(sample), rows))}
+
+    def raw_payload(self, rows):
+        """Values as returned by hand-built statistics responses (UUIDs, datetimes, Decimals)."""
+        now = timezone.now()
+        return {'results': [
+            {
+                'id': uuid.uuid4(),
+                'timestamp': now,
+                'date': now.date(),
+                'score': Decimal('72.50'),
+                'rate': index / 7,
+                'label': f'Facility {index % 50}',
+                'counts': {'completed': index, 'missed': index % 3},
+            }
+            for index in range(rows)
+        ]}
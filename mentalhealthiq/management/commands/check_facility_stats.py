@@ -2,11 +2,13 @@ from django.core.management.base import BaseCommand
 from django.utils import timezone
 from datetime import timedelta
 from django.db.models import Count
+from mentalhealthiq.db_router import use_replica
 from mentalhealthiq.models import Facility, Audit
 
 class Command(BaseCommand):
     help = 'Check facility and audit statistics'
 
+    @use_replica()
     def handle(self, *args, **options):
         # Get all active facilities
         active_facilities = Facility.objects.filter(status='Active')
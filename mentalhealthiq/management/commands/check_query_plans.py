@@ -0,0 +1,94 @@
+import re
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.utils import timezone
+from mentalhealthiq.models import Assessment, Audit, Facility, FacilityRanking, MetricSnapshot, Patient
+
+
+def query_shapes(facility_id):
+    """(name, model, queryset) for the hot filters of tasks, metrics, benchmarks and filters."""
+    now = timezone.now()
+    today_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    return [
+        # tasks.py
+        ('check_missed_audits', Audit,
+         Audit.objects.filter(status='scheduled', scheduled_date__lt=now)),
+        ('update_facility_metrics: patients by status', Patient,
+         Patient.objects.filter(facility_id=facility_id, status='Active')),
+        ('update_facility_metrics: completed today', Assessment,
+         Assessment.objects.filter(facility_id=facility_id, scheduled_date__range=(today_start, now),
+                                   status='completed')),
+        # metrics_views.py
+        ('MetricsViewSet.detailed: assessments in window', Assessment,
+         Assessment.objects.filter(facility_id=facility_id, scheduled_date__range=(now - timedelta(days=90), now))),
+        ('MetricsViewSet.detailed: latest snapshot', MetricSnapshot,
+         MetricSnapshot.objects.filter(facility_id=facility_id).order_by('-timestamp')[:1]),
+        # benchmark_views.py
+        ('benchmark: completed audits in window', Audit,
+         Audit.objects.filter(facility_id=facility_id, audit_date__gte=now - timedelta(days=90), status='completed')),
+        ('benchmark: recent completed assessments', Assessment,
+         Assessment.objects.filter(facility_id=facility_id, assessment_date__gte=now - timedelta(days=30),
+                                   status='completed')),
+        ('current_rankings: latest date', FacilityRanking,
+         FacilityRanking.objects.order_by('-ranking_date')[:1]),
+        ('current_rankings: rankings on date', FacilityRanking,
+         FacilityRanking.objects.filter(ranking_date=now).order_by('overall_rank')),
+        ('calculate_rankings: previous rank', FacilityRanking,
+         FacilityRanking.objects.filter(facility_id=facility_id).order_by('-ranking_date')[:1]),
+        # filters.py
+        ('AssessmentFilter: is_overdue', Assessment,
+         Assessment.objects.filter(status='scheduled', scheduled_date__lt=today_start)),
+        ('AssessmentFilter: status and date range', Assessment,
+         Assessment.objects.filter(status='completed', scheduled_date__gte=now - timedelta(days=30))),
+        ('AuditFilter: is_overdue', Audit,
+         Audit.objects.filter(status='scheduled', scheduled_date__lt=today_start)),
+    ]
+
+
+def full_scans(plan, table):
+    """Plan lines that read the whole of ``table`` instead of seeking an index."""
+    if connection.vendor == 'postgresql':
+        pattern = re.compile(rf'Seq Scan on {re.escape(table)}\b')
+    else:
+        # SQLite: 'SCAN t' is a full scan, 'SCAN t USING [COVERING] INDEX' walks an index
+        pattern = re.compile(rf'\bSCAN {re.escape(table)}\b(?! USING (COVERING )?INDEX)')
+    return [line.strip() for line in plan.splitlines() if pattern.search(line)]
+
+
+class Command(BaseCommand):
+    help = 'EXPLAIN the hot query shapes and fail if any of them falls back to a full table scan'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--verbose-plans', action='store_true', help='Print every plan, not only failures')
+
+    def handle(self, *args, **options):
+        if connection.vendor not in ('sqlite', 'postgresql'):
+            raise CommandError(f'Query plan checks are not implemented for {connection.vendor}')
+        facility_id = Facility.objects.values_list('id', flat=True).first() or 0
+
+        failures = 0
+        with connection.cursor() as cursor:
+            if connection.vendor == 'postgresql':
+                # Judge whether an index can be used, not what the planner prefers on a small table
+                cursor.execute('SET enable_seqscan = off')
+            try:
+                for name, model, queryset in query_shapes(facility_id):
+                    plan = queryset.explain()
+                    scans = full_scans(plan, model._meta.db_table)
+                    if scans:
+                        failures += 1
+                        self.stdout.write(self.style.ERROR(f'FULL SCAN  {name}'))
+                    else:
+                        self.stdout.write(self.style.SUCCESS(f'index      {name}'))
+                    if scans or options['verbose_plans']:
+                        for line in plan.splitlines():
+                            self.stdout.write(f'    {line}')
+            finally:
+                if connection.vendor == 'postgresql':
+                    cursor.execute('RESET enable_seqscan')
+
+        if failures:
+            raise CommandError(f'{failures} query shape(s) fall back to a full table scan')
+        self.stdout.write(self.style.SUCCESS('All query shapes use an index'))
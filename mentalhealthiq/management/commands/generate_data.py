@@ -0,0 +1,84 @@
+import time
+from datetime import datetime, time as day_time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from mentalhealthiq.models import Patient, User
+from mentalhealthiq.synthetic import (
+    ASSESSMENTS_PER_PATIENT, PER_FACILITY, PER_SCALE, clear_data, generate, search_indexes_suspended,
+)
+
+class Command(BaseCommand):
+    help = 'Load a seeded synthetic dataset sized by a scale factor (scale 1 = 100k assessments)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scale', type=float, default=1, help='Scale factor (default 1)')
+        parser.add_argument('--seed', type=int, default=0, help='Random seed (default 0)')
+        parser.add_argument('--end-date', help='Last day of the generated history, YYYY-MM-DD (default now). '
+                                               'Fix it to get identical data from identical seeds')
+        parser.add_argument('--days', type=int, default=365, help='Days of history (default 365)')
+        parser.add_argument('--workers', type=int, default=1,
+                            help='Processes generating facility blocks in parallel (most useful on PostgreSQL)')
+        parser.add_argument('--batch-size', type=int, default=5000, help='Rows per INSERT (default 5000)')
+        parser.add_argument('--password', default='password123', help='Password of the generated users')
+        parser.add_argument('--clear', action='store_true',
+                            help='Delete all existing data (except superusers) first')
+
+    def handle(self, *args, **options):
+        scale = options['scale']
+        if scale <= 0:
+            raise CommandError('--scale must be positive')
+        end = None
+        if options['end_date']:
+            try:
+                end = timezone.make_aware(datetime.combine(
+                    datetime.strptime(options['end_date'], '%Y-%m-%d').date(), day_time(12)
+                ))
+            except ValueError:
+                raise CommandError('--end-date must be YYYY-MM-DD')
+
+        facilities = max(1, round(PER_SCALE['facilities'] * scale))
+        self.stdout.write(
+            f"Scale {scale:g}: {facilities} facilities, "
+            f"{facilities * PER_FACILITY['patients']} patients, "
+            f"{facilities * PER_FACILITY['patients'] * ASSESSMENTS_PER_PATIENT} assessments"
+        )
+
+        if not options['clear'] and (
+            User.objects.filter(username='synthetic0').exists() or Patient.objects.filter(id__startswith='SP').exists()
+        ):
+            raise CommandError('Synthetic data is already loaded; rerun with --clear to replace it')
+
+        with search_indexes_suspended():
+            if options['clear']:
+                self.stdout.write('Clearing existing data...')
+                clear_data()
+
+            start = time.perf_counter()
+            last_report = [start]
+
+            def progress(counts):
+                now = time.perf_counter()
+                if now - last_report[0] >= 10:
+                    last_report[0] = now
+                    self.stdout.write(f"  {counts.get('assessments', 0)} assessments ({now - start:.0f}s)")
+
+            counts = generate(
+                scale=scale,
+                seed=options['seed'],
+                end=end,
+                days=options['days'],
+                workers=max(1, options['workers']),
+                batch_size=options['batch_size'],
+                password=options['password'],
+                progress=progress,
+            )
+            elapsed = time.perf_counter() - start
+            self.stdout.write('Rebuilding search indexes...')
+
+        for label, count in counts.items():
+            self.stdout.write(f'  {label}: {count}')
+        rows = sum(counts.values())
+        self.stdout.write(self.style.SUCCESS(
+            f'Created {rows} rows in {elapsed:.1f}s ({rows / elapsed:.0f} rows/s)'
+        ))
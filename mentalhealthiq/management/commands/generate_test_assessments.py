@@ -4,6 +4,7 @@ from django.contrib.auth import get_user_model
 from mentalhealthiq.models import Assessment, Facility, Patient, AssessmentCriteria
 from datetime import timedelta
 import random
+from collections import defaultdict
 
 User = get_user_model()
 
@@ -44,6 +45,11 @@ class Command(BaseCommand):
             self.stdout.write(self.style.ERROR('No assessment criteria found'))
             return
 
+        # Active patients per facility, loaded once instead of once per assessment
+        patients_by_facility = defaultdict(list)
+        for patient in Patient.objects.filter(facility__in=facilities, status='Active').only('id', 'facility_id'):
+            patients_by_facility[patient.facility_id].append(patient)
+
         current_time = timezone.now()
         start_date = current_time - timedelta(days=days)
         
@@ -57,12 +63,13 @@ class Command(BaseCommand):
         while current_date <= current_time:
             # Random number of assessments for this day
             day_assessments = max(1, int(random.gauss(per_day, per_day/3)))
+            new_assessments = []
             
             for _ in range(day_assessments):
                 try:
                     # Select random facility and get its patients
                     facility = random.choice(facilities)
-                    patients = list(Patient.objects.filter(facility=facility, status='Active'))
+                    patients = patients_by_facility[facility.id]
                     
                     if not patients:
                         continue
@@ -89,7 +96,7 @@ class Command(BaseCommand):
                             status = 'missed'
                             assessment_date = None
                     
-                    assessment = Assessment.objects.create(
+                    new_assessments.append(Assessment(
                         patient=random.choice(patients),
                         criteria=random.choice(criteria) if status == 'completed' else None,
                         evaluator=random.choice(evaluators) if status == 'completed' else None,
@@ -100,14 +107,16 @@ class Command(BaseCommand):
                         status=status,
                         missed_reason='Patient unavailable' if status == 'missed' else None,
                         notes=f"Test assessment generated for {assessment_time.strftime('%Y-%m-%d')}"
-                    )
-                    
-                    total_created += 1
+                    ))
                     
                 except Exception as e:
                     self.stdout.write(self.style.ERROR(f'Error creating assessment: {str(e)}'))
                     continue
             
+            # One INSERT per day instead of one per assessment
+            Assessment.objects.bulk_create(new_assessments)
+            total_created += len(new_assessments)
+            
             current_date += timedelta(days=1)
             days_processed += 1
             
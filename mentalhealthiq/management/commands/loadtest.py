@@ -0,0 +1,116 @@
+import json
+from contextlib import nullcontext
+
+from django.core.management.base import BaseCommand, CommandError
+
+from mentalhealthiq import loadtest
+
+
+class Command(BaseCommand):
+    help = ('Load test the API with scripted dashboard scenarios and report throughput, latency '
+            'and error rates. Starts a local server unless --url is given. The evaluator_submission '
+            'scenario creates assessments, so point it at a scratch database (see generate_data)')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=10, help='Concurrent virtual users (default 10)')
+        parser.add_argument('--duration', type=float, default=60, help='Seconds to run (default 60)')
+        parser.add_argument('--ramp-up', type=float, default=0,
+                            help='Seconds over which users are started (default 0: all at once)')
+        parser.add_argument('--think-time', type=float, default=1.0,
+                            help='Mean pause between scenarios per user, seconds (default 1; 0 for none)')
+        parser.add_argument('--mix', help='Scenario weights, e.g. dashboard=3,assessment_list=4,statistics=2,'
+                                          'evaluator_submission=1 (the default); weight 0 disables one')
+        parser.add_argument('--url', help='Test an already running server at this base URL instead')
+        parser.add_argument('--port', type=int, help='Port for the local server (default: any free port)')
+        parser.add_argument('--seed', type=int, default=0, help='Random seed for the users (default 0)')
+        parser.add_argument('--timeout', type=float, default=30, help='Per-request timeout, seconds')
+        parser.add_argument('--json', dest='json_path', metavar='PATH', help='Also write the report as JSON')
+        parser.add_argument('--max-error-rate', type=float,
+                            help='Fail when the share of failed requests is above this (e.g. 0.01)')
+
+    def handle(self, *args, **options):
+        if options['users'] < 1 or options['duration'] <= 0:
+            raise CommandError('--users and --duration must be positive')
+        mix = self.parse_mix(options['mix'])
+
+        server = nullcontext(options['url'].rstrip('/')) if options['url'] else loadtest.local_server(
+            port=options['port'])
+        try:
+            with server as base_url:
+                self.stdout.write(f"Load testing {base_url} with {options['users']} users "
+                                  f"for {options['duration']:g}s")
+
+                last_report = [0]
+
+                def progress(requests, errors, elapsed):
+                    if elapsed - last_report[0] >= 10:
+                        last_report[0] = elapsed
+                        self.stdout.write(f'  {elapsed:4.0f}s  {requests} requests, {errors} errors')
+
+                report = loadtest.run(
+                    base_url,
+                    users=options['users'],
+                    duration=options['duration'],
+                    mix=mix,
+                    ramp_up=options['ramp_up'],
+                    think_time=options['think_time'],
+                    seed=options['seed'],
+                    timeout=options['timeout'],
+                    progress=progress,
+                )
+        except (RuntimeError, loadtest.RequestFailed, OSError) as e:
+            raise CommandError(f'Load test could not run: {e}')
+
+        self.write_report(report)
+        if options['json_path']:
+            with open(options['json_path'], 'w') as output:
+                json.dump(report, output, indent=2)
+            self.stdout.write(f"Report written to {options['json_path']}")
+        if options['max_error_rate'] is not None and report['error_rate'] > options['max_error_rate']:
+            raise CommandError(f"Error rate {report['error_rate']:.2%} is above {options['max_error_rate']:.2%}")
+
+    def parse_mix(self, value):
+        if not value:
+            return None
+        mix = {}
+        for part in value.split(','):
+            name, _, weight = part.partition('=')
+            name = name.strip()
+            if name not in loadtest.SCENARIOS:
+                raise CommandError(f"Unknown scenario '{name}'; choose from {', '.join(loadtest.SCENARIOS)}")
+            try:
+                mix[name] = float(weight) if weight else 1
+            except ValueError:
+                raise CommandError(f"Invalid weight for '{name}': {weight}")
+        if not any(weight > 0 for weight in mix.values()):
+            raise CommandError('--mix needs at least one scenario with a positive weight')
+        return mix
+
+    def write_report(self, report):
+        self.stdout.write(self.style.MIGRATE_HEADING('Summary'))
+        self.stdout.write(
+            f"  {report['requests']} requests in {report['duration_s']}s: {report['rps']} req/s, "
+            f"{report['errors']} errors ({report['error_rate']:.2%})"
+        )
+        self.stdout.write(
+            f"  latency p50 {report['p50_ms']} ms, p95 {report['p95_ms']} ms, "
+            f"p99 {report['p99_ms']} ms, max {report['max_ms']} ms"
+        )
+
+        self.stdout.write(self.style.MIGRATE_HEADING('Scenarios'))
+        for name, scenario in report['scenarios'].items():
+            self.stdout.write(f"  {name:<24} {scenario['iterations']:>6} runs  {scenario['failed']:>5} failed  "
+                              f"{scenario['per_minute']:>8}/min")
+
+        self.stdout.write(self.style.MIGRATE_HEADING('Requests'))
+        for name, row in report['by_request'].items():
+            style = self.style.ERROR if row['errors'] else (lambda text: text)
+            self.stdout.write(style(
+                f"  {name:<48} {row['count']:>6}  {row['rps']:>7}/s  err {row['error_rate']:>6.1%}  "
+                f"p50 {row['p50_ms']:>7}  p95 {row['p95_ms']:>7}  p99 {row['p99_ms']:>7} ms"
+            ))
+
+        if report['error_samples']:
+            self.stdout.write(self.style.MIGRATE_HEADING('Most frequent errors'))
+            for error, count in report['error_samples'].items():
+                self.stdout.write(self.style.ERROR(f'  {count:>6}  {error}'))
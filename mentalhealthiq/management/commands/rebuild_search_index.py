@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+from django.db import connection
+from mentalhealthiq.search import install_patient_index, install_search_index
+
+class Command(BaseCommand):
+    help = 'Recreate the full-text search indexes and their sync triggers'
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'sqlite':
+            self.stdout.write(self.style.WARNING(
+                f'Full-text indexes are only used on SQLite (current backend: {connection.vendor}); nothing to do'
+            ))
+            return
+        install_patient_index(connection)
+        self.stdout.write(self.style.SUCCESS('Patient search index rebuilt'))
+        install_search_index(connection)
+        self.stdout.write(self.style.SUCCESS('Unified search index rebuilt'))
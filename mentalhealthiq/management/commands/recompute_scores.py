@@ -0,0 +1,28 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from mentalhealthiq.models import AssessmentCriteria
+from mentalhealthiq.scoring import chunk_size, recompute_scores
+
+class Command(BaseCommand):
+    help = 'Recompute assessment scores from indicator scores and indicator weights'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--criteria', type=int, help='Only assessments scored on this criterion')
+        parser.add_argument('--chunk-size', type=int, default=None,
+                            help=f'Assessments per chunk (default {chunk_size()})')
+        parser.add_argument('--workers', type=int, default=1,
+                            help='Chunks recomputed in parallel (useful on PostgreSQL)')
+
+    def handle(self, *args, **options):
+        criteria_id = options['criteria']
+        if criteria_id is not None and not AssessmentCriteria.objects.filter(id=criteria_id).exists():
+            raise CommandError(f'Criterion {criteria_id} not found')
+
+        start = time.perf_counter()
+        checked, changed = recompute_scores(criteria_id, options['chunk_size'], max(1, options['workers']))
+        elapsed = time.perf_counter() - start
+        rate = checked / elapsed if elapsed else 0
+        self.stdout.write(self.style.SUCCESS(
+            f'Checked {checked} assessments, updated {changed} scores in {elapsed:.1f}s ({rate:.0f}/s)'
+        ))
@@ -0,0 +1,57 @@
+from django.core.management.base import BaseCommand
+from django.db.models import F
+from mentalhealthiq.models import SlowQuery
+
+# Plan fragments that usually mean a missing index
+FULL_SCAN_MARKERS = ('SCAN ', 'Seq Scan', 'USE TEMP B-TREE')
+
+class Command(BaseCommand):
+    help = 'Show slow queries aggregated by SQL fingerprint, with their query plans'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--limit', type=int, default=10, help='Number of fingerprints to show')
+        parser.add_argument('--order', choices=['total', 'max', 'count', 'avg'], default='total',
+                            help='Sort by total time (default), worst single run, count or average')
+        parser.add_argument('--no-plans', action='store_true', help='Hide query plans')
+        parser.add_argument('--clear', action='store_true', help='Delete all recorded slow queries')
+
+    def handle(self, *args, **options):
+        if options['clear']:
+            deleted, _ = SlowQuery.objects.all().delete()
+            self.stdout.write(self.style.SUCCESS(f'Deleted {deleted} slow query records'))
+            return
+
+        ordering = {
+            'total': '-total_ms',
+            'max': '-max_ms',
+            'count': '-count',
+        }
+        queryset = SlowQuery.objects.all()
+        if options['order'] == 'avg':
+            queryset = queryset.annotate(avg_ms=F('total_ms') / F('count')).order_by('-avg_ms')
+        else:
+            queryset = queryset.order_by(ordering[options['order']])
+        entries = list(queryset[:options['limit']])
+        if not entries:
+            self.stdout.write('No slow queries recorded')
+            return
+
+        for rank, entry in enumerate(entries, 1):
+            average = entry.total_ms / entry.count if entry.count else 0
+            self.stdout.write(self.style.MIGRATE_HEADING(
+                f'#{rank}  {entry.count} runs, total {entry.total_ms:.0f} ms, '
+                f'avg {average:.0f} ms, max {entry.max_ms:.0f} ms, last seen {entry.last_seen:%Y-%m-%d %H:%M}'
+            ))
+            origins = sorted(entry.origins.items(), key=lambda item: item[1], reverse=True)
+            self.stdout.write('  from: ' + ', '.join(f'{origin} ({count})' for origin, count in origins[:5]))
+            self.stdout.write(f'  sql:  {entry.fingerprint}')
+            if not options['no_plans']:
+                if entry.plan:
+                    self.stdout.write('  plan:')
+                    for line in entry.plan.splitlines():
+                        self.stdout.write(f'    {line}')
+                    if any(marker in entry.plan for marker in FULL_SCAN_MARKERS):
+                        self.stdout.write(self.style.WARNING('  ! full scan or temporary sort: check for a missing index'))
+                else:
+                    self.stdout.write('  plan: (not captured)')
+            self.stdout.write('')
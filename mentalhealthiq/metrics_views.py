@@ -2,17 +2,18 @@ from rest_framework import viewsets, permissions, filters, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from django.utils import timezone
-from django.db.models import Q, Max, Avg, Count
-from .models import MetricSnapshot, Facility, Assessment, Report, Audit, Patient
+from django.db.models import Q, Max, Min, Avg, Count, Sum
+from .models import MetricSnapshot, Facility, Assessment, Report, Audit, AuditCriteria, Patient, IndicatorScore
 from .serializers import MetricSnapshotSerializer, ReportSerializer
 from datetime import timedelta
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework.permissions import AllowAny
 from .pagination import StandardResultsSetPagination
-from .views import BaseViewSet
+from .views import AnalyticsReplicaMixin, BaseViewSet
+from .concurrency import run_concurrently
 from django.db.models.functions import TruncMonth
 
-class MetricsViewSet(viewsets.ReadOnlyModelViewSet):
+class MetricsViewSet(AnalyticsReplicaMixin, viewsets.ReadOnlyModelViewSet):
 
     queryset = MetricSnapshot.objects.all()
     serializer_class = MetricSnapshotSerializer
@@ -66,27 +67,29 @@ class MetricsViewSet(viewsets.ReadOnlyModelViewSet):
             today_start = current_time.replace(hour=0, minute=0, second=0, microsecond=0)
             ninety_days_ago = current_time - timedelta(days=90)
 
-            # Get latest metrics
-            latest_metrics = MetricSnapshot.objects.filter(
-                facility=facility
-            ).order_by('-timestamp').first()
+            # The three queries are independent; run them side by side
+            results = run_concurrently(
+                latest_metrics=lambda: MetricSnapshot.objects.filter(
+                    facility=facility
+                ).order_by('-timestamp').first(),
+                today_assessments=lambda: Assessment.objects.filter(
+                    facility=facility,
+                    scheduled_date__range=(today_start, current_time)
+                ).count(),
+                ninety_day_assessments=lambda: Assessment.objects.filter(
+                    facility=facility,
+                    scheduled_date__range=(ninety_days_ago, current_time)
+                ).count(),
+            )
+            latest_metrics = results['latest_metrics']
+            today_assessments = results['today_assessments']
+            ninety_day_assessments = results['ninety_day_assessments']
 
             if not latest_metrics:
                 return Response({
                     'error': 'No metrics found for this facility'
                 }, status=404)
 
-            # Get assessment status breakdown
-            today_assessments = Assessment.objects.filter(
-                facility=facility,
-                scheduled_date__range=(today_start, current_time)
-            ).values('status').count()
-
-            ninety_day_assessments = Assessment.objects.filter(
-                facility=facility,
-                scheduled_date__range=(ninety_days_ago, current_time)
-            ).values('status').count()
-
             # Prepare the response
             response_data = {
                 'facility': {
@@ -128,13 +131,14 @@ class MetricsViewSet(viewsets.ReadOnlyModelViewSet):
             }, status=500) 
         return Response(serializer.data) 
 
-class ReportViewSet(BaseViewSet):
+class ReportViewSet(AnalyticsReplicaMixin, BaseViewSet):
     """API endpoints for managing reports"""
     queryset = Report.objects.all()
     serializer_class = ReportSerializer
     filterset_fields = ['report_type', 'generated_by']
     search_fields = ['title', 'description']
     ordering_fields = ['generated_at', 'title']
+    keyset_ordering = ('-generated_at', '-id')
     
     @action(detail=False, methods=['get'], url_path='assessment-statistics')
     def assessment_statistics(self, request):
@@ -153,29 +157,44 @@ class ReportViewSet(BaseViewSet):
             if end_date:
                 assessments = assessments.filter(assessment_date__lte=end_date)
             
-            # Calculate basic statistics
-            total_count = assessments.count()
-            avg_score = assessments.exclude(score=None).aggregate(
-                avg_score=Avg('score')
-            )['avg_score'] or 0
-            
+            # The aggregates below are independent; run them side by side
+            results = run_concurrently(
+                total_count=assessments.count,
+                avg_score=lambda: assessments.exclude(score=None).aggregate(
+                    avg_score=Avg('score')
+                )['avg_score'] or 0,
+                total_patients=Patient.objects.filter(status='Active').count,
+                patients_with_assessment=Patient.objects.filter(
+                    status='Active',
+                    assessments__isnull=False
+                ).distinct().count,
+                facility_counts=lambda: list(assessments.values('facility__id', 'facility__name').annotate(
+                    count=Count('id')
+                ).order_by('-count')),
+                count_by_period=lambda: list(assessments.annotate(
+                    month=TruncMonth('assessment_date')
+                ).values('month').annotate(
+                    count=Count('id')
+                ).order_by('month')),
+                criteria_scores=lambda: list(IndicatorScore.objects.filter(
+                    assessment__in=assessments
+                ).values(
+                    'indicator__criteria__id', 'indicator__criteria__name'
+                ).annotate(
+                    average_score=Avg('score')
+                ).order_by('indicator__criteria__id')),
+            )
+            total_count = results['total_count']
+            avg_score = results['avg_score']
+
             # Calculate patient coverage
-            total_patients = Patient.objects.filter(status='Active').count()
-            patients_with_assessment = Patient.objects.filter(
-                status='Active',
-                assessments__isnull=False
-            ).distinct().count()
-            
+            total_patients = results['total_patients']
+            patients_with_assessment = results['patients_with_assessment']
             patient_coverage = (
                 (patients_with_assessment / total_patients * 100)
                 if total_patients > 0 else 0
             )
-            
-            # Count by facility - format for frontend
-            facility_counts = assessments.values('facility__id', 'facility__name').annotate(
-                count=Count('id')
-            ).order_by('-count')
-            
+
             # Format facility data for frontend
             count_by_facility = [
                 {
@@ -183,51 +202,28 @@ class ReportViewSet(BaseViewSet):
                     'facilityName': item['facility__name'],
                     'count': item['count']
                 }
-                for item in facility_counts
+                for item in results['facility_counts']
             ]
-            
-            # Generate count by period (monthly breakdown)
-            count_by_period = assessments.annotate(
-                month=TruncMonth('assessment_date')
-            ).values('month').annotate(
-                count=Count('id')
-            ).order_by('month')
-            
+
             # Format period data for frontend
             period_data = [
                 {
                     'period': item['month'].strftime('%Y-%m'),
                     'count': item['count']
                 }
-                for item in count_by_period if item['month']
+                for item in results['count_by_period'] if item['month']
             ]
-            
-            # Get criteria data and calculate averages
-            criteria_data = {}
-            for assessment in assessments:
-                for indicator_score in assessment.indicator_scores.all():
-                    criteria_name = indicator_score.indicator.criteria.name
-                    criteria_id = str(indicator_score.indicator.criteria.id)
-                    if criteria_id not in criteria_data:
-                        criteria_data[criteria_id] = {
-                            'criteriaId': criteria_id,
-                            'criteriaName': criteria_name,
-                            'total_score': 0,
-                            'count': 0
-                        }
-                    criteria_data[criteria_id]['total_score'] += indicator_score.score
-                    criteria_data[criteria_id]['count'] += 1
-            
-            # Calculate average scores for each criteria
+
+            # Average indicator score per criteria
             score_by_criteria = [
                 {
-                    'criteriaId': data['criteriaId'],
-                    'criteriaName': data['criteriaName'],
-                    'averageScore': round(data['total_score'] / data['count'], 2)
+                    'criteriaId': str(item['indicator__criteria__id']),
+                    'criteriaName': item['indicator__criteria__name'],
+                    'averageScore': round(item['average_score'], 2)
                 }
-                for data in criteria_data.values()
+                for item in results['criteria_scores']
             ]
-            
+
             return Response({
                 'totalCount': total_count,
                 'averageScore': round(avg_score, 2),
@@ -302,26 +298,23 @@ class ReportViewSet(BaseViewSet):
                 count=Count('id')
             ).order_by('-count')
             
-            # Get criteria data and calculate averages
-            criteria_data = {}
-            for audit in audits:
-                for criteria_score in audit.criteria_scores.all():
-                    if criteria_score.criteria_name not in criteria_data:
-                        criteria_data[criteria_score.criteria_name] = {
-                            'name': criteria_score.criteria_name,
-                            'total_score': 0,
-                            'count': 0
-                        }
-                    criteria_data[criteria_score.criteria_name]['total_score'] += criteria_score.score
-                    criteria_data[criteria_score.criteria_name]['count'] += 1
-            
-            # Calculate average scores for each criteria
+            # Average score per criterion, grouped on the interned criterion id.
+            # Criteria are listed by their most recently scheduled audit, the
+            # order in which a walk over the audits (newest first) meets them
+            criteria_scores = AuditCriteria.objects.filter(audit__in=audits).values(
+                'criterion_id', 'criterion__name'
+            ).annotate(
+                total_score=Sum('score'),
+                count=Count('id'),
+                latest=Max('audit__scheduled_date'),
+                first_id=Min('id'),
+            ).order_by('-latest', 'first_id')
             criteria_list = [
                 {
-                    'name': name,
-                    'averageScore': round(data['total_score'] / data['count'], 2)
+                    'name': item['criterion__name'],
+                    'averageScore': round(item['total_score'] / item['count'], 2)
                 }
-                for name, data in criteria_data.items()
+                for item in criteria_scores
             ]
             
             # Format the response to match frontend expectations
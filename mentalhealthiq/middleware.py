@@ -0,0 +1,291 @@
+"""
+Project middleware.
+
+PerformanceMiddleware records per-request timings and query counts (see
+perf.py).
+
+ReplicaPinningMiddleware gives each request its read-replica routing state
+and keeps clients that just wrote on the primary (see db_router.py).
+
+CompressionMiddleware compresses responses with the best encoding from
+Accept-Encoding that both sides support, in the
+server's order of preference (COMPRESSION_ENCODINGS, default zstd, br,
+gzip) unless the client's q-values say otherwise. zstd and brotli are used
+only when the ``zstandard`` / ``brotli`` packages are installed; gzip always
+works. Settings:
+
+* COMPRESSION_MIN_SIZE: bodies smaller than this many bytes are sent as is
+  (default 1024). Streaming responses are always compressed.
+* COMPRESSION_LEVELS: per encoding level, e.g. {'gzip': 6, 'br': 4,
+  'zstd': 3}. Lower is cheaper on CPU, higher saves more bandwidth.
+
+Streaming responses are compressed chunk by chunk and flushed after each
+chunk, so clients still get rows as soon as the view yields them. Event
+streams (text/event-stream) and responses marked Cache-Control: no-transform
+are left alone.
+"""
+from contextlib import ExitStack
+import time
+import zlib
+
+from django.conf import settings
+from django.db import connections
+from django.utils import timezone
+from django.utils.cache import patch_vary_headers
+
+from . import db_router, perf
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional dependency
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - optional dependency
+    zstandard = None
+
+DEFAULT_ENCODINGS = ('zstd', 'br', 'gzip')
+DEFAULT_LEVELS = {'gzip': 6, 'br': 4, 'zstd': 3}
+DEFAULT_MIN_SIZE = 1024
+
+# Only text-like payloads are worth compressing
+COMPRESSIBLE_TYPES = (
+    'text/',
+    'application/json',
+    'application/javascript',
+    'application/xml',
+    'application/msgpack',
+    'image/svg+xml',
+)
+SKIP_TYPES = ('text/event-stream',)
+
+
+class GzipCodec:
+    def __init__(self, level):
+        # wbits=31 writes a gzip header and trailer
+        self.compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def compress(self, data):
+        return self.compressor.compress(data) + self.compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self):
+        return self.compressor.flush(zlib.Z_FINISH)
+
+
+class BrotliCodec:
+    def __init__(self, level):
+        self.compressor = brotli.Compressor(quality=level)
+
+    def compress(self, data):
+        return self.compressor.process(data) + self.compressor.flush()
+
+    def finish(self):
+        return self.compressor.finish()
+
+
+class ZstdCodec:
+    def __init__(self, level):
+        self.compressor = zstandard.ZstdCompressor(level=level).compressobj()
+
+    def compress(self, data):
+        return self.compressor.compress(data) + self.compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+    def finish(self):
+        return self.compressor.flush(zstandard.COMPRESSOBJ_FLUSH_FINISH)
+
+
+CODECS = {'gzip': GzipCodec}
+if brotli is not None:
+    CODECS['br'] = BrotliCodec
+if zstandard is not None:
+    CODECS['zstd'] = ZstdCodec
+
+
+def parse_accept_encoding(header):
+    """Return {coding: q} from an Accept-Encoding header."""
+    accepted = {}
+    for part in header.split(','):
+        coding, _, params = part.strip().partition(';')
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        q = 1.0
+        for param in params.split(';'):
+            name, _, value = param.strip().partition('=')
+            if name.strip() == 'q':
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        accepted[coding] = q
+    return accepted
+
+
+def choose_encoding(header, preference):
+    """Pick the available encoding with the highest q; ties go to server preference."""
+    accepted = parse_accept_encoding(header)
+    best, best_q = None, 0.0
+    for coding in preference:
+        if coding not in CODECS:
+            continue
+        q = accepted.get(coding, accepted.get('*', 0.0))
+        if q > best_q:
+            best, best_q = coding, q
+    return best
+
+
+class CompressionMiddleware:
+    """Compress responses with zstd, brotli or gzip depending on the client."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.min_size = getattr(settings, 'COMPRESSION_MIN_SIZE', DEFAULT_MIN_SIZE)
+        self.preference = tuple(getattr(settings, 'COMPRESSION_ENCODINGS', DEFAULT_ENCODINGS))
+        self.levels = {**DEFAULT_LEVELS, **getattr(settings, 'COMPRESSION_LEVELS', {})}
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        return self.process_response(request, response)
+
+    def process_response(self, request, response):
+        if response.has_header('Content-Encoding') or not self.is_compressible(response):
+            return response
+        if not response.streaming and len(response.content) < self.min_size:
+            return response
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+        encoding = choose_encoding(request.META.get('HTTP_ACCEPT_ENCODING', ''), self.preference)
+        if encoding is None:
+            return response
+        codec = CODECS[encoding](self.levels[encoding])
+
+        if response.streaming:
+            if response.is_async:
+                response.streaming_content = self.compress_async(response.streaming_content, codec)
+            else:
+                response.streaming_content = self.compress_stream(response.streaming_content, codec)
+            # The compressed size is only known once the stream is done
+            del response.headers['Content-Length']
+        else:
+            compressed = codec.compress(response.content) + codec.finish()
+            if len(compressed) >= len(response.content):
+                return response
+            response.content = compressed
+            response.headers['Content-Length'] = str(len(compressed))
+
+        # The body changed, so a strong validator must become a weak one
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response.headers['ETag'] = 'W/' + etag
+        response.headers['Content-Encoding'] = encoding
+        return response
+
+    @staticmethod
+    def is_compressible(response):
+        content_type = response.get('Content-Type', '').lower()
+        if content_type.startswith(SKIP_TYPES) or not content_type.startswith(COMPRESSIBLE_TYPES):
+            return False
+        return 'no-transform' not in response.get('Cache-Control', '').lower()
+
+    @staticmethod
+    def compress_stream(chunks, codec):
+        for chunk in chunks:
+            data = codec.compress(chunk)
+            if data:
+                yield data
+        yield codec.finish()
+
+    @staticmethod
+    async def compress_async(chunks, codec):
+        async for chunk in chunks:
+            data = codec.compress(chunk)
+            if data:
+                yield data
+        yield codec.finish()
+
+
+class PerformanceMiddleware:
+    """
+    Measure each request (see perf.py), add a Server-Timing header and keep
+    the numbers in the ring buffer read by /api/_perf/. Disabled with
+    PERF_MONITORING = False.
+    """
+    excluded_prefixes = ('/api/_perf/',)
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.enabled = getattr(settings, 'PERF_MONITORING', True)
+
+    def __call__(self, request):
+        if not self.enabled or request.path.startswith(self.excluded_prefixes):
+            return self.get_response(request)
+
+        metrics, token = perf.start_request(request)
+        try:
+            with ExitStack() as stack:
+                for conn in connections.all():
+                    stack.enter_context(conn.execute_wrapper(metrics))
+                response = self.get_response(request)
+        finally:
+            perf.finish_request(token)
+        total = time.perf_counter() - metrics.start
+
+        serialize = metrics.timings.get('serialize', 0.0)
+        render = metrics.timings.get('render', 0.0)
+        response['Server-Timing'] = ', '.join([
+            f'total;dur={total * 1000:.1f}',
+            f'db;dur={metrics.db_time * 1000:.1f};desc="{metrics.queries} queries"',
+            f'serialize;dur={serialize * 1000:.1f}',
+            f'render;dur={render * 1000:.1f}',
+        ])
+
+        perf.store({
+            'route': perf.request_route(request),
+            'path': request.get_full_path(),
+            'status': response.status_code,
+            'timestamp': timezone.now(),
+            'total_ms': total * 1000,
+            'db_ms': metrics.db_time * 1000,
+            'queries': metrics.queries,
+            'serialize_ms': serialize * 1000,
+            'render_ms': render * 1000,
+            # Unknown for streaming responses until the stream has been sent
+            'bytes': None if response.streaming else len(response.content),
+            'n_plus_one': metrics.n_plus_one(),
+        })
+        return response
+
+
+class ReplicaPinningMiddleware:
+    """
+    Give each request its own replica routing state (db_router.py). A client
+    whose last write was less than REPLICA_PIN_SECONDS ago reads from the
+    primary; a request that writes sets the cookie that says so.
+    """
+    cookie_name = 'replica_pin'
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if db_router.replica_alias() is None:
+            return self.get_response(request)
+
+        try:
+            pinned_until = float(request.COOKIES.get(self.cookie_name, 0))
+        except ValueError:
+            pinned_until = 0
+        state, token = db_router.start_request(pinned=pinned_until > time.time())
+        try:
+            response = self.get_response(request)
+        finally:
+            db_router.finish_request(token)
+
+        pin_seconds = db_router.pin_seconds()
+        if state.wrote and pin_seconds:
+            response.set_cookie(
+                self.cookie_name, f'{time.time() + pin_seconds:.3f}',
+                max_age=pin_seconds, httponly=True, samesite='Lax',
+            )
+        return response
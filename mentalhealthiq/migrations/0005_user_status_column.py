@@ -3,8 +3,7 @@ from django.db import migrations, connection
 
 def add_status_column(apps, schema_editor):
     with connection.cursor() as cursor:
-        cursor.execute("PRAGMA table_info(mentalhealthiq_user)")
-        cols = [row[1] for row in cursor.fetchall()]
+        cols = [column.name for column in connection.introspection.get_table_description(cursor, 'mentalhealthiq_user')]
         if 'status' not in cols:
             cursor.execute("ALTER TABLE mentalhealthiq_user ADD COLUMN status varchar(10) NOT NULL DEFAULT 'active'")
 
@@ -0,0 +1,23 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mentalhealthiq', '0005_user_status_column'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='assessment',
+            index=models.Index(fields=['scheduled_date', 'id'], name='mentalhealt_schedul_14012d_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='audit',
+            index=models.Index(fields=['scheduled_date', 'id'], name='mentalhealt_schedul_f6743f_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='patient',
+            index=models.Index(fields=['created_at', 'id'], name='mentalhealt_created_52a535_idx'),
+        ),
+    ]
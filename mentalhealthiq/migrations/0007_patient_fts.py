@@ -0,0 +1,48 @@
+from django.db import migrations
+
+# Frozen here rather than imported from mentalhealthiq.search, so the
+# migration keeps doing the same thing as that module changes. The sync
+# triggers are not part of the schema history: they are installed after
+# every migrate run (mentalhealthiq.search.restore_search_indexes).
+CREATE_PATIENT_FTS = """
+    CREATE VIRTUAL TABLE IF NOT EXISTS mentalhealthiq_patient_fts USING fts5(
+        patient_id UNINDEXED,
+        first_name,
+        last_name,
+        national_id,
+        phone,
+        facility_name,
+        tokenize = 'trigram'
+    )
+"""
+
+DROP_PATIENT_FTS = [
+    "DROP TRIGGER IF EXISTS mentalhealthiq_patient_fts_facility_au",
+    "DROP TRIGGER IF EXISTS mentalhealthiq_patient_fts_ad",
+    "DROP TRIGGER IF EXISTS mentalhealthiq_patient_fts_au",
+    "DROP TRIGGER IF EXISTS mentalhealthiq_patient_fts_ai",
+    "DROP TABLE IF EXISTS mentalhealthiq_patient_fts",
+]
+
+
+def create_patient_fts(apps, schema_editor):
+    """Create the FTS5 patient index table (SQLite only)."""
+    if schema_editor.connection.vendor == 'sqlite':
+        schema_editor.execute(CREATE_PATIENT_FTS)
+
+
+def remove_patient_fts(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        for statement in DROP_PATIENT_FTS:
+            schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mentalhealthiq', '0006_keyset_pagination_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_patient_fts, reverse_code=remove_patient_fts),
+    ]
@@ -0,0 +1,61 @@
+from django.db import migrations
+
+# Frozen here rather than imported from mentalhealthiq.search, so the
+# migration keeps doing the same thing as that module changes. The sync
+# triggers are not part of the schema history: they are installed after
+# every migrate run (mentalhealthiq.search.restore_search_indexes).
+CREATE_SEARCH_INDEX = """
+    CREATE VIRTUAL TABLE IF NOT EXISTS mentalhealthiq_search_index USING fts5(
+        entity_type UNINDEXED,
+        object_id UNINDEXED,
+        facility_id UNINDEXED,
+        title,
+        subtitle,
+        body,
+        tokenize = 'trigram'
+    )
+"""
+
+DROP_SEARCH_INDEX = [
+    "DROP TRIGGER IF EXISTS mentalhealthiq_search_index_facility_ai",
+    "DROP TRIGGER IF EXISTS mentalhealthiq_search_index_facility_au",
+    "DROP TRIGGER IF EXISTS mentalhealthiq_search_index_facility_ad",
+    "DROP TRIGGER IF EXISTS mentalhealthiq_search_index_patient_ai",
+    "DROP TRIGGER IF EXISTS mentalhealthiq_search_index_patient_au",
+    "DROP TRIGGER IF EXISTS mentalhealthiq_search_index_patient_ad",
+    "DROP TRIGGER IF EXISTS mentalhealthiq_search_index_staff_ai",
+    "DROP TRIGGER IF EXISTS mentalhealthiq_search_index_staff_au",
+    "DROP TRIGGER IF EXISTS mentalhealthiq_search_index_staff_ad",
+    "DROP TRIGGER IF EXISTS mentalhealthiq_search_index_assessment_ai",
+    "DROP TRIGGER IF EXISTS mentalhealthiq_search_index_assessment_au",
+    "DROP TRIGGER IF EXISTS mentalhealthiq_search_index_assessment_ad",
+    "DROP TRIGGER IF EXISTS mentalhealthiq_search_index_audit_ai",
+    "DROP TRIGGER IF EXISTS mentalhealthiq_search_index_audit_au",
+    "DROP TRIGGER IF EXISTS mentalhealthiq_search_index_audit_ad",
+    "DROP TRIGGER IF EXISTS mentalhealthiq_search_index_assessment_patient_id_au",
+    "DROP TRIGGER IF EXISTS mentalhealthiq_search_index_audit_facility_id_au",
+    "DROP TABLE IF EXISTS mentalhealthiq_search_index",
+]
+
+
+def create_search_index(apps, schema_editor):
+    """Create the unified FTS5 search index table (SQLite only)."""
+    if schema_editor.connection.vendor == 'sqlite':
+        schema_editor.execute(CREATE_SEARCH_INDEX)
+
+
+def remove_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        for statement in DROP_SEARCH_INDEX:
+            schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mentalhealthiq', '0007_patient_fts'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, reverse_code=remove_search_index),
+    ]
@@ -0,0 +1,47 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mentalhealthiq', '0008_search_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Tombstone',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('entity_type', models.CharField(max_length=20)),
+                ('object_id', models.CharField(max_length=64)),
+                ('facility_id', models.IntegerField(blank=True, null=True)),
+                ('deleted_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'indexes': [
+                    models.Index(fields=['entity_type', 'id'], name='mentalhealt_entity__dd4252_idx'),
+                    models.Index(fields=['deleted_at'], name='mentalhealt_deleted_6e2b0a_idx'),
+                ],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='assessment',
+            index=models.Index(fields=['updated_at', 'id'], name='mentalhealt_updated_3706cc_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='audit',
+            index=models.Index(fields=['updated_at', 'id'], name='mentalhealt_updated_21c072_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='facility',
+            index=models.Index(fields=['updated_at', 'id'], name='mentalhealt_updated_f287c7_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='patient',
+            index=models.Index(fields=['updated_at', 'id'], name='mentalhealt_updated_489318_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='staffmember',
+            index=models.Index(fields=['updated_at', 'id'], name='mentalhealt_updated_0e2320_idx'),
+        ),
+    ]
@@ -0,0 +1,35 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mentalhealthiq', '0010_slow_query_log'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='assessment',
+            index=models.Index(fields=['facility', 'scheduled_date', 'status'], name='mentalhealt_facilit_59dec3_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='assessment',
+            index=models.Index(fields=['status', 'scheduled_date'], name='mentalhealt_status_6c9f11_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='audit',
+            index=models.Index(fields=['facility', 'status', 'audit_date'], name='mentalhealt_facilit_b7daae_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='audit',
+            index=models.Index(fields=['status', 'scheduled_date'], name='mentalhealt_status_ca9035_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='patient',
+            index=models.Index(fields=['facility', 'status'], name='mentalhealt_facilit_bb1fb5_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='facilityranking',
+            index=models.Index(fields=['ranking_date', 'overall_rank'], name='mentalhealt_ranking_468cb5_idx'),
+        ),
+    ]
@@ -0,0 +1,67 @@
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def intern_criteria_names(apps, schema_editor):
+    """Point every audit criterion score at its interned name."""
+    AuditCriteria = apps.get_model('mentalhealthiq', 'AuditCriteria')
+    AuditCriterionName = apps.get_model('mentalhealthiq', 'AuditCriterionName')
+    db_alias = schema_editor.connection.alias
+
+    names = AuditCriteria.objects.using(db_alias).values_list('criteria_name', flat=True).distinct().order_by()
+    AuditCriterionName.objects.using(db_alias).bulk_create(
+        [AuditCriterionName(name=name) for name in names], ignore_conflicts=True,
+    )
+    # One UPDATE per distinct name; there are only a handful
+    for criterion in AuditCriterionName.objects.using(db_alias).all():
+        AuditCriteria.objects.using(db_alias).filter(criteria_name=criterion.name).update(criterion=criterion)
+
+
+def restore_criteria_names(apps, schema_editor):
+    AuditCriteria = apps.get_model('mentalhealthiq', 'AuditCriteria')
+    AuditCriterionName = apps.get_model('mentalhealthiq', 'AuditCriterionName')
+    db_alias = schema_editor.connection.alias
+
+    for criterion in AuditCriterionName.objects.using(db_alias).all():
+        AuditCriteria.objects.using(db_alias).filter(criterion=criterion).update(criteria_name=criterion.name)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mentalhealthiq', '0012_search_index_update_columns'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AuditCriterionName',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=255, unique=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='auditcriteria',
+            name='criterion',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.PROTECT, related_name='scores', to='mentalhealthiq.auditcriterionname'),
+        ),
+        migrations.AlterField(
+            model_name='auditcriteria',
+            name='criteria_name',
+            field=models.CharField(default='', max_length=255),
+        ),
+        migrations.RunPython(intern_criteria_names, reverse_code=restore_criteria_names),
+        migrations.RemoveField(
+            model_name='auditcriteria',
+            name='criteria_name',
+        ),
+        migrations.AlterField(
+            model_name='auditcriteria',
+            name='criterion',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='scores', to='mentalhealthiq.auditcriterionname'),
+        ),
+        migrations.AddIndex(
+            model_name='auditcriteria',
+            index=models.Index(fields=['criterion', 'audit'], name='mentalhealt_criteri_b92324_idx'),
+        ),
+    ]
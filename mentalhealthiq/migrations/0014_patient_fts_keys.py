@@ -0,0 +1,31 @@
+from django.db import migrations
+
+# Patient index documents are keyed on the patient's primary key through this
+# table instead of sharing the patient table's rowid, which VACUUM and table
+# rebuilds renumber. The index is reindexed with the new triggers after the
+# migrate run (mentalhealthiq.search.restore_search_indexes).
+CREATE_PATIENT_FTS_KEYS = (
+    "CREATE TABLE IF NOT EXISTS mentalhealthiq_patient_fts_keys "
+    "(doc INTEGER PRIMARY KEY, patient_id TEXT NOT NULL UNIQUE)"
+)
+
+
+def create_patient_fts_keys(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        schema_editor.execute(CREATE_PATIENT_FTS_KEYS)
+
+
+def remove_patient_fts_keys(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        schema_editor.execute("DROP TABLE IF EXISTS mentalhealthiq_patient_fts_keys")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mentalhealthiq', '0013_audit_criterion_names'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_patient_fts_keys, reverse_code=remove_patient_fts_keys),
+    ]
@@ -0,0 +1,32 @@
+from django.db import migrations
+
+# Unified search index documents are keyed on (entity type, primary key)
+# through this table instead of the source rowid * 8 + a type code, since
+# VACUUM and table rebuilds renumber rowids. The index is reindexed with the
+# new triggers after the migrate run (mentalhealthiq.search.restore_search_indexes).
+CREATE_SEARCH_INDEX_KEYS = """
+    CREATE TABLE IF NOT EXISTS mentalhealthiq_search_index_keys (
+        doc INTEGER PRIMARY KEY, entity_type TEXT NOT NULL, object_id NOT NULL, UNIQUE (entity_type, object_id)
+    )
+"""
+
+
+def create_search_index_keys(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        schema_editor.execute(CREATE_SEARCH_INDEX_KEYS)
+
+
+def remove_search_index_keys(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        schema_editor.execute("DROP TABLE IF EXISTS mentalhealthiq_search_index_keys")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mentalhealthiq', '0014_patient_fts_keys'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index_keys, reverse_code=remove_search_index_keys),
+    ]
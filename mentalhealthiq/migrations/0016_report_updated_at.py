@@ -0,0 +1,23 @@
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mentalhealthiq', '0015_search_index_keys'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='report',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        # Existing reports: their last known change is when they were generated
+        migrations.RunSQL(
+            'UPDATE mentalhealthiq_report SET updated_at = generated_at',
+            reverse_sql=migrations.RunSQL.noop,
+        ),
+    ]
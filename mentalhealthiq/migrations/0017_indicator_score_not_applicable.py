@@ -0,0 +1,21 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mentalhealthiq', '0016_report_updated_at'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='indicatorscore',
+            name='score',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        # Going back, "not applicable" becomes the old stand-in of 0
+        migrations.RunSQL(
+            migrations.RunSQL.noop,
+            reverse_sql='UPDATE mentalhealthiq_indicatorscore SET score = 0 WHERE score IS NULL',
+        ),
+    ]
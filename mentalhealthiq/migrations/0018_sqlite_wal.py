@@ -0,0 +1,33 @@
+"""
+Switch the SQLite database file to write-ahead logging, once.
+
+WAL lets the read-only 'replica' connection (settings.DATABASES) read while
+a write is in progress. The journal mode is stored in the database file, so
+this replaces a per-connection PRAGMA that rewrote the file header on every
+run. SQLite cannot change the journal mode inside a transaction, hence
+atomic = False. Other backends, and in-memory test databases, are left
+alone.
+"""
+from django.db import migrations
+
+
+def set_journal_mode(mode):
+    def operation(apps, schema_editor):
+        connection = schema_editor.connection
+        if connection.vendor == 'sqlite' and not connection.is_in_memory_db():
+            with connection.cursor() as cursor:
+                cursor.execute(f'PRAGMA journal_mode={mode}')
+    return operation
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ('mentalhealthiq', '0017_indicator_score_not_applicable'),
+    ]
+
+    operations = [
+        migrations.RunPython(set_journal_mode('WAL'), set_journal_mode('DELETE')),
+    ]
@@ -103,6 +103,10 @@ class Facility(models.Model):
 
     class Meta:
         verbose_name_plural = "Facilities"
+        indexes = [
+            # Change feed order
+            models.Index(fields=['updated_at', 'id']),
+        ]
 
 class StaffMember(models.Model):
     STATUS_CHOICES = (
@@ -126,6 +130,12 @@ class StaffMember(models.Model):
     def __str__(self):
         return f"{self.name} - {self.position}"
 
+    class Meta:
+        indexes = [
+            # Change feed order
+            models.Index(fields=['updated_at', 'id']),
+        ]
+
 class StaffQualification(models.Model):
     staff = models.ForeignKey(StaffMember, on_delete=models.CASCADE, related_name='qualifications')
     qualification = models.CharField(max_length=255)
@@ -205,6 +215,16 @@ class Patient(models.Model):
     def __str__(self):
         return f"{self.first_name} {self.last_name} - {self.id}"
 
+    class Meta:
+        indexes = [
+            # Keyset pagination order
+            models.Index(fields=['created_at', 'id']),
+            # Change feed order
+            models.Index(fields=['updated_at', 'id']),
+            # Patient counts per facility and status
+            models.Index(fields=['facility', 'status']),
+        ]
+
 class Assessment(models.Model):
     STATUS_CHOICES = (
         ('scheduled', 'Scheduled'),
@@ -260,10 +280,23 @@ class Assessment(models.Model):
         """Check if the scheduled assessment is overdue"""
         return self.status == 'scheduled' and self.scheduled_date < timezone.now()
 
+    class Meta:
+        indexes = [
+            # Keyset pagination order
+            models.Index(fields=['scheduled_date', 'id']),
+            # Change feed order
+            models.Index(fields=['updated_at', 'id']),
+            # Per-facility windows (metrics, snapshots, benchmarks)
+            models.Index(fields=['facility', 'scheduled_date', 'status']),
+            # Overdue and status filters across facilities
+            models.Index(fields=['status', 'scheduled_date']),
+        ]
+
 class IndicatorScore(models.Model):
     assessment = models.ForeignKey(Assessment, on_delete=models.CASCADE, related_name='indicator_scores')
     indicator = models.ForeignKey(Indicator, on_delete=models.CASCADE)
-    score = models.FloatField()
+    # 0-100; null when the indicator was rated "not applicable"
+    score = models.FloatField(null=True, blank=True)
     notes = models.TextField(blank=True, null=True)
     
     def __str__(self):
@@ -324,16 +357,49 @@ class Audit(models.Model):
 
     class Meta:
         ordering = ['-scheduled_date']
+        indexes = [
+            # Keyset pagination order
+            models.Index(fields=['scheduled_date', 'id']),
+            # Change feed order
+            models.Index(fields=['updated_at', 'id']),
+            # Completed audits per facility in a date window (benchmarks)
+            models.Index(fields=['facility', 'status', 'audit_date']),
+            # Overdue audits (check_missed_audits)
+            models.Index(fields=['status', 'scheduled_date']),
+        ]
+
+class AuditCriterionName(models.Model):
+    """Dictionary of audit criterion names; score rows refer to them by id"""
+    name = models.CharField(max_length=255, unique=True)
+
+    def __str__(self):
+        return self.name
+
+    @classmethod
+    def intern(cls, name, using=None):
+        """The AuditCriterionName row for ``name``, created if needed (on ``using``, or where the router writes)."""
+        criterion, _created = cls.objects.db_manager(using).get_or_create(name=name)
+        return criterion
 
 class AuditCriteria(models.Model):
     audit = models.ForeignKey(Audit, on_delete=models.CASCADE, related_name='criteria_scores')
-    criteria_name = models.CharField(max_length=255)
+    criterion = models.ForeignKey(AuditCriterionName, on_delete=models.PROTECT, related_name='scores')
     score = models.FloatField()
     notes = models.TextField(blank=True, null=True)
     
     def __str__(self):
         return f"{self.criteria_name}: {self.score}"
 
+    @property
+    def criteria_name(self):
+        return self.criterion.name
+
+    class Meta:
+        indexes = [
+            # Scores per criterion (audit_statistics)
+            models.Index(fields=['criterion', 'audit']),
+        ]
+
 class Report(models.Model):
     REPORT_TYPES = (
         ('assessment', 'Assessment Report'),
@@ -351,6 +417,7 @@ class Report(models.Model):
     generated_at = models.DateTimeField(default=timezone.now)
     file_path = models.CharField(max_length=255, blank=True, null=True)
     parameters = models.JSONField(blank=True, null=True)
+    updated_at = models.DateTimeField(auto_now=True)
     
     def __str__(self):
         return f"{self.title} - {self.report_type}"
@@ -409,6 +476,10 @@ class FacilityRanking(models.Model):
     class Meta:
         ordering = ['overall_rank', '-ranking_date']
         unique_together = ['facility', 'ranking_date']
+        indexes = [
+            # Latest ranking date and the rankings on it, in rank order
+            models.Index(fields=['ranking_date', 'overall_rank']),
+        ]
 
 class MetricSnapshot(models.Model):
     METRIC_TYPES = (
@@ -470,3 +541,39 @@ class FeedbackComment(models.Model):
 
     def __str__(self):
         return f"Comment on {self.feedback.title} by {self.added_by.username if self.added_by else 'Anonymous'}"
+
+class Tombstone(models.Model):
+    """A deleted row, kept so the /api/sync/ change feed can report deletes."""
+    id = models.BigAutoField(primary_key=True)
+    entity_type = models.CharField(max_length=20)
+    object_id = models.CharField(max_length=64)
+    facility_id = models.IntegerField(null=True, blank=True)
+    deleted_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.entity_type} {self.object_id} deleted {self.deleted_at}"
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['entity_type', 'id']),
+            models.Index(fields=['deleted_at']),
+        ]
+
+class SlowQuery(models.Model):
+    """Slow SQL statements aggregated by fingerprint (see slow_queries.py)."""
+    fingerprint_hash = models.CharField(max_length=40, unique=True)
+    fingerprint = models.TextField()
+    sample_sql = models.TextField()
+    plan = models.TextField(blank=True, default='')
+    origins = models.JSONField(default=dict)  # calling view/task -> count
+    count = models.PositiveIntegerField(default=0)
+    total_ms = models.FloatField(default=0)
+    max_ms = models.FloatField(default=0)
+    first_seen = models.DateTimeField(auto_now_add=True)
+    last_seen = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.count}x {self.max_ms:.0f}ms {self.fingerprint[:60]}"
+
+    class Meta:
+        verbose_name_plural = "Slow queries"
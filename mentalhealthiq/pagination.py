@@ -1,7 +1,226 @@
-from rest_framework.pagination import PageNumberPagination
- 
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+from .streaming import is_asgi, stream_json_array, wants_stream
+
+
 class StandardResultsSetPagination(PageNumberPagination):
     """Standard pagination class for API endpoints"""
     page_size = 10
     page_size_query_param = 'page_size'
-    max_page_size = 100 
\ No newline at end of file
+    max_page_size = 100
+
+
+class KeysetPagination(BasePagination):
+    """
+    Keyset (seek) pagination over a fixed, indexed ordering such as
+    ('-scheduled_date', '-id').
+
+    Each page is fetched with a WHERE clause on the last row seen instead of
+    an OFFSET, so deep pages cost the same as the first one. The ordering must
+    end with a unique column (normally the primary key) and none of its
+    columns may be NULL. Counts are only computed when asked for:
+    ``?count=exact`` runs a full COUNT(*), ``?count=approx`` counts at most
+    ``approx_count_cap`` rows.
+    """
+    page_size = 10
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    cursor_query_param = 'cursor'
+    mode_query_param = 'pagination'
+    count_query_param = 'count'
+    approx_count_cap = 10000
+    default_ordering = ('-created_at', '-id')
+    invalid_cursor_message = 'Invalid cursor'
+
+    @classmethod
+    def is_requested(cls, request):
+        """Keyset mode is opt-in: ?pagination=keyset or an existing cursor."""
+        params = request.query_params
+        return params.get(cls.mode_query_param) == 'keyset' or cls.cursor_query_param in params
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+        self.ordering = tuple(getattr(view, 'keyset_ordering', None) or self.default_ordering)
+        self.model = queryset.model
+
+        cursor = self.decode_cursor(request)
+        reverse = cursor['r'] if cursor else False
+
+        self.count = self.get_count(queryset, request)
+
+        ordering = self._reverse_ordering(self.ordering) if reverse else self.ordering
+        queryset = queryset.order_by(*ordering)
+        if cursor:
+            queryset = queryset.filter(self._seek_filter(ordering, cursor['v']))
+
+        results = list(queryset[:self.page_size + 1])
+        has_more = len(results) > self.page_size
+        results = results[:self.page_size]
+        if reverse:
+            results.reverse()
+
+        if reverse:
+            self.has_next = cursor is not None
+            self.has_previous = has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = cursor is not None
+
+        self.first_row = results[0] if results else None
+        self.last_row = results[-1] if results else None
+        return results
+
+    def get_paginated_response(self, data):
+        payload = {
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+        }
+        if self.count is not None:
+            payload['count'] = self.count['value']
+            payload['count_exact'] = self.count['exact']
+        payload['results'] = data
+        return Response(payload)
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'count': {'type': 'integer'},
+                'count_exact': {'type': 'boolean'},
+                'results': schema,
+            },
+        }
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        if page_size <= 0:
+            return self.page_size
+        return min(page_size, self.max_page_size)
+
+    def get_count(self, queryset, request):
+        mode = request.query_params.get(self.count_query_param)
+        if mode == 'exact':
+            return {'value': queryset.count(), 'exact': True}
+        if mode == 'approx':
+            # COUNT(*) over a LIMITed subquery stops scanning at the cap
+            value = queryset.order_by()[:self.approx_count_cap + 1].count()
+            return {'value': min(value, self.approx_count_cap), 'exact': value <= self.approx_count_cap}
+        return None
+
+    def get_next_link(self):
+        if not self.has_next or self.last_row is None:
+            return None
+        return self.encode_cursor(self.last_row, reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous or self.first_row is None:
+            return None
+        return self.encode_cursor(self.first_row, reverse=True)
+
+    def encode_cursor(self, row, reverse):
+        values = []
+        for field_name in self._field_names(self.ordering):
+            field = self.model._meta.get_field(field_name)
+            values.append(field.value_to_string(row))
+        token = json.dumps({'v': values, 'r': reverse}, separators=(',', ':'))
+        encoded = urlsafe_b64encode(token.encode('utf-8')).decode('ascii')
+        url = remove_query_param(self.base_url, self.mode_query_param)
+        return replace_query_param(url, self.cursor_query_param, encoded)
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            token = json.loads(urlsafe_b64decode(encoded.encode('ascii')).decode('utf-8'))
+            raw_values = token['v']
+            if len(raw_values) != len(self.ordering):
+                raise ValueError('Cursor does not match ordering')
+            values = [
+                self.model._meta.get_field(name).to_python(value)
+                for name, value in zip(self._field_names(self.ordering), raw_values)
+            ]
+            return {'v': values, 'r': bool(token.get('r', False))}
+        except Exception:
+            raise NotFound(self.invalid_cursor_message)
+
+    def _seek_filter(self, ordering, values):
+        return seek_filter(ordering, values)
+
+    @staticmethod
+    def _field_names(ordering):
+        return [field.lstrip('-') for field in ordering]
+
+    @staticmethod
+    def _reverse_ordering(ordering):
+        return tuple(field[1:] if field.startswith('-') else f'-{field}' for field in ordering)
+
+
+def seek_filter(ordering, values):
+    """
+    Build (a > x) OR (a = x AND b > y) ... for the given ordering so the
+    database can seek straight to the first row after (x, y, ...).
+
+    The redundant a >= x bound is what lets the planner turn the OR into
+    an index range search rather than a scan from the start of the index.
+    """
+    condition = Q()
+    equal_prefix = {}
+    for field, value in zip(ordering, values):
+        name = field.lstrip('-')
+        lookup = 'lt' if field.startswith('-') else 'gt'
+        condition |= Q(**equal_prefix, **{f'{name}__{lookup}': value})
+        equal_prefix[name] = value
+
+    leading = ordering[0]
+    bound = 'lte' if leading.startswith('-') else 'gte'
+    return Q(**{f'{leading.lstrip("-")}__{bound}': values[0]}) & condition
+
+
+def sub_resource_response(request, queryset, serializer_class, ordering, context=None):
+    """
+    Respond with a related collection such as a facility's patients.
+
+    ``?stream=true`` streams the whole collection as a JSON array,
+    ``?page=`` / ``?page_size=`` return a StandardResultsSetPagination page
+    and ``?pagination=keyset`` a KeysetPagination page over ``ordering``.
+    Without any of these the full array is returned as before, so existing
+    clients keep working. Related rows are loaded with the serializer's
+    setup_eager_loading() either way.
+    """
+    if context is None:
+        context = {'request': request}
+    setup_eager_loading = getattr(serializer_class, 'setup_eager_loading', None)
+    if setup_eager_loading is not None:
+        queryset = setup_eager_loading(queryset, set(serializer_class(context=context).fields))
+    queryset = queryset.order_by(*ordering)
+
+    if wants_stream(request):
+        return stream_json_array(queryset, serializer_class, context, asynchronous=is_asgi(request))
+
+    params = request.query_params
+    if KeysetPagination.is_requested(request):
+        paginator = KeysetPagination()
+        paginator.default_ordering = tuple(ordering)
+    elif 'page' in params or 'page_size' in params:
+        paginator = StandardResultsSetPagination()
+    else:
+        return Response(serializer_class(queryset, many=True, context=context).data)
+
+    page = paginator.paginate_queryset(queryset, request)
+    return paginator.get_paginated_response(serializer_class(page, many=True, context=context).data)
@@ -0,0 +1,206 @@
+"""
+Per-request performance records.
+
+PerformanceMiddleware (middleware.py) measures every request: wall time,
+number and total time of database queries, time spent in serializers and
+in the renderer, and response size. It adds them to the response as a
+Server-Timing header and appends them to an in-memory ring buffer
+(PERF_BUFFER_SIZE records per process) that /api/_perf/ summarises.
+
+Queries are grouped by fingerprint (the SQL with literals and IN lists
+collapsed); a fingerprint repeated PERF_N_PLUS_ONE_THRESHOLD times or more
+in one request is reported as a likely N+1.
+
+Queries run by run_concurrently() (concurrency.py) count towards the
+request that started them, so db time can exceed wall time; work done in
+sync_to_async threads is not counted.
+"""
+from collections import Counter, defaultdict, deque
+from contextvars import ContextVar
+import re
+import threading
+import time
+
+from django.conf import settings
+
+_current = ContextVar('perf_request_metrics', default=None)
+_buffer = None
+_buffer_lock = threading.Lock()
+
+_whitespace = re.compile(r'\s+')
+_string_literal = re.compile(r"'(?:[^']|'')*'")
+_number_literal = re.compile(r'\b\d+(?:\.\d+)?\b')
+_placeholder_list = re.compile(r'\((?:\s*(?:%s|\?)\s*,)+\s*(?:%s|\?)\s*\)')
+
+
+def sql_fingerprint(sql):
+    """Normalise SQL so the same query with different values groups together."""
+    sql = _string_literal.sub('?', sql)
+    sql = _number_literal.sub('?', sql)
+    sql = sql.replace('%s', '?')
+    sql = _placeholder_list.sub('(...)', sql)
+    return _whitespace.sub(' ', sql).strip()
+
+
+def buffer_size():
+    return getattr(settings, 'PERF_BUFFER_SIZE', 1000)
+
+
+def n_plus_one_threshold():
+    return getattr(settings, 'PERF_N_PLUS_ONE_THRESHOLD', 5)
+
+
+def get_buffer():
+    global _buffer
+    if _buffer is None or _buffer.maxlen != buffer_size():
+        with _buffer_lock:
+            if _buffer is None or _buffer.maxlen != buffer_size():
+                _buffer = deque(_buffer or (), maxlen=buffer_size())
+    return _buffer
+
+
+class RequestMetrics:
+    """Counters for the request being handled on this thread."""
+
+    def __init__(self, request=None):
+        self.request = request
+        self.start = time.perf_counter()
+        self.queries = 0
+        self.db_time = 0.0
+        self.fingerprints = Counter()
+        self.timings = defaultdict(float)
+        # Pool threads of run_concurrently() report into the same counters
+        self.lock = threading.Lock()
+
+    def __call__(self, execute, sql, params, many, context):
+        """connection.execute_wrapper hook."""
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - start
+            with self.lock:
+                self.db_time += elapsed
+                self.queries += 1
+                self.fingerprints[sql] += 1
+
+    def n_plus_one(self):
+        """(fingerprint, count) for queries repeated at least the threshold, worst first."""
+        repeated = Counter()
+        for sql, count in self.fingerprints.items():
+            repeated[sql_fingerprint(sql)] += count
+        threshold = n_plus_one_threshold()
+        return [(sql, count) for sql, count in repeated.most_common() if count >= threshold]
+
+
+def start_request(request=None):
+    metrics = RequestMetrics(request)
+    return metrics, _current.set(metrics)
+
+
+def finish_request(token):
+    _current.reset(token)
+
+
+def current_metrics():
+    """Metrics of the request being measured in this context, if any."""
+    return _current.get()
+
+
+def request_route(request):
+    """'GET facility-list' style name for the view handling the request."""
+    match = request.resolver_match
+    route = (match.view_name or match.route) if match else '<unresolved>'
+    return f'{request.method} {route}'
+
+
+def current_route():
+    """Route of the request being handled on this thread, if any."""
+    metrics = _current.get()
+    if metrics is None or metrics.request is None:
+        return None
+    return request_route(metrics.request)
+
+
+def record_timing(name, seconds):
+    """Add time spent in a named phase (serialize, render...) to the current request."""
+    metrics = _current.get()
+    if metrics is not None:
+        metrics.timings[name] += seconds
+
+
+class timed:
+    """Context manager form of record_timing()."""
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        record_timing(self.name, time.perf_counter() - self.start)
+        return False
+
+
+def store(record):
+    get_buffer().append(record)
+
+
+def clear():
+    get_buffer().clear()
+
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    index = max(0, min(len(sorted_values) - 1, round(fraction * len(sorted_values) + 0.5) - 1))
+    return sorted_values[index]
+
+
+def summarize(limit=20):
+    """Per-route latency percentiles and the worst N+1 offenders in the buffer."""
+    records = list(get_buffer())
+    by_route = defaultdict(list)
+    offenders = {}
+    for record in records:
+        by_route[record['route']].append(record)
+        for fingerprint, count in record['n_plus_one']:
+            key = (record['route'], fingerprint)
+            entry = offenders.setdefault(key, {
+                'route': record['route'], 'fingerprint': fingerprint,
+                'max_repeats': 0, 'requests': 0, 'example_path': record['path'],
+            })
+            entry['requests'] += 1
+            if count > entry['max_repeats']:
+                entry['max_repeats'] = count
+                entry['example_path'] = record['path']
+
+    routes = []
+    for route, items in by_route.items():
+        durations = sorted(item['total_ms'] for item in items)
+        count = len(items)
+        routes.append({
+            'route': route,
+            'count': count,
+            'p50_ms': round(percentile(durations, 0.50), 2),
+            'p95_ms': round(percentile(durations, 0.95), 2),
+            'p99_ms': round(percentile(durations, 0.99), 2),
+            'max_ms': round(durations[-1], 2),
+            'avg_queries': round(sum(item['queries'] for item in items) / count, 1),
+            'max_queries': max(item['queries'] for item in items),
+            'avg_db_ms': round(sum(item['db_ms'] for item in items) / count, 2),
+            'avg_serialize_ms': round(sum(item['serialize_ms'] for item in items) / count, 2),
+            'avg_bytes': round(sum(item['bytes'] or 0 for item in items) / count),
+        })
+    routes.sort(key=lambda item: item['p95_ms'], reverse=True)
+
+    worst = sorted(offenders.values(), key=lambda item: (item['max_repeats'], item['requests']), reverse=True)
+    return {
+        'requests': len(records),
+        'buffer_size': buffer_size(),
+        'routes': routes[:limit],
+        'n_plus_one': worst[:limit],
+    }
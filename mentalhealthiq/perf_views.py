@@ -0,0 +1,25 @@
+from rest_framework.authentication import SessionAuthentication
+from rest_framework.decorators import api_view, authentication_classes, permission_classes
+from rest_framework.response import Response
+from . import perf
+from .permissions import IsAdminRole
+
+@api_view(['GET', 'DELETE'])
+@authentication_classes([SessionAuthentication])
+@permission_classes([IsAdminRole])
+def perf_summary_view(request):
+    """
+    Per-route latency percentiles (p50/p95/p99), query counts and the worst
+    N+1 offenders from this process's request buffer. DELETE clears it.
+
+    Admin only: needs a Django session (e.g. logged in through /admin/) for a
+    staff user or a user with the admin or superuser role.
+    """
+    if request.method == 'DELETE':
+        perf.clear()
+        return Response(status=204)
+    try:
+        limit = max(1, int(request.query_params.get('limit', 20)))
+    except ValueError:
+        limit = 20
+    return Response(perf.summarize(limit=limit))
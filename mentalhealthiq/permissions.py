@@ -0,0 +1,11 @@
+from rest_framework.permissions import BasePermission
+
+
+class IsAdminRole(BasePermission):
+    """Logged-in staff users or users whose role is admin or superuser."""
+
+    def has_permission(self, request, view):
+        user = request.user
+        if not user or not user.is_authenticated:
+            return False
+        return bool(user.is_staff or getattr(user, 'role', None) in ('admin', 'superuser'))
@@ -0,0 +1,95 @@
+"""
+Faster response rendering for the REST API.
+
+FastJSONRenderer encodes with orjson when it is installed, which handles
+UUID, datetime, date and dataclass values natively and is several times
+quicker than the stdlib encoder on large list responses; everything else
+(Decimal, lazy strings, querysets...) goes through DRF's JSONEncoder so the
+output matches the stock JSONRenderer. Without orjson it is the stock
+renderer.
+
+MessagePackRenderer / MessagePackParser speak application/msgpack when the
+msgpack package is installed, negotiated through Accept / Content-Type.
+"""
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+from . import perf
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - optional dependency
+    msgpack = None
+
+_fallback_encoder = JSONEncoder()
+
+# DRF writes UTC datetimes with a trailing Z and accepts non-string dict keys
+ORJSON_OPTIONS = (orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS) if orjson else 0
+
+
+def _default(obj):
+    """Types orjson/msgpack do not know about are converted the way DRF does it."""
+    return _fallback_encoder.default(obj)
+
+
+def json_dumps(data):
+    """Encode data to UTF-8 JSON bytes with orjson when available."""
+    if orjson is not None:
+        return orjson.dumps(data, default=_default, option=ORJSON_OPTIONS)
+    return _fallback_encoder.encode(data).encode('utf-8')
+
+
+class FastJSONRenderer(JSONRenderer):
+    """JSONRenderer that uses orjson for compact output and the stdlib otherwise."""
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        with perf.timed('render'):
+            return self._render(data, accepted_media_type, renderer_context)
+
+    def _render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        if orjson is None or self.get_indent(accepted_media_type or '', renderer_context or {}):
+            # Indented output is only asked for by humans; keep the stock formatting
+            return super().render(data, accepted_media_type, renderer_context)
+        ret = orjson.dumps(data, default=_default, option=ORJSON_OPTIONS)
+        # Same escaping as JSONRenderer so the output can be embedded in <script>
+        if b'\xe2\x80' in ret:
+            ret = ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+        return ret
+
+
+class MessagePackRenderer(BaseRenderer):
+    """Renders responses as MessagePack (requires the msgpack package)."""
+    media_type = 'application/msgpack'
+    format = 'msgpack'
+    charset = None
+    render_style = 'binary'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        if msgpack is None:
+            raise RuntimeError('MessagePackRenderer requires the msgpack package')
+        with perf.timed('render'):
+            return msgpack.packb(data, default=_default, use_bin_type=True, datetime=False)
+
+
+class MessagePackParser(BaseParser):
+    """Parses MessagePack request bodies (requires the msgpack package)."""
+    media_type = 'application/msgpack'
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        if msgpack is None:
+            raise ParseError('MessagePack is not supported on this server')
+        try:
+            return msgpack.unpackb(stream.read(), raw=False, strict_map_key=False)
+        except Exception as exc:
+            raise ParseError(f'MessagePack parse error - {exc}')
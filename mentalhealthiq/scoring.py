@@ -0,0 +1,189 @@
+"""
+Assessment scores computed from indicator weights.
+
+An assessment's score is derived from its IndicatorScore rows the way the
+evaluation screen derives it (calculateWeightedScoreWithExclusions in
+src/utils/ratingUtils.ts): per criterion, the weighted mean of the
+indicator scores (sum(score * weight) / sum(weight)) rounded to a whole
+number, then the plain mean of those criterion scores, rounded to one
+decimal. Rounding is half up, like the client's Math.round. "Not
+applicable" ratings are stored as a null score and left out of both sums;
+a criterion with nothing but them scores 0, as on the client.
+
+Recomputing is set-based: each chunk of assessment ids costs one GROUP BY
+query over indicator_score joined to indicator, and one executemany() of a
+prepared single-row UPDATE for the rows whose score actually changed
+(updated_at is bumped too, so the change feed and live events pick the new
+scores up). Chunks are found by walking the assessment primary key, so
+finding the next chunk costs the same at the end of the table as at the
+start. Chunks are independent, so they can run in parallel: the
+recompute_scores command takes --workers, and the
+recompute_assessment_scores Celery task fans chunks out to workers.
+
+When a criterion's indicator weights change, AssessmentCriteriaSerializer
+queues recompute_assessment_scores for that criterion once the transaction
+commits. Bulk submissions (AssessmentViewSet.bulk_create) score their new
+assessments with recompute_chunk() in the same transaction.
+
+Audit.overall_score is outside this: audits are rated per named criterion
+(AuditCriteria), with no indicators or weights behind them, so a weight
+change cannot make an audit score stale.
+"""
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+import logging
+import math
+
+from django.conf import settings
+from django.db import connection, connections, transaction
+from django.db.models import Exists, F, OuterRef, Q, Sum
+from django.utils import timezone
+
+from .models import Assessment, IndicatorScore
+
+logger = logging.getLogger(__name__)
+
+
+def chunk_size():
+    return getattr(settings, 'SCORE_RECOMPUTE_CHUNK_SIZE', 2000)
+
+
+def round_half_up(value, digits=0):
+    """Round like the client's Math.round (scores are never negative)."""
+    factor = 10 ** digits
+    return math.floor(value * factor + 0.5) / factor
+
+
+def criterion_score(weighted, total_weight):
+    """Whole-number score of one criterion from sum(score * weight) and sum(weight) of its rated indicators."""
+    return round_half_up(weighted / total_weight) if total_weight else 0
+
+
+def overall_score(criterion_scores):
+    return round_half_up(sum(criterion_scores) / len(criterion_scores), 1)
+
+
+def weighted_scores(assessment_ids):
+    """{assessment id: score} for the given assessments that have indicator scores."""
+    rows = IndicatorScore.objects.filter(assessment_id__in=assessment_ids).values(
+        'assessment_id', 'indicator__criteria_id'
+    ).annotate(
+        # SUM skips the null products of "not applicable" scores
+        weighted=Sum(F('score') * F('indicator__weight')),
+        total_weight=Sum('indicator__weight', filter=Q(score__isnull=False)),
+    ).order_by()
+
+    criterion_scores = defaultdict(list)
+    for row in rows:
+        criterion_scores[row['assessment_id']].append(criterion_score(row['weighted'], row['total_weight']))
+    return {
+        assessment_id: overall_score(scores)
+        for assessment_id, scores in criterion_scores.items()
+    }
+
+
+def recompute_chunk(assessment_ids):
+    """Store fresh scores for one chunk of assessments; returns how many changed."""
+    scores = weighted_scores(assessment_ids)
+    if not scores:
+        return 0
+    # Scheduled assessments always keep a score of 0 (see Assessment.save)
+    current = Assessment.objects.filter(id__in=list(scores)).exclude(status='scheduled').values_list('id', 'score')
+    changed = [
+        (assessment_id, scores[assessment_id])
+        for assessment_id, score in current
+        if score != scores[assessment_id]
+    ]
+    if changed:
+        _store_scores(changed)
+    return len(changed)
+
+
+def _store_scores(changed):
+    """
+    UPDATE score and updated_at for (id, score) pairs. A prepared single-row
+    UPDATE run with executemany() is much cheaper per row than bulk_update()'s
+    CASE expression, which every backend evaluates row by row.
+    """
+    meta = Assessment._meta
+    quote = connection.ops.quote_name
+    sql = 'UPDATE {} SET {} = %s, {} = %s WHERE {} = %s'.format(
+        quote(meta.db_table), quote('score'), quote('updated_at'), quote(meta.pk.column),
+    )
+    updated_at = meta.get_field('updated_at').get_db_prep_value(timezone.now(), connection)
+    params = [
+        (score, updated_at, meta.pk.get_db_prep_value(assessment_id, connection))
+        for assessment_id, score in changed
+    ]
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.executemany(sql, params)
+
+
+def assessment_id_chunks(criteria_id=None, size=None):
+    """
+    Yield lists of ids of assessments that have indicator scores (on
+    ``criteria_id``'s indicators, if given), walking the primary key.
+    """
+    size = size or chunk_size()
+    scored = IndicatorScore.objects.filter(assessment=OuterRef('pk'))
+    if criteria_id is not None:
+        scored = scored.filter(indicator__criteria_id=criteria_id)
+    ids = Assessment.objects.exclude(status='scheduled').filter(Exists(scored)).order_by('pk').values_list('pk', flat=True)
+    last = None
+    while True:
+        page = ids.filter(pk__gt=last) if last is not None else ids
+        chunk = list(page[:size])
+        if not chunk:
+            return
+        yield chunk
+        last = chunk[-1]
+
+
+def _recompute_chunk_in_thread(assessment_ids):
+    try:
+        return recompute_chunk(assessment_ids)
+    finally:
+        connections.close_all()
+
+
+def recompute_scores(criteria_id=None, size=None, workers=1):
+    """Recompute every affected assessment; returns (assessments checked, scores changed)."""
+    checked = changed = 0
+    if workers <= 1:
+        for chunk in assessment_id_chunks(criteria_id, size):
+            checked += len(chunk)
+            changed += recompute_chunk(chunk)
+        return checked, changed
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='score-recompute') as executor:
+        pending = []
+        for chunk in assessment_id_chunks(criteria_id, size):
+            checked += len(chunk)
+            pending.append(executor.submit(_recompute_chunk_in_thread, chunk))
+            # Keep a bounded number of chunks in flight
+            if len(pending) >= workers * 2:
+                changed += pending.pop(0).result()
+        changed += sum(future.result() for future in pending)
+    return checked, changed
+
+
+def schedule_recompute(criteria_id):
+    """Queue a recompute for one criterion after the current transaction commits."""
+    def enqueue():
+        from .tasks import recompute_assessment_scores
+        # Fail fast when Redis is down instead of holding the request that
+        # changed the weights: no broker connection or publish retries, and no
+        # subscription to the result backend for a result nobody reads
+        app = recompute_assessment_scores.app
+        try:
+            with app.connection_for_write(transport_options={'max_retries': 0}) as broker:
+                recompute_assessment_scores.apply_async(
+                    (criteria_id,), connection=broker, retry=False, ignore_result=True,
+                )
+        except Exception:
+            logger.warning(
+                'Could not queue score recompute for criterion %s; run '
+                '"manage.py recompute_scores --criteria %s"', criteria_id, criteria_id,
+                exc_info=True,
+            )
+    transaction.on_commit(enqueue)
@@ -0,0 +1,559 @@
+"""
+Full-text search helpers.
+
+Patients are indexed in an SQLite FTS5 table using the trigram tokenizer, so
+any fragment of three or more characters of a name, national ID, phone number
+or facility name is an index lookup instead of a LIKE scan over the patient
+table. The index is maintained by triggers, which also covers bulk_create()
+and queryset.update(). Its documents are keyed on the patient's primary key
+through a small key table, not on the patient table's rowid, which VACUUM and
+table rebuilds renumber.
+
+The same approach backs the unified cross-entity index used by /api/search/:
+one FTS5 table holding a typed title/subtitle/body document per facility,
+patient, staff member, assessment and audit, keyed on (entity type, primary
+key) through its own key table, so each trigger replaces exactly one document.
+
+On other database backends, and for search terms too short to form a trigram,
+the search falls back to the plain icontains filters.
+
+The triggers are dropped before every migrate run and reinstalled, with a
+reindex, afterwards (see drop_search_triggers()), so migrations never see
+them. ``manage.py rebuild_search_index`` recreates everything by hand.
+"""
+from django.db import connection as default_connection, connections
+from django.db.models import BooleanField, Case, IntegerField, Q, Value, When
+from django.db.models.expressions import RawSQL
+
+from .models import Assessment, Audit, Facility, Patient, StaffMember
+
+PATIENT_FTS_TABLE = 'mentalhealthiq_patient_fts'
+PATIENT_FTS_KEYS_TABLE = 'mentalhealthiq_patient_fts_keys'
+PATIENT_SEARCH_FIELDS = ['first_name', 'last_name', 'national_id', 'phone', 'facility__name']
+TRIGRAM_LENGTH = 3
+
+_FACILITY_NAME = "(SELECT name FROM mentalhealthiq_facility WHERE id = new.facility_id)"
+# The document rowid for a patient, looked up by primary key
+_PATIENT_DOC = f"(SELECT doc FROM {PATIENT_FTS_KEYS_TABLE} WHERE patient_id = {{row}}.id)"
+
+_PATIENT_FTS_TABLES = [
+    f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS {PATIENT_FTS_TABLE} USING fts5(
+        patient_id UNINDEXED,
+        first_name,
+        last_name,
+        national_id,
+        phone,
+        facility_name,
+        tokenize = 'trigram'
+    )
+    """,
+    f"CREATE TABLE IF NOT EXISTS {PATIENT_FTS_KEYS_TABLE} (doc INTEGER PRIMARY KEY, patient_id TEXT NOT NULL UNIQUE)",
+]
+
+_PATIENT_FTS_TRIGGERS = {
+    f'{PATIENT_FTS_TABLE}_ai': f"""
+    CREATE TRIGGER IF NOT EXISTS {PATIENT_FTS_TABLE}_ai AFTER INSERT ON mentalhealthiq_patient BEGIN
+        INSERT INTO {PATIENT_FTS_KEYS_TABLE} (patient_id) VALUES (new.id);
+        INSERT INTO {PATIENT_FTS_TABLE} (rowid, patient_id, first_name, last_name, national_id, phone, facility_name)
+        VALUES ({_PATIENT_DOC.format(row='new')}, new.id, new.first_name, new.last_name, new.national_id, new.phone,
+                {_FACILITY_NAME});
+    END
+    """,
+    f'{PATIENT_FTS_TABLE}_au': f"""
+    CREATE TRIGGER IF NOT EXISTS {PATIENT_FTS_TABLE}_au
+    AFTER UPDATE OF id, first_name, last_name, national_id, phone, facility_id ON mentalhealthiq_patient BEGIN
+        DELETE FROM {PATIENT_FTS_TABLE} WHERE rowid = {_PATIENT_DOC.format(row='old')};
+        UPDATE {PATIENT_FTS_KEYS_TABLE} SET patient_id = new.id WHERE patient_id = old.id;
+        INSERT INTO {PATIENT_FTS_TABLE} (rowid, patient_id, first_name, last_name, national_id, phone, facility_name)
+        VALUES ({_PATIENT_DOC.format(row='new')}, new.id, new.first_name, new.last_name, new.national_id, new.phone,
+                {_FACILITY_NAME});
+    END
+    """,
+    f'{PATIENT_FTS_TABLE}_ad': f"""
+    CREATE TRIGGER IF NOT EXISTS {PATIENT_FTS_TABLE}_ad AFTER DELETE ON mentalhealthiq_patient BEGIN
+        DELETE FROM {PATIENT_FTS_TABLE} WHERE rowid = {_PATIENT_DOC.format(row='old')};
+        DELETE FROM {PATIENT_FTS_KEYS_TABLE} WHERE patient_id = old.id;
+    END
+    """,
+    f'{PATIENT_FTS_TABLE}_facility_au': f"""
+    CREATE TRIGGER IF NOT EXISTS {PATIENT_FTS_TABLE}_facility_au AFTER UPDATE OF name ON mentalhealthiq_facility BEGIN
+        UPDATE {PATIENT_FTS_TABLE} SET facility_name = new.name
+        WHERE rowid IN (
+            SELECT k.doc FROM mentalhealthiq_patient p JOIN {PATIENT_FTS_KEYS_TABLE} k ON k.patient_id = p.id
+            WHERE p.facility_id = new.id
+        );
+    END
+    """,
+}
+
+_PATIENT_FTS_REBUILD = [
+    f"DELETE FROM {PATIENT_FTS_TABLE}",
+    f"DELETE FROM {PATIENT_FTS_KEYS_TABLE}",
+    f"INSERT INTO {PATIENT_FTS_KEYS_TABLE} (patient_id) SELECT id FROM mentalhealthiq_patient",
+    f"""
+    INSERT INTO {PATIENT_FTS_TABLE} (rowid, patient_id, first_name, last_name, national_id, phone, facility_name)
+    SELECT k.doc, p.id, p.first_name, p.last_name, p.national_id, p.phone, f.name
+    FROM mentalhealthiq_patient p
+    JOIN {PATIENT_FTS_KEYS_TABLE} k ON k.patient_id = p.id
+    LEFT JOIN mentalhealthiq_facility f ON f.id = p.facility_id
+    """,
+]
+
+
+def _drop_triggers(cursor, names):
+    for name in names:
+        cursor.execute(f"DROP TRIGGER IF EXISTS {name}")
+
+
+def _existing(connection, names):
+    """The subset of the given table/trigger names present in the schema."""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"SELECT name FROM sqlite_master WHERE name IN ({', '.join(['%s'] * len(names))})", list(names)
+        )
+        return {row[0] for row in cursor.fetchall()}
+
+
+def install_patient_index(connection=default_connection):
+    """
+    Create the patient FTS table and triggers, then reindex every patient.
+
+    Safe to run repeatedly; drop_search_triggers() and restore_search_indexes()
+    call it around migrations, see there.
+    """
+    if connection.vendor != 'sqlite':
+        return False
+    with connection.cursor() as cursor:
+        for statement in _PATIENT_FTS_TABLES + list(_PATIENT_FTS_TRIGGERS.values()) + _PATIENT_FTS_REBUILD:
+            cursor.execute(statement)
+    return True
+
+
+def drop_patient_index(connection=default_connection):
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        _drop_triggers(cursor, _PATIENT_FTS_TRIGGERS)
+        cursor.execute(f"DROP TABLE IF EXISTS {PATIENT_FTS_TABLE}")
+        cursor.execute(f"DROP TABLE IF EXISTS {PATIENT_FTS_KEYS_TABLE}")
+
+
+def patient_index_available(connection=default_connection):
+    """True when the FTS tables and every sync trigger exist on this connection."""
+    if connection.vendor != 'sqlite':
+        return False
+    names = [PATIENT_FTS_TABLE, PATIENT_FTS_KEYS_TABLE, *_PATIENT_FTS_TRIGGERS]
+    return len(_existing(connection, names)) == len(names)
+
+
+def fts_match_expression(term):
+    """
+    Turn user input into an FTS5 MATCH expression.
+
+    Every word becomes a quoted phrase (so punctuation in phone numbers or IDs
+    cannot be parsed as query syntax) and the phrases are ANDed. Words shorter
+    than a trigram can never match and are dropped. Returns None when nothing
+    searchable is left.
+    """
+    words = [word for word in term.split() if len(word) >= TRIGRAM_LENGTH]
+    if not words:
+        return None
+    return ' '.join('"{}"'.format(word.replace('"', '""')) for word in words)
+
+
+def icontains_filter(term, fields):
+    """The pre-FTS behaviour: every word must appear in one of the fields."""
+    condition = Q()
+    for word in term.split():
+        word_condition = Q()
+        for field in fields:
+            word_condition |= Q(**{f'{field}__icontains': word})
+        condition &= word_condition
+    return condition
+
+
+def patient_relevance(term):
+    """
+    Relevance of a matched patient: 0 for an exact ID, national ID or phone
+    hit, 1 when a name starts with the first search word, 2 otherwise.
+
+    This is evaluated only on rows the index already matched. bm25() would
+    need the FTS table to drive a join, which SQLite's planner does not
+    guarantee once facility/status filters are also applied.
+    """
+    first_word = term.split()[0]
+    return Case(
+        When(Q(id__iexact=term) | Q(national_id__iexact=term) | Q(phone=term), then=Value(0)),
+        When(Q(first_name__istartswith=first_word) | Q(last_name__istartswith=first_word), then=Value(1)),
+        default=Value(2),
+        output_field=IntegerField(),
+    )
+
+
+def search_patients(queryset, term, rank=True):
+    """
+    Filter a Patient queryset down to rows matching ``term``.
+
+    The result is annotated with ``search_rank`` (lower is better) and, when
+    ``rank`` is true, ordered by it and then by name.
+    """
+    term = (term or '').strip()
+    if not term:
+        return queryset
+
+    match = fts_match_expression(term)
+    short_words = [word for word in term.split() if len(word) < TRIGRAM_LENGTH]
+    if match is None or not patient_index_available():
+        queryset = queryset.filter(icontains_filter(term, PATIENT_SEARCH_FIELDS))
+    else:
+        # id IN (...) makes the index the driving side of the plan: SQLite
+        # materialises the matching ids once and seeks the patient primary key
+        table = queryset.model._meta.db_table
+        queryset = queryset.filter(
+            RawSQL(
+                f'"{table}"."id" IN (SELECT patient_id FROM {PATIENT_FTS_TABLE} WHERE {PATIENT_FTS_TABLE} MATCH %s)',
+                [match],
+                output_field=BooleanField(),
+            )
+        )
+        if short_words:
+            # e.g. "Jo Smith": index on "Smith", then narrow with the short word
+            queryset = queryset.filter(icontains_filter(' '.join(short_words), PATIENT_SEARCH_FIELDS))
+
+    queryset = queryset.annotate(search_rank=patient_relevance(term))
+    if rank:
+        queryset = queryset.order_by('search_rank', 'last_name', 'first_name', 'pk')
+    return queryset
+
+
+SEARCH_INDEX_TABLE = 'mentalhealthiq_search_index'
+SEARCH_INDEX_KEYS_TABLE = 'mentalhealthiq_search_index_keys'
+
+# Per entity type: source table, the columns the document is built from, and
+# SQL expressions for the indexed document. "{row}" is the trigger's NEW row
+# or the table alias used when rebuilding.
+SEARCH_ENTITIES = {
+    'facility': {
+        'model': Facility,
+        'table': 'mentalhealthiq_facility',
+        'columns': 'id, name, facility_type, district, address, province, contact_name',
+        'facility_id': "{row}.id",
+        'title': "{row}.name",
+        'subtitle': "{row}.facility_type || ' - ' || {row}.district",
+        'body': "coalesce({row}.address, '') || ' ' || {row}.province || ' ' || coalesce({row}.contact_name, '')",
+    },
+    'patient': {
+        'model': Patient,
+        'table': 'mentalhealthiq_patient',
+        'columns': 'id, facility_id, first_name, last_name, national_id, phone, email',
+        'facility_id': "{row}.facility_id",
+        'title': "{row}.first_name || ' ' || {row}.last_name",
+        'subtitle': "{row}.id || ' ' || coalesce({row}.national_id, '')",
+        'body': "coalesce({row}.phone, '') || ' ' || coalesce({row}.email, '')",
+    },
+    'staff': {
+        'model': StaffMember,
+        'table': 'mentalhealthiq_staffmember',
+        'columns': 'id, facility_id, name, position, department, email, phone',
+        'facility_id': "{row}.facility_id",
+        'title': "{row}.name",
+        'subtitle': "{row}.position || ' - ' || {row}.department",
+        'body': "{row}.email || ' ' || {row}.phone",
+    },
+    'assessment': {
+        'model': Assessment,
+        'table': 'mentalhealthiq_assessment',
+        'columns': 'id, facility_id, patient_id, status, scheduled_date, notes, missed_reason',
+        'facility_id': "{row}.facility_id",
+        'title': "(SELECT first_name || ' ' || last_name FROM mentalhealthiq_patient WHERE id = {row}.patient_id)",
+        'subtitle': "{row}.status || ' ' || substr({row}.scheduled_date, 1, 10)",
+        'body': "coalesce({row}.notes, '') || ' ' || coalesce({row}.missed_reason, '')",
+    },
+    'audit': {
+        'model': Audit,
+        'table': 'mentalhealthiq_audit',
+        'columns': 'id, facility_id, status, scheduled_date, notes, missed_reason',
+        'facility_id': "{row}.facility_id",
+        'title': "(SELECT name FROM mentalhealthiq_facility WHERE id = {row}.facility_id)",
+        'subtitle': "{row}.status || ' ' || substr({row}.scheduled_date, 1, 10)",
+        'body': "coalesce({row}.notes, '') || ' ' || coalesce({row}.missed_reason, '')",
+    },
+}
+
+# Documents that embed another table's column, refreshed when that column changes:
+# (source table, watched columns, dependent entity, FK column on the dependent table, new title)
+_SEARCH_DEPENDENCIES = [
+    ('mentalhealthiq_patient', 'first_name, last_name', 'assessment', 'patient_id',
+     "new.first_name || ' ' || new.last_name"),
+    ('mentalhealthiq_facility', 'name', 'audit', 'facility_id', "new.name"),
+]
+
+# bm25 weights, in column order: a hit in the title counts most
+_SEARCH_WEIGHTS = '0, 0, 0, 10.0, 4.0, 1.0'
+
+
+def _search_doc(name, row):
+    """The document rowid for a source row, looked up by entity type and primary key."""
+    return f"(SELECT doc FROM {SEARCH_INDEX_KEYS_TABLE} WHERE entity_type = '{name}' AND object_id = {row}.id)"
+
+
+def _search_document(name, row, doc):
+    entity = SEARCH_ENTITIES[name]
+    return ', '.join([
+        doc,
+        f"'{name}'",
+        f"{row}.id",
+        entity['facility_id'].format(row=row),
+        entity['title'].format(row=row),
+        entity['subtitle'].format(row=row),
+        entity['body'].format(row=row),
+    ])
+
+
+_SEARCH_COLUMNS = 'rowid, entity_type, object_id, facility_id, title, subtitle, body'
+
+_SEARCH_INDEX_TABLES = [
+    f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_INDEX_TABLE} USING fts5(
+        entity_type UNINDEXED,
+        object_id UNINDEXED,
+        facility_id UNINDEXED,
+        title,
+        subtitle,
+        body,
+        tokenize = 'trigram'
+    )
+    """,
+    # object_id has no declared type, so integer and text keys are stored as is
+    f"""
+    CREATE TABLE IF NOT EXISTS {SEARCH_INDEX_KEYS_TABLE} (
+        doc INTEGER PRIMARY KEY, entity_type TEXT NOT NULL, object_id NOT NULL, UNIQUE (entity_type, object_id)
+    )
+    """,
+]
+
+
+def _search_index_triggers():
+    """{trigger name: CREATE TRIGGER statement}"""
+    triggers = {}
+    for name, entity in SEARCH_ENTITIES.items():
+        table = entity['table']
+        prefix = f'{SEARCH_INDEX_TABLE}_{name}'
+        triggers[f'{prefix}_ai'] = f"""
+            CREATE TRIGGER IF NOT EXISTS {prefix}_ai AFTER INSERT ON {table} BEGIN
+                INSERT INTO {SEARCH_INDEX_KEYS_TABLE} (entity_type, object_id) VALUES ('{name}', new.id);
+                INSERT INTO {SEARCH_INDEX_TABLE} ({_SEARCH_COLUMNS})
+                VALUES ({_search_document(name, 'new', _search_doc(name, 'new'))});
+            END
+        """
+        triggers[f'{prefix}_au'] = f"""
+            CREATE TRIGGER IF NOT EXISTS {prefix}_au
+            AFTER UPDATE OF {entity['columns']} ON {table} BEGIN
+                DELETE FROM {SEARCH_INDEX_TABLE} WHERE rowid = {_search_doc(name, 'old')};
+                UPDATE {SEARCH_INDEX_KEYS_TABLE} SET object_id = new.id
+                WHERE entity_type = '{name}' AND object_id = old.id;
+                INSERT INTO {SEARCH_INDEX_TABLE} ({_SEARCH_COLUMNS})
+                VALUES ({_search_document(name, 'new', _search_doc(name, 'new'))});
+            END
+        """
+        triggers[f'{prefix}_ad'] = f"""
+            CREATE TRIGGER IF NOT EXISTS {prefix}_ad AFTER DELETE ON {table} BEGIN
+                DELETE FROM {SEARCH_INDEX_TABLE} WHERE rowid = {_search_doc(name, 'old')};
+                DELETE FROM {SEARCH_INDEX_KEYS_TABLE} WHERE entity_type = '{name}' AND object_id = old.id;
+            END
+        """
+    for source, watched, dependent, fk_column, title in _SEARCH_DEPENDENCIES:
+        trigger = f'{SEARCH_INDEX_TABLE}_{dependent}_{fk_column}_au'
+        triggers[trigger] = f"""
+            CREATE TRIGGER IF NOT EXISTS {trigger}
+            AFTER UPDATE OF {watched} ON {source} BEGIN
+                UPDATE {SEARCH_INDEX_TABLE} SET title = {title}
+                WHERE rowid IN (
+                    SELECT k.doc FROM {SEARCH_ENTITIES[dependent]['table']} d
+                    JOIN {SEARCH_INDEX_KEYS_TABLE} k ON k.entity_type = '{dependent}' AND k.object_id = d.id
+                    WHERE d.{fk_column} = new.id
+                );
+            END
+        """
+    return triggers
+
+
+def _search_index_rebuild():
+    statements = [f"DELETE FROM {SEARCH_INDEX_TABLE}", f"DELETE FROM {SEARCH_INDEX_KEYS_TABLE}"]
+    for name, entity in SEARCH_ENTITIES.items():
+        statements += [
+            f"INSERT INTO {SEARCH_INDEX_KEYS_TABLE} (entity_type, object_id) SELECT '{name}', id FROM {entity['table']}",
+            f"INSERT INTO {SEARCH_INDEX_TABLE} ({_SEARCH_COLUMNS}) "
+            f"SELECT {_search_document(name, 't', 'k.doc')} FROM {entity['table']} t "
+            f"JOIN {SEARCH_INDEX_KEYS_TABLE} k ON k.entity_type = '{name}' AND k.object_id = t.id",
+        ]
+    return statements
+
+
+def install_search_index(connection=default_connection):
+    """Create the unified search index and its triggers, then reindex everything."""
+    if connection.vendor != 'sqlite':
+        return False
+    with connection.cursor() as cursor:
+        for statement in _SEARCH_INDEX_TABLES + list(_search_index_triggers().values()) + _search_index_rebuild():
+            cursor.execute(statement)
+    return True
+
+
+def drop_search_index(connection=default_connection):
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        _drop_triggers(cursor, _search_index_triggers())
+        cursor.execute(f"DROP TABLE IF EXISTS {SEARCH_INDEX_TABLE}")
+        cursor.execute(f"DROP TABLE IF EXISTS {SEARCH_INDEX_KEYS_TABLE}")
+
+
+def search_index_available(connection=default_connection):
+    """True when the index tables and every sync trigger exist on this connection."""
+    if connection.vendor != 'sqlite':
+        return False
+    names = [SEARCH_INDEX_TABLE, SEARCH_INDEX_KEYS_TABLE, *_search_index_triggers()]
+    return len(_existing(connection, names)) == len(names)
+
+
+def drop_search_triggers(connection=default_connection):
+    """
+    Drop the index sync triggers, keeping the indexed data.
+
+    The triggers on each table read the others (patient and audit documents
+    embed a facility name, assessment documents a patient name, and renaming
+    a facility or patient rewrites those documents), so while they exist
+    SQLite cannot rebuild one of those tables for a migration. Runs before migrate; restore_search_indexes() puts the
+    triggers back afterwards.
+    """
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        _drop_triggers(cursor, _PATIENT_FTS_TRIGGERS)
+        _drop_triggers(cursor, _search_index_triggers())
+
+
+def restore_search_indexes(connection=default_connection):
+    """
+    Reinstall the triggers and reindex, for each index whose tables the
+    migrations have created. Rows written while the triggers were gone
+    (data migrations, table rebuilds) are picked up by the reindex.
+    """
+    if connection.vendor != 'sqlite':
+        return
+    if len(_existing(connection, [PATIENT_FTS_TABLE, PATIENT_FTS_KEYS_TABLE])) == 2:
+        install_patient_index(connection)
+    if len(_existing(connection, [SEARCH_INDEX_TABLE, SEARCH_INDEX_KEYS_TABLE])) == 2:
+        install_search_index(connection)
+
+
+def _migrates_this_app(plan):
+    return any(migration.app_label == 'mentalhealthiq' for migration, _backwards in plan or ())
+
+
+def suspend_search_triggers(sender, using, plan=None, **kwargs):
+    """pre_migrate receiver, see drop_search_triggers()."""
+    if _migrates_this_app(plan):
+        drop_search_triggers(connections[using])
+
+
+def resume_search_triggers(sender, using, plan=None, **kwargs):
+    """post_migrate receiver, see restore_search_indexes()."""
+    if _migrates_this_app(plan):
+        restore_search_indexes(connections[using])
+
+
+def search_everything(term, types=None, facility_id=None, limit=20):
+    """
+    Ranked hits across every indexed entity type.
+
+    Returns dicts with type, id, facility_id, title, subtitle and score
+    (higher is better). ``types`` restricts the entity types and
+    ``facility_id`` scopes hits to one facility.
+    """
+    term = (term or '').strip()
+    types = [name for name in (types or SEARCH_ENTITIES) if name in SEARCH_ENTITIES]
+    if not term or not types:
+        return []
+
+    match = fts_match_expression(term)
+    if match is None or not search_index_available():
+        return _search_everything_fallback(term, types, facility_id, limit)
+
+    sql = (
+        f"SELECT entity_type, object_id, facility_id, title, subtitle, "
+        f"bm25({SEARCH_INDEX_TABLE}, {_SEARCH_WEIGHTS}) AS rank "
+        f"FROM {SEARCH_INDEX_TABLE} WHERE {SEARCH_INDEX_TABLE} MATCH %s"
+    )
+    params = [match]
+    for word in term.split():
+        if len(word) < TRIGRAM_LENGTH:
+            # Too short for the index; checked on the matched documents only
+            sql += " AND (title || ' ' || subtitle || ' ' || body) LIKE %s"
+            params.append(f'%{word}%')
+    if len(types) < len(SEARCH_ENTITIES):
+        sql += f" AND entity_type IN ({', '.join(['%s'] * len(types))})"
+        params += types
+    if facility_id is not None:
+        sql += " AND facility_id = %s"
+        params.append(facility_id)
+    sql += " ORDER BY rank LIMIT %s"
+    params.append(limit)
+
+    with default_connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        rows = cursor.fetchall()
+    return [
+        {
+            'type': entity_type,
+            'id': str(SEARCH_ENTITIES[entity_type]['model']._meta.pk.to_python(object_id)),
+            'facility_id': facility,
+            'title': title,
+            'subtitle': subtitle,
+            'score': round(-rank, 4),
+        }
+        for entity_type, object_id, facility, title, subtitle, rank in rows
+    ]
+
+
+# icontains fallbacks per type: (fields searched, title, subtitle)
+_FALLBACK_FIELDS = {
+    'facility': (['name', 'address', 'district', 'province', 'contact_name'],
+                 lambda o: o.name, lambda o: f"{o.facility_type} - {o.district}"),
+    'patient': (PATIENT_SEARCH_FIELDS + ['id'],
+                lambda o: f"{o.first_name} {o.last_name}", lambda o: f"{o.id} {o.national_id or ''}"),
+    'staff': (['name', 'email', 'phone', 'position', 'department'],
+              lambda o: o.name, lambda o: f"{o.position} - {o.department}"),
+    'assessment': (['notes', 'missed_reason', 'patient__first_name', 'patient__last_name'],
+                   lambda o: f"{o.patient.first_name} {o.patient.last_name}",
+                   lambda o: f"{o.status} {o.scheduled_date:%Y-%m-%d}"),
+    'audit': (['notes', 'missed_reason', 'facility__name'],
+              lambda o: o.facility.name, lambda o: f"{o.status} {o.scheduled_date:%Y-%m-%d}"),
+}
+
+
+def _search_everything_fallback(term, types, facility_id, limit):
+    """Per-table icontains search for short terms and non-SQLite backends."""
+    hits = []
+    for name in types:
+        model = SEARCH_ENTITIES[name]['model']
+        fields, title, subtitle = _FALLBACK_FIELDS[name]
+        queryset = model.objects.filter(icontains_filter(term, fields))
+        if name == 'assessment':
+            queryset = queryset.select_related('patient')
+        elif name == 'audit':
+            queryset = queryset.select_related('facility')
+        if facility_id is not None:
+            queryset = queryset.filter(**{'id' if name == 'facility' else 'facility_id': facility_id})
+        for obj in queryset.order_by()[:limit]:
+            hits.append({
+                'type': name,
+                'id': str(obj.pk),
+                'facility_id': obj.pk if name == 'facility' else obj.facility_id,
+                'title': title(obj),
+                'subtitle': subtitle(obj),
+                'score': 0.0,
+            })
+    return hits[:limit]
@@ -0,0 +1,46 @@
+from rest_framework import status
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import AllowAny
+from rest_framework.response import Response
+from .search import SEARCH_ENTITIES, search_everything
+
+DEFAULT_LIMIT = 20
+MAX_LIMIT = 100
+
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def unified_search_view(request):
+    """
+    Search facilities, patients, staff, assessments and audits in one request.
+
+    Query params: q (required), types (comma separated subset of the entity
+    types), facility (only hits belonging to that facility) and limit.
+    """
+    term = request.query_params.get('q', '').strip()
+    if not term:
+        return Response({'error': 'Query parameter q is required'}, status=status.HTTP_400_BAD_REQUEST)
+
+    types = None
+    if request.query_params.get('types'):
+        types = [name.strip() for name in request.query_params['types'].split(',') if name.strip()]
+        unknown = sorted(set(types) - set(SEARCH_ENTITIES))
+        if unknown:
+            return Response({
+                'error': f"Unknown types: {', '.join(unknown)}. Valid types: {', '.join(SEARCH_ENTITIES)}"
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+    try:
+        facility_id = request.query_params.get('facility')
+        facility_id = int(facility_id) if facility_id else None
+        limit = min(int(request.query_params.get('limit', DEFAULT_LIMIT)), MAX_LIMIT)
+    except ValueError:
+        return Response({'error': 'facility and limit must be integers'}, status=status.HTTP_400_BAD_REQUEST)
+    if limit < 1:
+        limit = DEFAULT_LIMIT
+
+    results = search_everything(term, types=types, facility_id=facility_id, limit=limit)
+    return Response({
+        'query': term,
+        'count': len(results),
+        'results': results,
+    })
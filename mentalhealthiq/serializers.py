@@ -2,18 +2,65 @@ from rest_framework import serializers
 from .models import (
     User, PendingUser, Facility, StaffMember, StaffQualification,
     AssessmentCriteria, Indicator, Patient, Assessment, IndicatorScore,
-    Audit, AuditCriteria, Report, BenchmarkCriteria, BenchmarkComparison, FacilityRanking, MetricSnapshot,
+    Audit, AuditCriteria, AuditCriterionName, Report, BenchmarkCriteria, BenchmarkComparison, FacilityRanking, MetricSnapshot,
     FeedbackComment, Feedback
 )
+from django.db import transaction
+from django.db.models import Prefetch
 from django.utils import timezone
+from . import perf, scoring
 
-class UserSerializer(serializers.ModelSerializer):
+class DynamicFieldsMixin:
+    """
+    Sparse fieldsets for ModelSerializers.
+
+    On GET requests the client can pass ?fields=id,name to keep only those
+    fields or ?omit=notes to drop some. Code can pass the same thing as
+    ``fields=`` / ``omit=`` keyword arguments. Only the top-level serializer
+    is trimmed; nested serializers keep their full shape.
+
+    Top-level rows also report their serialization time to perf.
+    """
+
+    def __init__(self, *args, **kwargs):
+        fields = kwargs.pop('fields', None)
+        omit = kwargs.pop('omit', None)
+        super().__init__(*args, **kwargs)
+
+        request = kwargs.get('context', {}).get('request')
+        if request is not None and request.method == 'GET':
+            if fields is None:
+                fields = self._split_param(request.query_params.get('fields'))
+            if omit is None:
+                omit = self._split_param(request.query_params.get('omit'))
+
+        if fields:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+        if omit:
+            for name in set(omit) & set(self.fields):
+                self.fields.pop(name)
+
+    def to_representation(self, instance):
+        parent = self.parent
+        if parent is None or (isinstance(parent, serializers.ListSerializer) and parent.parent is None):
+            with perf.timed('serialize'):
+                return super().to_representation(instance)
+        return super().to_representation(instance)
+
+    @staticmethod
+    def _split_param(value):
+        if not value:
+            return None
+        return [name.strip() for name in value.split(',') if name.strip()]
+
+class UserSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = User
         fields = ['id', 'username', 'email', 'role', 'display_name', 'phone_number', 'status', 'date_joined']
         read_only_fields = ['id', 'date_joined']
 
-class PendingUserSerializer(serializers.ModelSerializer):
+class PendingUserSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = PendingUser
         fields = ['id', 'username', 'email', 'role', 'display_name', 'phone_number', 'position', 'password', 'status', 'request_date']
@@ -22,18 +69,29 @@ class PendingUserSerializer(serializers.ModelSerializer):
             'password': {'write_only': True}
         }
 
-class FacilitySerializer(serializers.ModelSerializer):
+class FacilitySerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = Facility
         fields = '__all__'
         read_only_fields = ['id', 'created_at', 'updated_at']
 
-class StaffQualificationSerializer(serializers.ModelSerializer):
+class FacilityListSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
+    """Compact facility representation for list screens (?lean=true)"""
+    class Meta:
+        model = Facility
+        fields = ['id', 'name', 'facility_type', 'district', 'province', 'status', 'capacity']
+        read_only_fields = fields
+
+    @staticmethod
+    def setup_eager_loading(queryset, field_names):
+        return queryset.only('id', *field_names)
+
+class StaffQualificationSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = StaffQualification
         fields = ['id', 'qualification']
 
-class StaffMemberSerializer(serializers.ModelSerializer):
+class StaffMemberSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     qualifications = StaffQualificationSerializer(many=True, read_only=True)
     facility_name = serializers.CharField(source='facility.name', read_only=True)
     
@@ -44,19 +102,48 @@ class StaffMemberSerializer(serializers.ModelSerializer):
                  'created_at', 'updated_at']
         read_only_fields = ['created_at', 'updated_at']
 
+    @staticmethod
+    def setup_eager_loading(queryset, field_names):
+        if 'facility_name' in field_names:
+            queryset = queryset.select_related('facility')
+        if 'qualifications' in field_names:
+            queryset = queryset.prefetch_related('qualifications')
+        return queryset
+
     def validate_facility(self, value):
         """Ensure the facility exists in the database."""
         if not Facility.objects.filter(id=value.id).exists():
             raise serializers.ValidationError("Facility does not exist.")
         return value
 
-class IndicatorSerializer(serializers.ModelSerializer):
+class StaffMemberListSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
+    """Compact staff representation for list screens (?lean=true)"""
+    facility_name = serializers.CharField(source='facility.name', read_only=True)
+
+    class Meta:
+        model = StaffMember
+        fields = ['id', 'name', 'position', 'department', 'facility', 'facility_name', 'status']
+        read_only_fields = fields
+
+    @staticmethod
+    def setup_eager_loading(queryset, field_names):
+        columns = [name for name in field_names if name != 'facility_name']
+        if 'facility_name' in field_names:
+            queryset = queryset.select_related('facility')
+            columns += ['facility', 'facility__name']
+        return queryset.only('id', *columns)
+
+class IndicatorSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = Indicator
         fields = ['id', 'name', 'weight']
 
-class AssessmentCriteriaSerializer(serializers.ModelSerializer):
-    indicators = IndicatorSerializer(many=True, read_only=False, required=False)
+class NestedIndicatorSerializer(IndicatorSerializer):
+    """Indicator inside a criterion payload; ``id`` is optional and selects the row to keep."""
+    id = serializers.IntegerField(required=False)
+
+class AssessmentCriteriaSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
+    indicators = NestedIndicatorSerializer(many=True, read_only=False, required=False)
     
     class Meta:
         model = AssessmentCriteria
@@ -65,29 +152,95 @@ class AssessmentCriteriaSerializer(serializers.ModelSerializer):
     
     def create(self, validated_data):
         indicators_data = validated_data.pop('indicators', [])
-        criterion = AssessmentCriteria.objects.create(**validated_data)
-        
-        for indicator_data in indicators_data:
-            Indicator.objects.create(criteria=criterion, **indicator_data)
-        
+        with transaction.atomic():
+            criterion = AssessmentCriteria.objects.create(**validated_data)
+            Indicator.objects.bulk_create([
+                Indicator(criteria=criterion, name=data['name'], weight=data['weight'])
+                for data in indicators_data
+            ])
         return criterion
     
     def update(self, instance, validated_data):
-        indicators_data = validated_data.pop('indicators', [])
-        
-        # Update criterion fields
-        for attr, value in validated_data.items():
-            setattr(instance, attr, value)
-        instance.save()
+        indicators_data = validated_data.pop('indicators', None)
         
-        # Clear existing indicators and create new ones
-        instance.indicators.all().delete()
-        for indicator_data in indicators_data:
-            Indicator.objects.create(criteria=instance, **indicator_data)
+        with transaction.atomic():
+            # Update criterion fields
+            for attr, value in validated_data.items():
+                setattr(instance, attr, value)
+            instance.save()
+
+            # Without an "indicators" key the indicators are left as they are
+            if indicators_data is not None:
+                self.sync_indicators(instance, indicators_data)
         
         return instance
 
-class PatientSerializer(serializers.ModelSerializer):
+    @staticmethod
+    def sync_indicators(criterion, indicators_data):
+        """
+        Make the criterion's indicators match ``indicators_data``.
+
+        Each entry is matched to an existing indicator by id, or else by name.
+        Matched indicators are updated in place (and only if they changed), so
+        their IndicatorScore history survives; unmatched entries are created
+        and indicators missing from the payload are deleted. If a weight
+        changed or a scored indicator went away, the criterion's assessment
+        scores are recomputed in the background (scoring.py).
+        """
+        existing = {indicator.id: indicator for indicator in criterion.indicators.all()}
+        unmatched_by_name = {}
+        for indicator in existing.values():
+            unmatched_by_name.setdefault(indicator.name, []).append(indicator)
+
+        matches, new_entries = [], []
+        for data in indicators_data:
+            if 'id' in data:
+                indicator = existing.get(data['id'])
+                if indicator is None:
+                    raise serializers.ValidationError({
+                        'indicators': f"Indicator {data['id']} does not belong to this criterion."
+                    })
+                if indicator not in unmatched_by_name.get(indicator.name, []):
+                    raise serializers.ValidationError({
+                        'indicators': f"Indicator {data['id']} is listed more than once."
+                    })
+                unmatched_by_name[indicator.name].remove(indicator)
+                matches.append((indicator, data))
+            else:
+                new_entries.append(data)
+
+        to_create = []
+        for data in new_entries:
+            candidates = unmatched_by_name.get(data['name'])
+            if candidates:
+                matches.append((candidates.pop(0), data))
+            else:
+                to_create.append(Indicator(criteria=criterion, name=data['name'], weight=data['weight']))
+
+        to_update, weights_changed = [], False
+        for indicator, data in matches:
+            if indicator.name != data['name'] or indicator.weight != data['weight']:
+                weights_changed = weights_changed or indicator.weight != data['weight']
+                indicator.name, indicator.weight = data['name'], data['weight']
+                to_update.append(indicator)
+        to_delete = [indicator.id for indicators in unmatched_by_name.values() for indicator in indicators]
+
+        if to_delete:
+            # The scores go with the indicators; their assessments change too,
+            # so touch them all in one UPDATE before the cascade (which is one
+            # DELETE per table, see signals.TOUCH_PARENT)
+            Assessment.objects.filter(
+                pk__in=IndicatorScore.objects.filter(indicator_id__in=to_delete).values('assessment_id')
+            ).update(updated_at=timezone.now())
+            Indicator.objects.filter(id__in=to_delete).delete()
+        if to_update:
+            Indicator.objects.bulk_update(to_update, ['name', 'weight'])
+        if to_create:
+            Indicator.objects.bulk_create(to_create)
+        if weights_changed or to_delete:
+            scoring.schedule_recompute(criterion.id)
+
+class PatientSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     facility_name = serializers.CharField(source='facility.name', read_only=True)
     primary_staff_name = serializers.CharField(source='primary_staff.name', read_only=True)
     
@@ -99,6 +252,16 @@ class PatientSerializer(serializers.ModelSerializer):
                  'registration_date', 'emergency_contact_name', 
                  'emergency_contact_phone', 'notes', 'created_at', 'updated_at']
         read_only_fields = ['created_at', 'updated_at']
+
+    @staticmethod
+    def setup_eager_loading(queryset, field_names):
+        related = [
+            relation for field, relation in (
+                ('facility_name', 'facility'),
+                ('primary_staff_name', 'primary_staff'),
+            ) if field in field_names
+        ]
+        return queryset.select_related(*related) if related else queryset
         
     def validate_facility(self, value):
         """Ensure the facility exists in the database."""
@@ -113,14 +276,32 @@ class PatientSerializer(serializers.ModelSerializer):
                 raise serializers.ValidationError("Staff member must belong to the patient's facility.")
         return value
 
-class IndicatorScoreSerializer(serializers.ModelSerializer):
+class PatientListSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
+    """Compact patient representation for list screens (?lean=true)"""
+    facility_name = serializers.CharField(source='facility.name', read_only=True)
+
+    class Meta:
+        model = Patient
+        fields = ['id', 'first_name', 'last_name', 'gender', 'status',
+                 'facility', 'facility_name', 'registration_date']
+        read_only_fields = fields
+
+    @staticmethod
+    def setup_eager_loading(queryset, field_names):
+        columns = [name for name in field_names if name != 'facility_name']
+        if 'facility_name' in field_names:
+            queryset = queryset.select_related('facility')
+            columns += ['facility', 'facility__name']
+        return queryset.only('id', *columns)
+
+class IndicatorScoreSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     indicator_name = serializers.CharField(source='indicator.name', read_only=True)
     
     class Meta:
         model = IndicatorScore
         fields = ['id', 'indicator', 'indicator_name', 'score', 'notes']
 
-class AssessmentSerializer(serializers.ModelSerializer):
+class AssessmentSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     indicator_scores = IndicatorScoreSerializer(many=True, read_only=True)
     patient_name = serializers.SerializerMethodField()
     criteria_name = serializers.CharField(source='criteria.name', read_only=True)
@@ -137,6 +318,24 @@ class AssessmentSerializer(serializers.ModelSerializer):
                  'missed_reason', 'notes', 'indicator_scores', 'is_upcoming',
                  'is_overdue', 'created_at', 'updated_at']
         read_only_fields = ['id', 'created_at', 'updated_at', 'is_upcoming', 'is_overdue']
+
+    @staticmethod
+    def setup_eager_loading(queryset, field_names):
+        related = [
+            relation for field, relation in (
+                ('patient_name', 'patient'),
+                ('criteria_name', 'criteria'),
+                ('evaluator_name', 'evaluator'),
+                ('facility_name', 'facility'),
+            ) if field in field_names
+        ]
+        if related:
+            queryset = queryset.select_related(*related)
+        if 'indicator_scores' in field_names:
+            queryset = queryset.prefetch_related(
+                Prefetch('indicator_scores', queryset=IndicatorScore.objects.select_related('indicator'))
+            )
+        return queryset
     
     def get_patient_name(self, obj):
         return f"{obj.patient.first_name} {obj.patient.last_name}"
@@ -180,12 +379,136 @@ class AssessmentSerializer(serializers.ModelSerializer):
                 raise serializers.ValidationError("Assessment date is required for completed assessments.")
         return data
 
-class AuditCriteriaSerializer(serializers.ModelSerializer):
+class AssessmentListSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
+    """Compact assessment representation for list screens (?lean=true)"""
+    patient_name = serializers.SerializerMethodField()
+    facility_name = serializers.CharField(source='facility.name', read_only=True)
+
+    class Meta:
+        model = Assessment
+        fields = ['id', 'patient', 'patient_name', 'facility', 'facility_name',
+                 'scheduled_date', 'assessment_date', 'status', 'score']
+        read_only_fields = fields
+
+    @staticmethod
+    def setup_eager_loading(queryset, field_names):
+        columns = [name for name in field_names if name not in ('patient_name', 'facility_name')]
+        if 'patient_name' in field_names:
+            queryset = queryset.select_related('patient')
+            columns += ['patient', 'patient__first_name', 'patient__last_name']
+        if 'facility_name' in field_names:
+            queryset = queryset.select_related('facility')
+            columns += ['facility', 'facility__name']
+        return queryset.only('id', *columns)
+
+    def get_patient_name(self, obj):
+        return f"{obj.patient.first_name} {obj.patient.last_name}"
+
+class BulkIndicatorScoreSerializer(serializers.Serializer):
+    """An indicator score as the evaluation screen sends it; "not applicable" is stored as a null score."""
+    RATINGS = ('pass', 'high-partial', 'partial', 'low-partial', 'fail', 'not-applicable', 'not-rated')
+
+    indicator = serializers.IntegerField()
+    score = serializers.FloatField(allow_null=True)
+    rating = serializers.ChoiceField(choices=RATINGS, required=False, write_only=True)
+    notes = serializers.CharField(required=False, allow_blank=True, allow_null=True)
+
+    def validate(self, data):
+        if data.pop('rating', None) == 'not-applicable':
+            data['score'] = None
+        return data
+
+class BulkAssessmentItemSerializer(serializers.Serializer):
+    """
+    One assessment in a bulk submission, with its indicator scores nested.
+
+    Related rows are resolved against lookups the view loads once for the
+    whole batch (``context['lookups']``) instead of one query per item, and
+    validate() returns unsaved model instances ready for bulk_create().
+    The rules match AssessmentSerializer.validate, except that only
+    scheduled assessments must have a future scheduled_date: offline clients
+    sync completed visits after the fact.
+    """
+    id = serializers.UUIDField(required=False)
+    patient = serializers.CharField()
+    facility = serializers.IntegerField()
+    criteria = serializers.IntegerField(required=False, allow_null=True)
+    evaluator = serializers.UUIDField(required=False, allow_null=True)
+    assessment_date = serializers.DateTimeField(required=False, allow_null=True)
+    scheduled_date = serializers.DateTimeField(required=False)
+    score = serializers.FloatField(required=False, default=0)
+    status = serializers.ChoiceField(choices=Assessment.STATUS_CHOICES, default='scheduled')
+    missed_reason = serializers.CharField(required=False, allow_blank=True, allow_null=True)
+    notes = serializers.CharField(required=False, allow_blank=True, allow_null=True)
+    indicator_scores = BulkIndicatorScoreSerializer(many=True, required=False)
+
+    def validate(self, data):
+        lookups = self.context['lookups']
+
+        patient_facility = lookups['patients'].get(data['patient'], False)
+        if patient_facility is False:
+            raise serializers.ValidationError({"patient": "Patient does not exist."})
+        if data['facility'] not in lookups['facilities']:
+            raise serializers.ValidationError({"facility": "Facility does not exist."})
+        if patient_facility != data['facility']:
+            raise serializers.ValidationError("Patient does not belong to the specified facility.")
+
+        scores = data.pop('indicator_scores', [])
+        if data['status'] == 'scheduled':
+            if 'scheduled_date' in data and data['scheduled_date'] < timezone.now():
+                raise serializers.ValidationError({"scheduled_date": "Scheduled date cannot be in the past."})
+            if scores:
+                raise serializers.ValidationError({"indicator_scores": "Scheduled assessments cannot have scores."})
+            # Same normalisation as Assessment.save(), which bulk_create skips
+            data.update(criteria=None, evaluator=None, assessment_date=None, score=0)
+        else:
+            if not data.get('criteria'):
+                raise serializers.ValidationError("Criteria is required for completed assessments.")
+            if not data.get('assessment_date'):
+                raise serializers.ValidationError("Assessment date is required for completed assessments.")
+            if data['criteria'] not in lookups['criteria']:
+                raise serializers.ValidationError({"criteria": "Criteria does not exist."})
+            if data.get('evaluator') and data['evaluator'] not in lookups['evaluators']:
+                raise serializers.ValidationError({"evaluator": "Evaluator does not exist."})
+            for position, score in enumerate(scores):
+                if lookups['indicators'].get(score['indicator']) != data['criteria']:
+                    raise serializers.ValidationError({"indicator_scores": {
+                        position: f"Indicator {score['indicator']} does not belong to the assessment criteria."
+                    }})
+
+        assessment = Assessment(
+            patient_id=data.pop('patient'),
+            facility_id=data.pop('facility'),
+            criteria_id=data.pop('criteria', None),
+            evaluator_id=data.pop('evaluator', None),
+            **data
+        )
+        return {
+            'assessment': assessment,
+            'indicator_scores': [
+                IndicatorScore(assessment=assessment, indicator_id=score['indicator'],
+                               score=score['score'], notes=score.get('notes'))
+                for score in scores
+            ],
+        }
+
+class AuditCriteriaSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
+    criteria_name = serializers.CharField(max_length=255)
+
     class Meta:
         model = AuditCriteria
         fields = ['id', 'criteria_name', 'score', 'notes']
 
-class AuditSerializer(serializers.ModelSerializer):
+    def create(self, validated_data):
+        validated_data['criterion'] = AuditCriterionName.intern(validated_data.pop('criteria_name'))
+        return super().create(validated_data)
+
+    def update(self, instance, validated_data):
+        if 'criteria_name' in validated_data:
+            validated_data['criterion'] = AuditCriterionName.intern(validated_data.pop('criteria_name'))
+        return super().update(instance, validated_data)
+
+class AuditSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     criteria_scores = AuditCriteriaSerializer(many=True, read_only=True)
     facility_name = serializers.CharField(source='facility.name', read_only=True)
     auditor_name = serializers.CharField(source='auditor.display_name', read_only=True)
@@ -199,6 +522,20 @@ class AuditSerializer(serializers.ModelSerializer):
                  'missed_reason', 'notes', 'criteria_scores', 'is_upcoming',
                  'is_overdue', 'created_at', 'updated_at']
         read_only_fields = ['id', 'created_at', 'updated_at', 'is_upcoming', 'is_overdue']
+
+    @staticmethod
+    def setup_eager_loading(queryset, field_names):
+        related = [
+            relation for field, relation in (
+                ('facility_name', 'facility'),
+                ('auditor_name', 'auditor'),
+            ) if field in field_names
+        ]
+        if related:
+            queryset = queryset.select_related(*related)
+        if 'criteria_scores' in field_names:
+            queryset = queryset.prefetch_related('criteria_scores__criterion')
+        return queryset
     
     def validate_overall_score(self, value):
         """
@@ -240,7 +577,25 @@ class AuditSerializer(serializers.ModelSerializer):
             
         return data
 
-class ReportSerializer(serializers.ModelSerializer):
+class AuditListSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
+    """Compact audit representation for list screens (?lean=true)"""
+    facility_name = serializers.CharField(source='facility.name', read_only=True)
+
+    class Meta:
+        model = Audit
+        fields = ['id', 'facility', 'facility_name', 'scheduled_date', 'audit_date',
+                 'status', 'overall_score']
+        read_only_fields = fields
+
+    @staticmethod
+    def setup_eager_loading(queryset, field_names):
+        columns = [name for name in field_names if name != 'facility_name']
+        if 'facility_name' in field_names:
+            queryset = queryset.select_related('facility')
+            columns += ['facility', 'facility__name']
+        return queryset.only('id', *columns)
+
+class ReportSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     generated_by_name = serializers.CharField(source='generated_by.display_name', read_only=True)
     
     class Meta:
@@ -249,13 +604,19 @@ class ReportSerializer(serializers.ModelSerializer):
                  'generated_by_name', 'generated_at', 'file_path', 'parameters']
         read_only_fields = ['id', 'generated_at']
 
-class BenchmarkCriteriaSerializer(serializers.ModelSerializer):
+    @staticmethod
+    def setup_eager_loading(queryset, field_names):
+        if 'generated_by_name' in field_names:
+            queryset = queryset.select_related('generated_by')
+        return queryset
+
+class BenchmarkCriteriaSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = BenchmarkCriteria
         fields = ['id', 'name', 'description', 'category', 'weight', 'is_active', 'created_at', 'updated_at']
         read_only_fields = ['id', 'created_at', 'updated_at']
 
-class BenchmarkComparisonSerializer(serializers.ModelSerializer):
+class BenchmarkComparisonSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     facility_a_name = serializers.CharField(source='facility_a.name', read_only=True)
     facility_b_name = serializers.CharField(source='facility_b.name', read_only=True)
     created_by_name = serializers.CharField(source='created_by.display_name', read_only=True)
@@ -277,7 +638,7 @@ class BenchmarkComparisonSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError("Cannot compare a facility with itself.")
         return data
 
-class FacilityRankingSerializer(serializers.ModelSerializer):
+class FacilityRankingSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     facility_name = serializers.CharField(source='facility.name', read_only=True)
 
     class Meta:
@@ -297,7 +658,7 @@ class FacilityRankingSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError("Invalid rank number.")
         return data
 
-class MetricSnapshotSerializer(serializers.ModelSerializer):
+class MetricSnapshotSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     facility_name = serializers.CharField(source='facility.name', read_only=True)
     
     class Meta:
@@ -311,7 +672,7 @@ class MetricSnapshotSerializer(serializers.ModelSerializer):
         ]
         read_only_fields = fields
 
-class FeedbackCommentSerializer(serializers.ModelSerializer):
+class FeedbackCommentSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     added_by_name = serializers.CharField(source='added_by.username', read_only=True)
 
     class Meta:
@@ -319,7 +680,7 @@ class FeedbackCommentSerializer(serializers.ModelSerializer):
         fields = ['id', 'comment', 'added_by', 'added_by_name', 'created_at']
         read_only_fields = ['added_by']
 
-class FeedbackSerializer(serializers.ModelSerializer):
+class FeedbackSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     comments = FeedbackCommentSerializer(many=True, read_only=True)
     submitted_by_name = serializers.CharField(source='submitted_by.username', read_only=True, required=False)
 
@@ -332,3 +693,13 @@ class FeedbackSerializer(serializers.ModelSerializer):
             'submitted_by': {'required': False},
             'submitted_by_name': {'required': False}
         }
+
+    @staticmethod
+    def setup_eager_loading(queryset, field_names):
+        if 'submitted_by_name' in field_names:
+            queryset = queryset.select_related('submitted_by')
+        if 'comments' in field_names:
+            queryset = queryset.prefetch_related(
+                Prefetch('comments', queryset=FeedbackComment.objects.select_related('added_by'))
+            )
+        return queryset
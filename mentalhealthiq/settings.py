@@ -11,6 +11,7 @@ https://docs.djangoproject.com/en/5.1/ref/settings/
 """
 
 from pathlib import Path
+import importlib.util
 import os
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -47,6 +48,9 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'corsheaders.middleware.CorsMiddleware',  # Must be at the top
+    'mentalhealthiq.middleware.PerformanceMiddleware',  # Outermost so it times everything below
+    'mentalhealthiq.middleware.CompressionMiddleware',  # Before anything that reads the body
+    'mentalhealthiq.middleware.ReplicaPinningMiddleware',  # Read-your-writes for replica reads
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -56,6 +60,33 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
+# Response compression (mentalhealthiq.middleware.CompressionMiddleware).
+# zstd and br are used only when the zstandard / brotli packages are installed.
+COMPRESSION_MIN_SIZE = 1024  # bytes; smaller bodies are sent uncompressed
+COMPRESSION_ENCODINGS = ['zstd', 'br', 'gzip']  # server preference on q-value ties
+COMPRESSION_LEVELS = {'gzip': 6, 'br': 4, 'zstd': 3}  # raise to trade CPU for bandwidth
+
+# Live events (/api/events/, served through asgi.py)
+SSE_POLL_INTERVAL = 2  # seconds between checks for new rows while clients are connected
+SSE_HEARTBEAT_INTERVAL = 15  # seconds between keep-alive comments on idle streams
+
+# Threads (each with its own DB connection) used to run independent
+# statistics queries concurrently (mentalhealthiq.concurrency)
+AGGREGATE_QUERY_WORKERS = 4
+
+# Per-request metrics: Server-Timing header and /api/_perf/ (admin only)
+PERF_MONITORING = True
+PERF_BUFFER_SIZE = 1000  # requests kept per process
+PERF_N_PLUS_ONE_THRESHOLD = 5  # same query this many times in one request
+
+# Slow-query log (mentalhealthiq.slow_queries, manage.py slow_queries)
+SLOW_QUERY_LOG = True
+SLOW_QUERY_THRESHOLD_MS = 200  # statements slower than this are recorded
+SLOW_QUERY_PLAN_INTERVAL = 3600  # seconds between EXPLAINs of the same fingerprint
+
+# Assessment score recomputation (mentalhealthiq.scoring, manage.py recompute_scores)
+SCORE_RECOMPUTE_CHUNK_SIZE = 2000  # assessments per chunk / Celery task
+
 # CORS settings
 CORS_ALLOW_ALL_ORIGINS = True
 CORS_ALLOW_CREDENTIALS = True
@@ -84,12 +115,71 @@ WSGI_APPLICATION = 'mentalhealthiq.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.1/ref/settings/#databases
 
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+# SQLite by default. Set DATABASE_ENGINE=postgresql to run on PostgreSQL
+# (needs psycopg 3; psycopg[pool] for pooling), configured with:
+#   DATABASE_NAME, DATABASE_USER, DATABASE_PASSWORD, DATABASE_HOST, DATABASE_PORT
+#   DATABASE_REPLICA_HOST   read replica for analytics (mentalhealthiq.db_router)
+#   DATABASE_POOL_MIN_SIZE / DATABASE_POOL_MAX_SIZE   connection pool per process
+#                           (DATABASE_POOL_MAX_SIZE=0 keeps persistent connections
+#                           with CONN_MAX_AGE instead)
+#   DATABASE_PGBOUNCER=1    behind a transaction-pooling PgBouncer: no client-side
+#                           pool and no server-side cursors
+DATABASE_ENGINE = os.environ.get('DATABASE_ENGINE', 'sqlite')
+
+if DATABASE_ENGINE == 'postgresql':
+    def postgres_database(host):
+        behind_pgbouncer = os.environ.get('DATABASE_PGBOUNCER') == '1'
+        pool_max_size = int(os.environ.get('DATABASE_POOL_MAX_SIZE', 10))
+        database = {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': os.environ.get('DATABASE_NAME', 'mentalhealthiq'),
+            'USER': os.environ.get('DATABASE_USER', 'mentalhealthiq'),
+            'PASSWORD': os.environ.get('DATABASE_PASSWORD', ''),
+            'HOST': host,
+            'PORT': os.environ.get('DATABASE_PORT', '5432'),
+            'CONN_HEALTH_CHECKS': True,
+            # iterator() (streamed exports, scans) uses server-side cursors unless
+            # a transaction-level pooler would lose them between statements
+            'DISABLE_SERVER_SIDE_CURSORS': behind_pgbouncer,
+            'OPTIONS': {},
+        }
+        if pool_max_size and not behind_pgbouncer:
+            database['OPTIONS']['pool'] = {
+                'min_size': int(os.environ.get('DATABASE_POOL_MIN_SIZE', 2)),
+                'max_size': pool_max_size,
+                'timeout': 10,
+            }
+        else:
+            database['CONN_MAX_AGE'] = 60
+        return database
+
+    DATABASES = {'default': postgres_database(os.environ.get('DATABASE_HOST', 'localhost'))}
+    if os.environ.get('DATABASE_REPLICA_HOST'):
+        DATABASES['replica'] = postgres_database(os.environ['DATABASE_REPLICA_HOST'])
+        DATABASES['replica']['TEST'] = {'MIRROR': 'default'}
+else:
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': BASE_DIR / 'db.sqlite3',
+            # Runs in WAL mode (set once by migration 0018_sqlite_wal) so the
+            # replica connection can read while a write is in progress
+        },
+        # Analytics reads (mentalhealthiq.db_router): a read-only connection to
+        # the same file. Remove it to read everything from 'default'.
+        'replica': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': BASE_DIR / 'db.sqlite3',
+            'OPTIONS': {
+                'init_command': 'PRAGMA query_only=1;',
+            },
+            'TEST': {'MIRROR': 'default'},
+        },
     }
-}
+
+DATABASE_ROUTERS = ['mentalhealthiq.db_router.ReplicaRouter']
+REPLICA_DATABASE = 'replica'
+REPLICA_PIN_SECONDS = 5  # reads stay on 'default' this long after a client writes
 
 # Authentication settings
 AUTH_USER_MODEL = 'mentalhealthiq.User'  # Add custom user model
@@ -145,11 +235,24 @@ REST_FRAMEWORK = {
         'django_filters.rest_framework.DjangoFilterBackend',
     ],
     'DEFAULT_RENDERER_CLASSES': [
-        'rest_framework.renderers.JSONRenderer',
-        'rest_framework.renderers.BrowsableAPIRenderer',
+        'mentalhealthiq.renderers.FastJSONRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'rest_framework.parsers.JSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
     ],
 }
 
+# MessagePack is negotiated via Accept/Content-Type when msgpack is installed
+if importlib.util.find_spec('msgpack') is not None:
+    REST_FRAMEWORK['DEFAULT_RENDERER_CLASSES'].append('mentalhealthiq.renderers.MessagePackRenderer')
+    REST_FRAMEWORK['DEFAULT_PARSER_CLASSES'].append('mentalhealthiq.renderers.MessagePackParser')
+
+# The browsable API is a development aid only
+if DEBUG:
+    REST_FRAMEWORK['DEFAULT_RENDERER_CLASSES'].append('rest_framework.renderers.BrowsableAPIRenderer')
+
 # Celery Configuration
 CELERY_BROKER_URL = 'redis://localhost:6379/0'
 CELERY_RESULT_BACKEND = 'redis://localhost:6379/0'
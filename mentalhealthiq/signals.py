@@ -0,0 +1,97 @@
+from celery.signals import task_postrun, task_prerun
+from django.apps import apps
+from django.db.backends.signals import connection_created
+from django.db.models import SET_NULL
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.utils import timezone
+
+from .models import (
+    Assessment,
+    AssessmentCriteria,
+    Audit,
+    AuditCriteria,
+    Feedback,
+    FeedbackComment,
+    Indicator,
+    IndicatorScore,
+    StaffMember,
+    StaffQualification,
+    Tombstone,
+)
+from .sync import SYNC_ENTITIES, entity_type_for
+from . import slow_queries
+
+# Child rows without their own updated_at, mapped to (parent model, FK attname).
+# Saving a child bumps the parent's updated_at so ETags on the parent change.
+# Deletes are not hooked up: a delete receiver would make Django load and
+# delete every child one at a time when the parent is deleted, so code that
+# deletes child rows on their own calls touch_parents() instead.
+TOUCH_PARENT = {
+    IndicatorScore: (Assessment, 'assessment_id'),
+    AuditCriteria: (Audit, 'audit_id'),
+    StaffQualification: (StaffMember, 'staff_id'),
+    Indicator: (AssessmentCriteria, 'criteria_id'),
+    FeedbackComment: (Feedback, 'feedback_id'),
+}
+
+
+def touch_parent(sender, instance, raw=False, **kwargs):
+    """Mark the owning row as modified when one of its child rows changes."""
+    if raw:
+        return
+    parent_model, fk_attname = TOUCH_PARENT[sender]
+    parent_id = getattr(instance, fk_attname)
+    if parent_id is not None:
+        parent_model.objects.filter(pk=parent_id).update(updated_at=timezone.now())
+
+
+def touch_parents(child_model, children):
+    """
+    Bump updated_at on the parents of ``children`` (a queryset of
+    ``child_model``) with one UPDATE. Call it before deleting the children.
+    """
+    parent_model, fk_attname = TOUCH_PARENT[child_model]
+    parent_model.objects.filter(pk__in=children.values(fk_attname)).update(updated_at=timezone.now())
+
+
+def record_tombstone(sender, instance, **kwargs):
+    """Remember deletes of synced rows so the change feed can report them."""
+    entity_type = entity_type_for(sender)
+    facility_id = instance.pk if entity_type == 'facilities' else getattr(instance, 'facility_id', None)
+    Tombstone.objects.create(entity_type=entity_type, object_id=str(instance.pk), facility_id=facility_id)
+
+
+def touch_set_null_dependents(sender, instance, **kwargs):
+    """
+    Deleting a row nulls out SET_NULL foreign keys with a plain UPDATE, which
+    leaves updated_at alone; bump it on synced rows so the change is seen.
+    """
+    for relation in sender._meta.related_objects:
+        if relation.on_delete is SET_NULL and entity_type_for(relation.related_model):
+            relation.related_model.objects.filter(**{relation.field.name: instance}).update(
+                updated_at=timezone.now()
+            )
+
+
+def has_synced_set_null_dependents(model):
+    return any(
+        relation.on_delete is SET_NULL and entity_type_for(relation.related_model)
+        for relation in model._meta.related_objects
+    )
+
+
+# Connected per model: a delete receiver without a sender keeps Django from
+# fast-deleting (one DELETE, no instances loaded) rows of every model.
+for child in TOUCH_PARENT:
+    post_save.connect(touch_parent, sender=child)
+for synced_model, _serializer, _facility_lookup in SYNC_ENTITIES.values():
+    post_delete.connect(record_tombstone, sender=synced_model)
+for model in apps.get_models():
+    if has_synced_set_null_dependents(model):
+        pre_delete.connect(touch_set_null_dependents, sender=model)
+
+
+# Slow-query log: time statements on every connection, name the Celery task
+connection_created.connect(slow_queries.install, dispatch_uid='slow_query_log')
+task_prerun.connect(slow_queries.task_started, dispatch_uid='slow_query_task_started')
+task_postrun.connect(slow_queries.task_finished, dispatch_uid='slow_query_task_finished')
@@ -0,0 +1,208 @@
+"""
+Slow-query log.
+
+Every database connection gets an execute wrapper (installed when the
+connection is opened) that times each statement. Statements slower than
+SLOW_QUERY_THRESHOLD_MS are handed to a background thread, so the request
+or task that ran them does not wait, which:
+
+* normalises the SQL into a fingerprint (perf.sql_fingerprint),
+* captures the query plan (EXPLAIN QUERY PLAN on SQLite, EXPLAIN on other
+  backends) for SELECTs, at most once per fingerprint every
+  SLOW_QUERY_PLAN_INTERVAL seconds,
+* adds the timing to the SlowQuery row for that fingerprint, together with
+  the calling view (method and URL name), Celery task or management command.
+
+Parameters are only used to run the EXPLAIN and are never stored.
+``manage.py slow_queries`` lists the worst fingerprints and their plans.
+"""
+import atexit
+import hashlib
+import logging
+import queue
+import sys
+import threading
+import time
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DatabaseError, connections, router, transaction
+from django.db.models import F, Value
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+from .perf import current_route, sql_fingerprint
+
+logger = logging.getLogger(__name__)
+
+_task_origin = ContextVar('slow_query_task_origin', default=None)
+_local = threading.local()
+_queue = queue.Queue(maxsize=1000)
+_worker = None
+_worker_lock = threading.Lock()
+_plans_captured = {}
+
+
+def enabled():
+    return getattr(settings, 'SLOW_QUERY_LOG', True)
+
+
+def threshold_ms():
+    return getattr(settings, 'SLOW_QUERY_THRESHOLD_MS', 200)
+
+
+def plan_interval():
+    return getattr(settings, 'SLOW_QUERY_PLAN_INTERVAL', 3600)
+
+
+def current_origin():
+    """The view, Celery task or command that is running the current query."""
+    return current_route() or _task_origin.get() or 'command ' + ' '.join(
+        arg.rsplit('/', 1)[-1] for arg in sys.argv[:2]
+    )
+
+
+def slow_query_wrapper(execute, sql, params, many, context):
+    """connection.execute_wrapper hook; see the module docstring."""
+    if getattr(_local, 'in_worker', False):
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        if elapsed_ms >= threshold_ms():
+            submit({
+                'alias': context['connection'].alias,
+                'sql': sql,
+                'params': None if many else params,
+                'elapsed_ms': elapsed_ms,
+                'origin': current_origin(),
+            })
+
+
+def install(sender=None, connection=None, **kwargs):
+    """connection_created receiver: add the wrapper to the new connection once."""
+    if enabled() and slow_query_wrapper not in connection.execute_wrappers:
+        connection.execute_wrappers.append(slow_query_wrapper)
+
+
+def submit(entry):
+    global _worker
+    if _worker is None or not _worker.is_alive():
+        with _worker_lock:
+            if _worker is None or not _worker.is_alive():
+                if _worker is None:
+                    # The worker is a daemon thread; don't drop what it has not recorded yet
+                    atexit.register(flush)
+                _worker = threading.Thread(target=_run_worker, name='slow-query-log', daemon=True)
+                _worker.start()
+    try:
+        _queue.put_nowait(entry)
+    except queue.Full:
+        pass  # Better to lose an entry than to slow the caller down
+
+
+def _run_worker():
+    _local.in_worker = True
+    _begin_immediate()
+    while True:
+        entry = _queue.get()
+        try:
+            record(entry)
+        except Exception:
+            logger.exception('Could not record slow query')
+        finally:
+            _queue.task_done()
+        if _queue.empty():
+            # Idle until the next slow query; don't keep a (pooled) connection
+            connections.close_all()
+
+
+def _begin_immediate():
+    """
+    Make the worker thread's SQLite connection start transactions with BEGIN
+    IMMEDIATE. record() reads its row before updating it, and a deferred
+    transaction that has read cannot wait for the write lock: it fails with
+    "database is locked" while a request or task is writing.
+    """
+    from .models import SlowQuery
+
+    connection = connections[router.db_for_write(SlowQuery)]
+    if connection.vendor == 'sqlite':
+        # A copy: the settings dict is shared with every other thread's connection
+        options = {**connection.settings_dict['OPTIONS'], 'transaction_mode': 'IMMEDIATE'}
+        connection.settings_dict = {**connection.settings_dict, 'OPTIONS': options}
+
+
+def explain(alias, sql, params):
+    """Return the plan for a SELECT as text, or '' if it cannot be explained."""
+    if not sql.lstrip().upper().startswith(('SELECT', 'WITH')):
+        return ''
+    connection = connections[alias]
+    prefix = connection.ops.explain_query_prefix()
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(f'{prefix} {sql}', params)
+            rows = cursor.fetchall()
+    except DatabaseError:
+        return ''
+    if connection.vendor == 'sqlite':
+        # (id, parent, notused, detail) rows; indent children under parents
+        depth = {0: -1}
+        lines = []
+        for node_id, parent, _notused, detail in rows:
+            depth[node_id] = depth.get(parent, -1) + 1
+            lines.append('  ' * depth[node_id] + detail)
+        return '\n'.join(lines)
+    return '\n'.join(' '.join(str(value) for value in row) for row in rows)
+
+
+def record(entry):
+    """Fold one slow statement into its SlowQuery row (runs on the worker thread)."""
+    from .models import SlowQuery
+
+    fingerprint = sql_fingerprint(entry['sql'])
+    fingerprint_hash = hashlib.sha1(fingerprint.encode('utf-8')).hexdigest()
+    logger.warning('Slow query (%.0f ms) from %s: %s', entry['elapsed_ms'], entry['origin'], fingerprint[:500])
+
+    plan = ''
+    now = time.monotonic()
+    if entry['params'] is not None and now - _plans_captured.get(fingerprint_hash, -plan_interval()) >= plan_interval():
+        plan = explain(entry['alias'], entry['sql'], entry['params'])
+        _plans_captured[fingerprint_hash] = now
+
+    database = router.db_for_write(SlowQuery)
+    with transaction.atomic(using=database):
+        # Lock the row where the backend can (origins is read-modify-write);
+        # the counters are updated in SQL so concurrent workers never lose a hit
+        slow_query, _created = SlowQuery.objects.using(database).select_for_update().get_or_create(
+            fingerprint_hash=fingerprint_hash,
+            defaults={'fingerprint': fingerprint, 'sample_sql': entry['sql']},
+        )
+        origins = {**slow_query.origins, entry['origin']: slow_query.origins.get(entry['origin'], 0) + 1}
+        changes = {'plan': plan} if plan else {}
+        SlowQuery.objects.using(database).filter(pk=slow_query.pk).update(
+            count=F('count') + 1,
+            total_ms=F('total_ms') + entry['elapsed_ms'],
+            max_ms=Greatest('max_ms', Value(entry['elapsed_ms'])),
+            origins=origins,
+            last_seen=timezone.now(),
+            **changes,
+        )
+
+
+def flush(timeout=5):
+    """Wait until queued entries are recorded; runs at exit so short commands keep theirs."""
+    deadline = time.monotonic() + timeout
+    while _queue.unfinished_tasks and time.monotonic() < deadline:
+        time.sleep(0.05)
+
+
+def task_started(task=None, **kwargs):
+    """celery task_prerun receiver: name the task as the origin of its queries."""
+    _task_origin.set(f'task {getattr(task, "name", task)}')
+
+
+def task_finished(task=None, **kwargs):
+    _task_origin.set(None)
@@ -0,0 +1,59 @@
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+from django.http import StreamingHttpResponse
+
+from .renderers import json_dumps
+
+
+def wants_stream(request):
+    """Streaming is opt-in with ?stream=true."""
+    return request.query_params.get('stream', '').lower() in ('1', 'true', 'yes')
+
+
+def is_asgi(request):
+    return isinstance(getattr(request, '_request', request), ASGIRequest)
+
+
+async def iterate_in_thread(iterator):
+    """
+    Async iterator over a sync one. Each next() runs in the request's sync
+    thread (thread_sensitive), so database work stays on the connection the
+    view used.
+    """
+    done = object()
+    next_in_thread = sync_to_async(next, thread_sensitive=True)
+    while (item := await next_in_thread(iterator, done)) is not done:
+        yield item
+
+
+def stream_json_array(queryset, serializer_class, context=None, chunk_size=500, asynchronous=False):
+    """
+    Return a StreamingHttpResponse that writes the queryset as one JSON array.
+
+    Rows are read with iterator(chunk_size) (prefetches run per chunk; on
+    PostgreSQL through a server-side cursor, chunk_size rows per fetch) and
+    serialized and encoded one chunk at a time, so memory stays bounded by
+    the chunk size and the first bytes go out before the last row is read.
+
+    Pass ``asynchronous=True`` under ASGI: Django's ASGI handler reads a sync
+    iterator to the end before sending anything, so the chunks are then
+    produced through an async iterator instead.
+    """
+    def encode(rows):
+        # Encode the chunk as one list and drop its brackets
+        return json_dumps(serializer_class(rows, many=True, context=context).data)[1:-1]
+
+    def content():
+        yield b'['
+        chunk, first = [], True
+        for obj in queryset.iterator(chunk_size=chunk_size):
+            chunk.append(obj)
+            if len(chunk) == chunk_size:
+                yield (b'' if first else b',') + encode(chunk)
+                chunk, first = [], False
+        if chunk:
+            yield (b'' if first else b',') + encode(chunk)
+        yield b']'
+
+    chunks = iterate_in_thread(content()) if asynchronous else content()
+    return StreamingHttpResponse(chunks, content_type='application/json')
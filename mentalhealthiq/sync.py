@@ -0,0 +1,164 @@
+"""
+Delta sync for client-side caches.
+
+A client keeps a local copy of facilities, staff, patients, assessments and
+audits and calls /api/sync/ with the cursor from its previous call. The
+cursor holds a high-water mark per entity type:
+
+* ``u``: the (updated_at, pk) of the last changed row returned. Rows are
+  read in that order through the (updated_at, id) indexes with a keyset seek.
+* ``d``: the id of the last Tombstone returned. Deletes are recorded as
+  Tombstone rows by signals.record_tombstone.
+
+Rows touched in the last ``SYNC_SETTLE_SECONDS`` are held back until the
+next call, so a transaction that commits slightly after a later one cannot
+slip behind a high-water mark. Tombstones older than
+``SYNC_TOMBSTONE_RETENTION_DAYS`` are pruned (tasks.prune_tombstones); a
+cursor older than that is answered with ``reset: true`` and a full sync.
+
+Clients should apply ``deleted`` before ``updated`` for each entity type,
+since a patient id can be deleted and then reused.
+"""
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import Max
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .models import Assessment, Audit, Facility, Patient, StaffMember, Tombstone
+from .pagination import seek_filter
+from .serializers import (
+    AssessmentSerializer,
+    AuditSerializer,
+    FacilitySerializer,
+    PatientSerializer,
+    StaffMemberSerializer,
+)
+
+# entity type -> (model, serializer, lookup that scopes rows to one facility)
+SYNC_ENTITIES = {
+    'facilities': (Facility, FacilitySerializer, 'id'),
+    'staff': (StaffMember, StaffMemberSerializer, 'facility_id'),
+    'patients': (Patient, PatientSerializer, 'facility_id'),
+    'assessments': (Assessment, AssessmentSerializer, 'facility_id'),
+    'audits': (Audit, AuditSerializer, 'facility_id'),
+}
+
+SYNC_ORDERING = ('updated_at', 'id')
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def entity_type_for(model):
+    for name, (entity_model, _serializer, _facility_lookup) in SYNC_ENTITIES.items():
+        if entity_model is model:
+            return name
+    return None
+
+
+def settle_window():
+    return timedelta(seconds=getattr(settings, 'SYNC_SETTLE_SECONDS', 2))
+
+
+def tombstone_retention():
+    return timedelta(days=getattr(settings, 'SYNC_TOMBSTONE_RETENTION_DAYS', 90))
+
+
+def encode_cursor(issued_at, marks):
+    token = json.dumps({'t': issued_at.isoformat(), 'e': marks}, separators=(',', ':'))
+    return urlsafe_b64encode(token.encode('utf-8')).decode('ascii')
+
+
+def decode_cursor(encoded):
+    try:
+        token = json.loads(urlsafe_b64decode(encoded.encode('ascii')).decode('utf-8'))
+        issued_at = parse_datetime(token['t'])
+        marks = token['e']
+        if issued_at is None or not isinstance(marks, dict):
+            raise ValueError('Malformed cursor')
+        return issued_at, marks
+    except Exception as exc:
+        raise InvalidCursor('Invalid cursor') from exc
+
+
+def collect_changes(types, since=None, facility_id=None, limit=200, context=None):
+    """
+    Return the changes for ``types`` after the cursor ``since``.
+
+    The result has a new ``cursor``, ``has_more`` (call again straight away),
+    ``reset`` (the client must drop its cache first) and ``changes`` keyed by
+    entity type, each holding serialized ``updated`` rows and ``deleted`` ids.
+    """
+    now = timezone.now()
+    until = now - settle_window()
+    marks, reset = {}, False
+    if since:
+        issued_at, marks = decode_cursor(since)
+        if issued_at < now - tombstone_retention():
+            marks, reset = {}, True
+
+    new_marks, changes, has_more = dict(marks), {}, False
+    for name in types:
+        model, serializer_class, facility_lookup = SYNC_ENTITIES[name]
+        mark = marks.get(name) or {}
+
+        queryset = model.objects.filter(updated_at__lte=until)
+        tombstones = Tombstone.objects.filter(entity_type=name)
+        if facility_id is not None:
+            queryset = queryset.filter(**{facility_lookup: facility_id})
+            tombstones = tombstones.filter(facility_id=facility_id)
+
+        if mark.get('u'):
+            try:
+                values = [model._meta.get_field(field).to_python(value)
+                          for field, value in zip(SYNC_ORDERING, mark['u'])]
+            except Exception as exc:
+                raise InvalidCursor('Invalid cursor') from exc
+            queryset = queryset.filter(seek_filter(SYNC_ORDERING, values))
+        setup_eager_loading = getattr(serializer_class, 'setup_eager_loading', None)
+        if setup_eager_loading is not None:
+            queryset = setup_eager_loading(queryset, set(serializer_class(context=context).fields))
+        rows = list(queryset.order_by(*SYNC_ORDERING)[:limit + 1])
+
+        if 'd' in mark:
+            deleted = list(tombstones.filter(id__gt=mark['d']).order_by('id')
+                           .values_list('id', 'object_id')[:limit + 1])
+        else:
+            # A fresh copy has nothing to delete; start from the newest tombstone
+            deleted = []
+            mark = dict(mark, d=Tombstone.objects.aggregate(last=Max('id'))['last'] or 0)
+
+        has_more = has_more or len(rows) > limit or len(deleted) > limit
+        rows, deleted = rows[:limit], deleted[:limit]
+
+        new_mark = dict(mark)
+        if rows:
+            new_mark['u'] = [model._meta.get_field(field).value_to_string(rows[-1])
+                             for field in SYNC_ORDERING]
+        if deleted:
+            new_mark['d'] = deleted[-1][0]
+        new_marks[name] = new_mark
+
+        changes[name] = {
+            'updated': serializer_class(rows, many=True, context=context).data,
+            'deleted': [object_id for _id, object_id in deleted],
+        }
+
+    return {
+        'cursor': encode_cursor(now, new_marks),
+        'has_more': has_more,
+        'reset': reset,
+        'changes': changes,
+    }
+
+
+def prune_tombstones(older_than=None):
+    """Delete tombstones past the retention window; returns how many went."""
+    cutoff = timezone.now() - (older_than or tombstone_retention())
+    deleted, _ = Tombstone.objects.filter(deleted_at__lt=cutoff).delete()
+    return deleted
@@ -0,0 +1,50 @@
+from rest_framework import status
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import AllowAny
+from rest_framework.response import Response
+from .sync import SYNC_ENTITIES, InvalidCursor, collect_changes
+
+DEFAULT_LIMIT = 200
+MAX_LIMIT = 1000
+
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def sync_view(request):
+    """
+    Change feed for client caches.
+
+    Query params: since (the cursor from the previous response; omit for a
+    full sync), types (comma separated subset of the entity types), facility
+    (only rows belonging to that facility) and limit (rows per entity type).
+    Keep calling with the new cursor while has_more is true.
+    """
+    types = list(SYNC_ENTITIES)
+    if request.query_params.get('types'):
+        types = [name.strip() for name in request.query_params['types'].split(',') if name.strip()]
+        unknown = sorted(set(types) - set(SYNC_ENTITIES))
+        if unknown:
+            return Response({
+                'error': f"Unknown types: {', '.join(unknown)}. Valid types: {', '.join(SYNC_ENTITIES)}"
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+    try:
+        facility_id = request.query_params.get('facility')
+        facility_id = int(facility_id) if facility_id else None
+        limit = min(int(request.query_params.get('limit', DEFAULT_LIMIT)), MAX_LIMIT)
+    except ValueError:
+        return Response({'error': 'facility and limit must be integers'}, status=status.HTTP_400_BAD_REQUEST)
+    if limit < 1:
+        limit = DEFAULT_LIMIT
+
+    try:
+        result = collect_changes(
+            types,
+            since=request.query_params.get('since'),
+            facility_id=facility_id,
+            limit=limit,
+            context={'request': request},
+        )
+    except InvalidCursor:
+        return Response({'error': 'Invalid since cursor; start a full sync without it'},
+                        status=status.HTTP_400_BAD_REQUEST)
+    return Response(result)
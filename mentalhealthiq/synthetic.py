@@ -0,0 +1,520 @@
+"""
+Seeded synthetic data for load tests and benchmarks.
+
+Data is sized by a scale factor, TPC style. Dimension tables (assessment and
+audit criteria, benchmark criteria) have a fixed size; everything else grows
+linearly with the scale factor. At scale 1:
+
+* 20 facilities, each with 10 staff, 500 patients, 5,000 assessments
+  (10 per patient, with indicator scores for the completed ones), 24 audits,
+  12 monthly rankings and a metric snapshot per metric type;
+* 20 users, 5 pending users, 50 reports, 10 benchmark comparisons and
+  20 feedback items with comments.
+
+So scale 100 loads 10M assessments. Every facility block is generated from
+its own random stream, seeded from (seed, facility number), so the same seed,
+scale and end date produce the same rows whether the blocks run in one
+process or in a multiprocessing pool. Rows are written with bulk_create, one
+transaction per table per facility block. created_at/updated_at are load
+time, since bulk_create applies auto_now.
+
+Completed assessments get the score their indicator scores imply (see
+scoring.py), and completed audits the mean of their criterion scores.
+"""
+from contextlib import contextmanager
+from datetime import timedelta
+import multiprocessing
+import random
+import uuid
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.color import no_style
+from django.db import connection, connections, transaction
+from django.utils import timezone
+
+from .models import (
+    Assessment, AssessmentCriteria, Audit, AuditCriteria, AuditCriterionName, BenchmarkComparison,
+    BenchmarkCriteria, Facility, FacilityRanking, Feedback, FeedbackComment, Indicator, IndicatorScore,
+    MetricSnapshot, Patient, PendingUser, Report, StaffMember, StaffQualification, Tombstone, User,
+)
+from .search import (
+    drop_patient_index, drop_search_index, install_patient_index, install_search_index,
+    patient_index_available, search_index_available,
+)
+from . import scoring
+
+# Rows per unit of scale factor
+PER_SCALE = {
+    'facilities': 20,
+    'users': 20,
+    'pending_users': 5,
+    'reports': 50,
+    'benchmark_comparisons': 10,
+    'feedback': 20,
+}
+
+# Rows per facility; these do not depend on the scale factor
+PER_FACILITY = {
+    'staff': 10,
+    'patients': 500,
+    'audits': 24,
+    'rankings': 12,
+}
+ASSESSMENTS_PER_PATIENT = 10
+
+# Fixed dimension tables, the same set populate_db.py creates
+CRITERIA = [
+    ('Mental Health Assessment', 'Clinical', 'Assessment',
+     [('Depression Screening', 0.3), ('Anxiety Assessment', 0.3), ('Suicide Risk', 0.4)]),
+    ('Treatment Planning', 'Clinical', 'Assessment',
+     [('Goals Defined', 0.25), ('Patient Involvement', 0.25), ('Evidence-Based Approaches', 0.25),
+      ('Regular Review', 0.25)]),
+    ('Therapeutic Environment', 'Facility', 'Audit',
+     [('Safety Measures', 0.3), ('Comfort & Privacy', 0.3), ('Therapeutic Activities', 0.4)]),
+    ('Staff Competency', 'Administrative', 'Audit',
+     [('Required Credentials', 0.4), ('Continuing Education', 0.3), ('Supervision Quality', 0.3)]),
+    ('Patient Rights', 'Ethical', 'Assessment',
+     [('Informed Consent', 0.25), ('Confidentiality', 0.25), ('Complaint Process', 0.25),
+      ('Dignity & Respect', 0.25)]),
+    ('Care Coordination', 'Administrative', 'Assessment',
+     [('Information Sharing', 0.3), ('Referral Process', 0.3), ('Discharge Planning', 0.4)]),
+    ('Outcomes Measurement', 'Quality Improvement', 'Audit',
+     [('Standard Measures Used', 0.3), ('Regular Data Collection', 0.3), ('Results Utilization', 0.4)]),
+]
+BENCHMARK_CRITERIA = [
+    ('Audit performance', 'audit', 0.6),
+    ('Assessment completion', 'assessment', 0.4),
+]
+
+FIRST_NAMES = ['James', 'Mary', 'John', 'Patricia', 'Robert', 'Jennifer', 'Michael', 'Linda', 'William',
+               'Elizabeth', 'David', 'Susan', 'Richard', 'Jessica', 'Joseph', 'Sarah', 'Thomas', 'Karen']
+LAST_NAMES = ['Smith', 'Johnson', 'Williams', 'Jones', 'Brown', 'Davis', 'Miller', 'Wilson', 'Moore',
+              'Taylor', 'Anderson', 'Thomas', 'Jackson', 'White', 'Harris', 'Martin', 'Thompson', 'Garcia']
+FACILITY_TYPES = ['Hospital', 'Clinic', 'Community Center', 'Specialized Unit', 'Treatment Center']
+PROVINCES = ['Northern', 'Southern', 'Eastern', 'Western', 'Central']
+DISTRICTS = ['District A', 'District B', 'District C', 'District D', 'District E']
+POSITIONS = ['Doctor', 'Nurse', 'Therapist', 'Psychologist', 'Psychiatrist', 'Social Worker', 'Administrator']
+DEPARTMENTS = ['Psychiatry', 'Psychology', 'Therapy', 'Admin', 'Social Services', 'Outpatient', 'Emergency']
+QUALIFICATIONS = ['MD', 'PhD', 'RN', 'MSW', 'LCSW', 'PsyD', 'MBA', 'MPH', 'BSc Nursing', 'Certified Therapist']
+MISSED_REASONS = ['Patient unavailable', 'Patient declined', 'Staff shortage', 'Rescheduled by facility']
+
+# Rating scale of the evaluation screens, weighted towards good ratings
+RATINGS = (100, 75, 50, 25, 0)
+RATING_WEIGHTS = (30, 35, 20, 10, 5)
+
+# Models removed by clear_data(), children first; superusers are kept
+GENERATED_MODELS = [
+    FeedbackComment, Feedback, BenchmarkComparison, FacilityRanking, MetricSnapshot, Report,
+    AuditCriteria, AuditCriterionName, Audit, IndicatorScore, Assessment, Patient, StaffQualification,
+    StaffMember, Indicator, AssessmentCriteria, BenchmarkCriteria, Facility, PendingUser, Tombstone,
+]
+
+
+def scaled(name, scale):
+    return max(1, round(PER_SCALE[name] * scale))
+
+
+def _uuid(rng):
+    return uuid.UUID(int=rng.getrandbits(128), version=4)
+
+
+def _phone(rng):
+    return f'+{rng.randint(1, 9)}{rng.randint(10, 99)}{rng.randint(1000000, 9999999)}'
+
+
+def _rating(rng):
+    return rng.choices(RATINGS, RATING_WEIGHTS)[0]
+
+
+@contextmanager
+def search_indexes_suspended():
+    """
+    Drop the SQLite full-text indexes for a bulk load and rebuild them once at
+    the end; maintaining them row by row costs more than the load itself.
+    """
+    patient_index = patient_index_available(connection)
+    search_index = search_index_available(connection)
+    drop_patient_index(connection)
+    drop_search_index(connection)
+    try:
+        yield
+    finally:
+        if patient_index:
+            install_patient_index(connection)
+        if search_index:
+            install_search_index(connection)
+
+
+def clear_data():
+    """Empty every table the generator fills and restart their ids (one flush, not a cascade)."""
+    tables = [model._meta.db_table for model in GENERATED_MODELS]
+    connection.ops.execute_sql_flush(connection.ops.sql_flush(no_style(), tables, reset_sequences=True))
+    User.objects.filter(is_superuser=False).delete()
+
+
+def create_dimensions():
+    """Get or create the fixed criteria; returns the spec the facility blocks need."""
+    assessment_criteria, audit_criteria = [], []
+    for name, category, purpose, indicators in CRITERIA:
+        criterion, created = AssessmentCriteria.objects.get_or_create(
+            name=name, purpose=purpose, defaults={'category': category},
+        )
+        if created:
+            Indicator.objects.bulk_create(
+                [Indicator(criteria=criterion, name=indicator, weight=weight) for indicator, weight in indicators]
+            )
+        if purpose == 'Assessment':
+            weights = list(criterion.indicators.order_by('id').values_list('id', 'weight'))
+            assessment_criteria.append((criterion.id, weights))
+        else:
+            audit_criteria.append(AuditCriterionName.intern(name).id)
+    for name, category, weight in BENCHMARK_CRITERIA:
+        BenchmarkCriteria.objects.get_or_create(name=name, category=category, defaults={'weight': weight})
+    return assessment_criteria, audit_criteria
+
+
+def create_people(rng, scale, password, batch_size):
+    """Users and pending users; returns (user ids, evaluator ids)."""
+    password_hash = make_password(password)
+    users = []
+    for n in range(scaled('users', scale)):
+        first_name, last_name = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        users.append(User(
+            id=_uuid(rng),
+            username=f'synthetic{n}',
+            email=f'synthetic{n}@example.com',
+            password=password_hash,
+            role=rng.choice(('admin', 'evaluator', 'evaluator', 'viewer')),
+            display_name=f'{first_name} {last_name}',
+            first_name=first_name,
+            last_name=last_name,
+            phone_number=_phone(rng),
+        ))
+    User.objects.bulk_create(users, batch_size=batch_size)
+    PendingUser.objects.bulk_create([
+        PendingUser(
+            id=_uuid(rng),
+            username=f'synthetic_pending{n}',
+            email=f'synthetic_pending{n}@example.com',
+            password=password_hash,
+            role=rng.choice(('evaluator', 'viewer')),
+            display_name=f'{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}',
+        )
+        for n in range(scaled('pending_users', scale))
+    ], batch_size=batch_size)
+    user_ids = [user.id for user in users]
+    evaluators = [user.id for user in users if user.role == 'evaluator']
+    return user_ids, evaluators or user_ids
+
+
+def create_facilities(rng, scale, end, batch_size):
+    facilities = []
+    for n in range(scaled('facilities', scale)):
+        facility_type, province, district = rng.choice(FACILITY_TYPES), rng.choice(PROVINCES), rng.choice(DISTRICTS)
+        name = f'{province} {facility_type} {n + 1}'
+        facilities.append(Facility(
+            name=name,
+            facility_type=facility_type,
+            address=f'{rng.randint(100, 999)} Main St, {district}',
+            city=f'City {rng.randint(1, 50)}',
+            province=province,
+            district=district,
+            postal_code=str(rng.randint(10000, 99999)),
+            capacity=rng.randint(20, 500),
+            status=rng.choices(('Active', 'Under Review', 'Inactive'), (90, 7, 3))[0],
+            contact_name=f'{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}',
+            contact_email=f'facility{n + 1}@example.com',
+            contact_phone=_phone(rng),
+            established_date=(end - timedelta(days=rng.randint(365, 365 * 40))).date(),
+            last_inspection_date=(end - timedelta(days=rng.randint(0, 365))).date(),
+            description=f'{facility_type} serving {district}, {province} province.',
+        ))
+    return Facility.objects.bulk_create(facilities, batch_size=batch_size)
+
+
+def generate_facility_block(spec, number, facility_id):
+    """Staff, patients, assessments, audits, rankings and snapshots of one facility."""
+    rng = random.Random(f"{spec['seed']}:facility:{number}")
+    end, days, batch_size = spec['end'], spec['days'], spec['batch_size']
+
+    staff, qualifications = [], []
+    for n in range(PER_FACILITY['staff']):
+        staff_id = f"SS{number * PER_FACILITY['staff'] + n:08d}"
+        staff.append(StaffMember(
+            id=staff_id,
+            name=f'{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}',
+            position=rng.choice(POSITIONS),
+            department=rng.choice(DEPARTMENTS),
+            facility_id=facility_id,
+            join_date=(end - timedelta(days=rng.randint(30, 365 * 20))).date(),
+            status=rng.choices(('Active', 'On Leave', 'Former'), (85, 10, 5))[0],
+            email=f'{staff_id.lower()}@example.com',
+            phone=_phone(rng),
+        ))
+        qualifications += [
+            StaffQualification(staff_id=staff_id, qualification=qualification)
+            for qualification in rng.sample(QUALIFICATIONS, rng.randint(1, 3))
+        ]
+
+    patients = []
+    for n in range(PER_FACILITY['patients']):
+        serial = number * PER_FACILITY['patients'] + n
+        first_name, last_name = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        patients.append(Patient(
+            id=f'SP{serial:09d}',
+            first_name=first_name,
+            last_name=last_name,
+            date_of_birth=(end - timedelta(days=rng.randint(18 * 365, 85 * 365))).date(),
+            gender=rng.choice(('M', 'F', 'O')),
+            address=f'{rng.randint(1, 999)} Patient St, City {rng.randint(1, 50)}',
+            phone=_phone(rng),
+            email=f'patient{serial}@example.com',
+            national_id=f'SYN{serial:010d}',
+            status=rng.choices(('Active', 'Discharged', 'Referred', 'Inactive'), (75, 15, 5, 5))[0],
+            facility_id=facility_id,
+            primary_staff_id=rng.choice(staff).id,
+            registration_date=(end - timedelta(days=rng.randint(days, days + 5 * 365))).date(),
+            emergency_contact_name=f'{rng.choice(FIRST_NAMES)} {last_name}',
+            emergency_contact_phone=_phone(rng),
+        ))
+
+    assessments, indicator_scores = [], []
+    for patient in patients:
+        for _ in range(ASSESSMENTS_PER_PATIENT):
+            assessment = Assessment(
+                id=_uuid(rng),
+                patient_id=patient.id,
+                facility_id=facility_id,
+                scheduled_date=end - timedelta(seconds=rng.randint(-30 * 86400, days * 86400)),
+            )
+            if assessment.scheduled_date > end:
+                assessment.status = 'scheduled'
+            elif rng.random() < 0.8:
+                assessment.status = 'completed'
+                assessment.assessment_date = assessment.scheduled_date + timedelta(minutes=rng.randint(0, 120))
+                assessment.evaluator_id = rng.choice(spec['evaluators'])
+                assessment.criteria_id, weights = rng.choice(spec['assessment_criteria'])
+                weighted = total_weight = 0
+                for indicator_id, weight in weights:
+                    score = _rating(rng)
+                    indicator_scores.append(IndicatorScore(assessment_id=assessment.id, indicator_id=indicator_id, score=score))
+                    weighted += score * weight
+                    total_weight += weight
+                assessment.score = scoring.overall_score([scoring.criterion_score(weighted, total_weight)])
+            else:
+                assessment.status = 'missed'
+                assessment.missed_reason = rng.choice(MISSED_REASONS)
+            assessments.append(assessment)
+
+    audits, audit_scores = [], []
+    for n in range(PER_FACILITY['audits']):
+        # Spread over the window, roughly one every two weeks, the last one upcoming
+        audit = Audit(
+            id=_uuid(rng),
+            facility_id=facility_id,
+            scheduled_date=end - timedelta(days=days * (n - 1) / PER_FACILITY['audits'], hours=rng.randint(0, 48)),
+        )
+        if audit.scheduled_date > end:
+            audit.status = 'scheduled'
+        elif rng.random() < 0.9:
+            audit.status = 'completed'
+            audit.audit_date = audit.scheduled_date
+            audit.auditor_id = rng.choice(spec['evaluators'])
+            scores = [_rating(rng) for _ in spec['audit_criteria']]
+            audit_scores += [
+                AuditCriteria(audit_id=audit.id, criterion_id=criterion_id, score=score)
+                for criterion_id, score in zip(spec['audit_criteria'], scores)
+            ]
+            audit.overall_score = round(sum(scores) / len(scores), 1) if scores else 0
+        else:
+            audit.status = 'missed'
+            audit.missed_reason = 'Facility unavailable'
+        audits.append(audit)
+
+    active = sum(patient.status == 'Active' for patient in patients)
+    completed = sum(assessment.status == 'completed' for assessment in assessments)
+    snapshots = [
+        MetricSnapshot(
+            facility_id=facility_id,
+            metric_type=metric_type,
+            active_patients=active,
+            discharged_patients=sum(patient.status == 'Discharged' for patient in patients),
+            inactive_patients=len(patients) - active,
+            capacity_utilization=round(rng.uniform(40, 100), 1),
+            scheduled_assessments=len(assessments),
+            completed_assessments=completed,
+            completion_rate=round(completed / len(assessments) * 100, 1),
+        )
+        for metric_type, _label in MetricSnapshot.METRIC_TYPES
+    ]
+
+    # Each bulk_create is its own transaction, so parallel workers take turns
+    # on SQLite's single write lock in short slices
+    StaffMember.objects.bulk_create(staff, batch_size=batch_size)
+    StaffQualification.objects.bulk_create(qualifications, batch_size=batch_size)
+    Patient.objects.bulk_create(patients, batch_size=batch_size)
+    Assessment.objects.bulk_create(assessments, batch_size=batch_size)
+    IndicatorScore.objects.bulk_create(indicator_scores, batch_size=batch_size)
+    Audit.objects.bulk_create(audits, batch_size=batch_size)
+    AuditCriteria.objects.bulk_create(audit_scores, batch_size=batch_size)
+    MetricSnapshot.objects.bulk_create(snapshots, batch_size=batch_size)
+
+    return {
+        'staff': len(staff),
+        'patients': len(patients),
+        'assessments': len(assessments),
+        'indicator scores': len(indicator_scores),
+        'audits': len(audits),
+        'audit criteria scores': len(audit_scores),
+        'metric snapshots': len(snapshots),
+    }
+
+
+def _generate_block_in_worker(args):
+    spec = args[0]
+    if connection.settings_dict['NAME'] != spec['database']:
+        # A spawned worker starts from settings, not from the parent's
+        # connection (which benchmark_endpoints points at another database)
+        connection.close()
+        connection.settings_dict['NAME'] = spec['database']
+    try:
+        return generate_facility_block(*args)
+    finally:
+        connections.close_all()
+
+
+def _init_worker():
+    import django
+    django.setup()
+    if connection.vendor == 'sqlite':
+        # Workers queue for the single writer; wait longer than the 5s default,
+        # and take the write lock at BEGIN: a deferred transaction that has
+        # read cannot wait for it and fails with "database is locked"
+        connection.settings_dict['OPTIONS'].setdefault('timeout', 60)
+        connection.settings_dict['OPTIONS']['transaction_mode'] = 'IMMEDIATE'
+
+
+def create_rankings(rng, facility_ids, end, batch_size):
+    """Monthly rankings; each month is a random permutation of the facilities."""
+    rankings, previous = [], {}
+    for month in range(PER_FACILITY['rankings'] - 1, -1, -1):
+        ranking_date = end.replace(minute=0, second=0, microsecond=0) - timedelta(days=30 * month)
+        order = rng.sample(facility_ids, len(facility_ids))
+        for rank, facility_id in enumerate(order, start=1):
+            rankings.append(FacilityRanking(
+                facility_id=facility_id,
+                ranking_date=ranking_date,
+                overall_rank=rank,
+                total_facilities=len(order),
+                audit_score=round(100 - 60 * rank / len(order), 1),
+                previous_rank=previous.get(facility_id),
+            ))
+            previous[facility_id] = rank
+    FacilityRanking.objects.bulk_create(rankings, batch_size=batch_size)
+    return len(rankings)
+
+
+def create_activity(rng, scale, facility_ids, user_ids, end, batch_size):
+    """Reports, benchmark comparisons and feedback."""
+    reports = []
+    for n in range(scaled('reports', scale)):
+        report_type = rng.choice(('assessment', 'audit', 'facility', 'patient', 'staff'))
+        generated_at = end - timedelta(seconds=rng.randint(0, 365 * 86400))
+        reports.append(Report(
+            id=_uuid(rng),
+            title=f'{report_type.title()} Report {n + 1}',
+            report_type=report_type,
+            description=f'Synthetic {report_type} report',
+            generated_by_id=rng.choice(user_ids),
+            generated_at=generated_at,
+            file_path=f"/reports/{report_type}_{n + 1}_{generated_at:%Y%m%d}.pdf",
+            parameters={'facility_ids': rng.sample(facility_ids, min(3, len(facility_ids)))},
+        ))
+    Report.objects.bulk_create(reports, batch_size=batch_size)
+
+    comparisons = []
+    for _ in range(scaled('benchmark_comparisons', scale) if len(facility_ids) > 1 else 0):
+        facility_a, facility_b = rng.sample(facility_ids, 2)
+        score_a, score_b = round(rng.uniform(40, 100), 1), round(rng.uniform(40, 100), 1)
+        comparisons.append(BenchmarkComparison(
+            id=_uuid(rng),
+            facility_a_id=facility_a,
+            facility_b_id=facility_b,
+            comparison_date=end - timedelta(seconds=rng.randint(0, 90 * 86400)),
+            overall_score_a=score_a,
+            overall_score_b=score_b,
+            detailed_results={'facility_a': {'audit_scores': {'average': score_a}},
+                              'facility_b': {'audit_scores': {'average': score_b}}},
+            created_by_id=rng.choice(user_ids),
+        ))
+    BenchmarkComparison.objects.bulk_create(comparisons, batch_size=batch_size)
+
+    feedback = Feedback.objects.bulk_create([
+        Feedback(
+            title=f'Feedback {n + 1}',
+            description='Synthetic feedback about the dashboard.',
+            submitted_by_id=rng.choice(user_ids),
+            status=rng.choice(('pending', 'under_review', 'done')),
+        )
+        for n in range(scaled('feedback', scale))
+    ], batch_size=batch_size)
+    comments = [
+        FeedbackComment(feedback=item, comment=f'Comment {n + 1}', added_by_id=rng.choice(user_ids))
+        for item in feedback
+        for n in range(rng.randint(0, 3))
+    ]
+    FeedbackComment.objects.bulk_create(comments, batch_size=batch_size)
+    return {
+        'reports': len(reports),
+        'benchmark comparisons': len(comparisons),
+        'feedback': len(feedback),
+        'feedback comments': len(comments),
+    }
+
+
+def generate(scale=1, seed=0, end=None, days=365, workers=1, batch_size=5000, password='password123',
+             progress=None):
+    """Load a dataset of the given scale factor; returns {table label: rows created}."""
+    end = end or timezone.now()
+    rng = random.Random(f'{seed}:shared')
+    counts = {}
+
+    with transaction.atomic():
+        assessment_criteria, audit_criteria = create_dimensions()
+        user_ids, evaluators = create_people(rng, scale, password, batch_size)
+        facility_ids = [facility.id for facility in create_facilities(rng, scale, end, batch_size)]
+    counts['users'] = len(user_ids)
+    counts['facilities'] = len(facility_ids)
+
+    spec = {
+        'database': connection.settings_dict['NAME'],
+        'seed': seed,
+        'end': end,
+        'days': days,
+        'batch_size': batch_size,
+        'evaluators': evaluators,
+        'assessment_criteria': assessment_criteria,
+        'audit_criteria': audit_criteria,
+    }
+    blocks = [(spec, number, facility_id) for number, facility_id in enumerate(facility_ids)]
+
+    def add(block_counts):
+        for label, count in block_counts.items():
+            counts[label] = counts.get(label, 0) + count
+        if progress:
+            progress(counts)
+
+    if workers <= 1:
+        for block in blocks:
+            add(generate_facility_block(*block))
+    else:
+        # Forked workers must not share the parent's database connections
+        connections.close_all()
+        with multiprocessing.Pool(workers, initializer=_init_worker) as pool:
+            for block_counts in pool.imap_unordered(_generate_block_in_worker, blocks):
+                add(block_counts)
+
+    with transaction.atomic():
+        counts['facility rankings'] = create_rankings(rng, facility_ids, end, batch_size)
+        counts.update(create_activity(rng, scale, facility_ids, user_ids, end, batch_size))
+    return counts
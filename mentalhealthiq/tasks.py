@@ -2,6 +2,7 @@ from celery import shared_task
 from django.utils import timezone
 from django.db.models import Count, Q
 from .models import Audit, Facility, Patient, Assessment, MetricSnapshot
+from . import scoring, sync
 
 @shared_task
 def check_missed_audits():
@@ -20,7 +21,8 @@ def check_missed_audits():
     # Update them to missed status
     overdue_audits.update(
         status='missed',
-        missed_reason='Automatically marked as missed - scheduled date passed'
+        missed_reason='Automatically marked as missed - scheduled date passed',
+        updated_at=current_time
     )
     
     return f"Updated {overdue_audits.count()} overdue audits to missed status" 
@@ -109,4 +111,29 @@ def update_facility_metrics():
             errors.append(error_msg)
             continue
     
-    return f"Created metrics snapshots for {metrics_created} facilities. Errors: {len(errors)}" 
\ No newline at end of file
+    return f"Created metrics snapshots for {metrics_created} facilities. Errors: {len(errors)}" 
+
+@shared_task
+def prune_tombstones():
+    """
+    Delete change-feed tombstones older than SYNC_TOMBSTONE_RETENTION_DAYS.
+    Clients whose cursor is older than that get a full resync.
+    """
+    return f"Pruned {sync.prune_tombstones()} tombstones"
+
+@shared_task
+def recompute_assessment_scores(criteria_id=None):
+    """
+    Recompute assessment scores from indicator weights (all assessments, or
+    those scored on one criterion), one recompute_score_chunk task per chunk
+    so the work spreads over every worker.
+    """
+    chunks = 0
+    for chunk in scoring.assessment_id_chunks(criteria_id):
+        recompute_score_chunk.delay([str(assessment_id) for assessment_id in chunk])
+        chunks += 1
+    return f"Queued {chunks} score recompute chunks"
+
+@shared_task
+def recompute_score_chunk(assessment_ids):
+    return f"Updated {scoring.recompute_chunk(assessment_ids)} assessment scores"
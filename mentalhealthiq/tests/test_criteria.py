@@ -0,0 +1,148 @@
+from datetime import date, timedelta
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework import serializers
+
+from mentalhealthiq.models import (
+    Assessment,
+    AssessmentCriteria,
+    Facility,
+    Indicator,
+    IndicatorScore,
+    Patient,
+)
+from mentalhealthiq.serializers import AssessmentCriteriaSerializer
+
+
+def indicator_writes(queries):
+    return [
+        query['sql'] for query in queries
+        if query['sql'].startswith(('UPDATE', 'INSERT', 'DELETE')) and 'mentalhealthiq_indicator"' in query['sql']
+    ]
+
+
+class SyncIndicatorsTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.facility = Facility.objects.create(
+            name='Riverside Clinic', facility_type='Clinic', address='1 River Road',
+            district='North', province='Central',
+        )
+        patient = Patient.objects.create(
+            id='CR0000001', first_name='Thandiwe', last_name='Mokoena', date_of_birth=date(1990, 5, 1),
+            gender='F', address='2 Hill Street', facility=cls.facility, registration_date=date(2024, 1, 1),
+        )
+        cls.criterion = AssessmentCriteria.objects.create(name='Care', category='Clinical', purpose='Assessment')
+        cls.other_criterion = AssessmentCriteria.objects.create(name='Safety', category='Clinical', purpose='Assessment')
+        cls.plan = Indicator.objects.create(criteria=cls.criterion, name='Plan', weight=1)
+        cls.review = Indicator.objects.create(criteria=cls.criterion, name='Review', weight=2)
+        cls.consent = Indicator.objects.create(criteria=cls.criterion, name='Consent', weight=1)
+        cls.foreign = Indicator.objects.create(criteria=cls.other_criterion, name='Plan', weight=1)
+        cls.assessments = Assessment.objects.bulk_create([
+            Assessment(patient=patient, facility=cls.facility, criteria=cls.criterion, status='completed')
+            for _ in range(3)
+        ])
+        IndicatorScore.objects.bulk_create([
+            IndicatorScore(assessment=assessment, indicator=indicator, score=50)
+            for assessment in cls.assessments
+            for indicator in (cls.plan, cls.review, cls.consent)
+        ])
+
+    def sync(self, indicators):
+        serializer = AssessmentCriteriaSerializer(self.criterion, data={'indicators': indicators}, partial=True)
+        serializer.is_valid(raise_exception=True)
+        with self.captureOnCommitCallbacks() as callbacks:
+            serializer.save()
+        return callbacks
+
+    def indicators(self):
+        return list(self.criterion.indicators.order_by('id').values_list('id', 'name', 'weight'))
+
+    def current_payload(self):
+        return [{'id': pk, 'name': name, 'weight': weight} for pk, name, weight in self.indicators()]
+
+    def test_one_weight_edit_is_a_single_update_and_keeps_every_score(self):
+        payload = self.current_payload()
+        payload[1]['weight'] = 3
+        with CaptureQueriesContext(connection) as queries:
+            callbacks = self.sync(payload)
+        writes = indicator_writes(queries)
+        self.assertEqual(len(writes), 1)
+        self.assertTrue(writes[0].startswith('UPDATE "mentalhealthiq_indicator"'))
+        self.assertEqual(Indicator.objects.get(pk=self.review.pk).weight, 3)
+        self.assertEqual(IndicatorScore.objects.count(), 9)
+        # The weight change queues a score recompute
+        self.assertEqual(len(callbacks), 1)
+
+    def test_unchanged_payload_writes_nothing(self):
+        with CaptureQueriesContext(connection) as queries:
+            callbacks = self.sync(self.current_payload())
+        self.assertEqual(indicator_writes(queries), [])
+        self.assertEqual(callbacks, [])
+
+    def test_matches_by_id_before_name(self):
+        # "Plan" is renamed by id; the new "Review" entry would match the old
+        # Review by name, but that row is already claimed by its id
+        self.sync([
+            {'id': self.plan.pk, 'name': 'Care plan', 'weight': 1},
+            {'id': self.review.pk, 'name': 'Plan', 'weight': 2},
+            {'name': 'Consent', 'weight': 1},
+        ])
+        self.assertEqual(self.indicators(), [
+            (self.plan.pk, 'Care plan', 1), (self.review.pk, 'Plan', 2), (self.consent.pk, 'Consent', 1),
+        ])
+        self.assertEqual(IndicatorScore.objects.count(), 9)
+
+    def test_matches_by_name_creates_and_deletes(self):
+        past = timezone.now() - timedelta(days=1)
+        Assessment.objects.update(updated_at=past)
+        callbacks = self.sync([
+            {'name': 'Review', 'weight': 2},
+            {'name': 'Follow-up', 'weight': 1},
+            {'name': 'Plan', 'weight': 1},
+        ])
+        rows = self.indicators()
+        self.assertEqual(rows[:2], [(self.plan.pk, 'Plan', 1), (self.review.pk, 'Review', 2)])
+        self.assertEqual(rows[2][1:], ('Follow-up', 1))
+        self.assertFalse(Indicator.objects.filter(pk=self.consent.pk).exists())
+        # Consent's scores went with it, and their assessments were touched
+        self.assertEqual(IndicatorScore.objects.count(), 6)
+        self.assertEqual(Assessment.objects.filter(updated_at__gt=past).count(), 3)
+        self.assertEqual(len(callbacks), 1)
+
+    def test_duplicate_names_match_one_row_each(self):
+        second_plan = Indicator.objects.create(criteria=self.criterion, name='Plan', weight=1)
+        self.sync([
+            {'name': 'Plan', 'weight': 1},
+            {'name': 'Plan', 'weight': 1},
+            {'name': 'Review', 'weight': 2},
+            {'name': 'Consent', 'weight': 1},
+        ])
+        self.assertEqual([row[0] for row in self.indicators()],
+                         [self.plan.pk, self.review.pk, self.consent.pk, second_plan.pk])
+
+    def test_duplicate_id_is_rejected(self):
+        with self.assertRaisesMessage(serializers.ValidationError, 'listed more than once'):
+            self.sync([
+                {'id': self.plan.pk, 'name': 'Plan', 'weight': 1},
+                {'id': self.plan.pk, 'name': 'Plan', 'weight': 2},
+            ])
+        self.assertEqual(len(self.indicators()), 3)
+
+    def test_foreign_id_is_rejected(self):
+        with self.assertRaisesMessage(serializers.ValidationError, 'does not belong to this criterion'):
+            self.sync([{'id': self.foreign.pk, 'name': 'Plan', 'weight': 1}])
+        self.assertEqual(Indicator.objects.get(pk=self.foreign.pk).criteria_id, self.other_criterion.pk)
+        self.assertEqual(len(self.indicators()), 3)
+
+    def test_missing_indicators_key_leaves_indicators_alone(self):
+        before = self.indicators()
+        serializer = AssessmentCriteriaSerializer(self.criterion, data={'name': 'Care and planning'}, partial=True)
+        serializer.is_valid(raise_exception=True)
+        serializer.save()
+        self.assertEqual(self.indicators(), before)
+        self.assertEqual(IndicatorScore.objects.count(), 9)
@@ -0,0 +1,57 @@
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.test import TransactionTestCase
+from django.utils import timezone
+
+from mentalhealthiq.search import drop_search_triggers, restore_search_indexes
+
+BEFORE = [('mentalhealthiq', '0012_search_index_update_columns')]
+AFTER = [('mentalhealthiq', '0013_audit_criterion_names')]
+
+
+class AuditCriterionNamesMigrationTests(TransactionTestCase):
+    """0013_audit_criterion_names moves criteria_name strings into AuditCriterionName and back."""
+
+    def migrate(self, targets):
+        # As the migrate command does (apps.py): the search triggers would
+        # block the table rebuilds, and would index with the latest schema
+        drop_search_triggers(connection)
+        executor = MigrationExecutor(connection)
+        executor.migrate(targets)
+        return executor.loader.project_state(targets).apps
+
+    def tearDown(self):
+        executor = MigrationExecutor(connection)
+        executor.migrate(executor.loader.graph.leaf_nodes())
+        restore_search_indexes(connection)
+
+    def create_audit_scores(self, apps, names):
+        Facility = apps.get_model('mentalhealthiq', 'Facility')
+        Audit = apps.get_model('mentalhealthiq', 'Audit')
+        AuditCriteria = apps.get_model('mentalhealthiq', 'AuditCriteria')
+        facility = Facility.objects.create(
+            name='Riverside Clinic', facility_type='Clinic', address='1 River Road',
+            district='North', province='Central',
+        )
+        audit = Audit.objects.create(facility=facility, scheduled_date=timezone.now())
+        return [
+            AuditCriteria.objects.create(audit=audit, criteria_name=name, score=score).pk
+            for score, name in enumerate(names)
+        ]
+
+    def test_backfill_and_reverse(self):
+        names = ['Safety', 'Privacy', 'Safety', 'Staffing']
+        ids = self.create_audit_scores(self.migrate(BEFORE), names)
+
+        apps = self.migrate(AFTER)
+        AuditCriteria = apps.get_model('mentalhealthiq', 'AuditCriteria')
+        AuditCriterionName = apps.get_model('mentalhealthiq', 'AuditCriterionName')
+        self.assertCountEqual(AuditCriterionName.objects.values_list('name', flat=True),
+                              ['Safety', 'Privacy', 'Staffing'])
+        interned = dict(AuditCriteria.objects.values_list('pk', 'criterion__name'))
+        self.assertEqual([interned[pk] for pk in ids], names)
+
+        apps = self.migrate(BEFORE)
+        AuditCriteria = apps.get_model('mentalhealthiq', 'AuditCriteria')
+        restored = dict(AuditCriteria.objects.values_list('pk', 'criteria_name'))
+        self.assertEqual([restored[pk] for pk in ids], names)
@@ -0,0 +1,46 @@
+"""
+Checks of the PostgreSQL configuration (settings.DATABASE_ENGINE). They are
+skipped on SQLite; run them against a scratch server with e.g.
+
+    DATABASE_ENGINE=postgresql DATABASE_HOST=localhost DATABASE_USER=... \
+        python manage.py test mentalhealthiq.tests.test_postgresql
+
+The test runner creates the test database by running every migration, so
+a migration that only works on SQLite fails here before any test runs.
+"""
+from datetime import date
+from unittest import skipUnless
+
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.test import TestCase
+
+from mentalhealthiq.models import Facility, Patient
+from mentalhealthiq.search import patient_index_available, search_patients
+
+
+@skipUnless(connection.vendor == 'postgresql', 'needs DATABASE_ENGINE=postgresql')
+class PostgreSQLTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.facility = Facility.objects.create(
+            name='Riverside Clinic', facility_type='Clinic', address='1 River Road',
+            district='North', province='Central',
+        )
+        cls.patient = Patient.objects.create(
+            id='PG0000001', first_name='Thandiwe', last_name='Mokoena', date_of_birth=date(1990, 5, 1),
+            gender='F', address='2 Hill Street', facility=cls.facility, registration_date=date(2024, 1, 1),
+        )
+
+    def test_every_migration_is_applied(self):
+        executor = MigrationExecutor(connection)
+        self.assertEqual(executor.migration_plan(executor.loader.graph.leaf_nodes()), [])
+
+    def test_patient_search_uses_icontains(self):
+        self.assertFalse(patient_index_available(connection))
+        matches = search_patients(Patient.objects.all(), 'mokoena riverside')
+        self.assertEqual([patient.pk for patient in matches], [self.patient.pk])
+
+    def test_iterator_streams_with_a_server_side_cursor(self):
+        self.assertEqual([patient.pk for patient in Patient.objects.iterator(chunk_size=1)], [self.patient.pk])
@@ -0,0 +1,24 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from mentalhealthiq.models import Facility
+
+
+class QueryPlanTests(TestCase):
+    """Runs on whichever backend the tests use; check_query_plans supports SQLite and PostgreSQL."""
+
+    @classmethod
+    def setUpTestData(cls):
+        Facility.objects.create(
+            name='Riverside Clinic', facility_type='Clinic', address='1 River Road',
+            district='North', province='Central',
+        )
+
+    def test_hot_query_shapes_use_an_index(self):
+        # Raises CommandError (failing the test) when a shape falls back to a full scan
+        out = StringIO()
+        call_command('check_query_plans', stdout=out)
+        self.assertIn('All query shapes use an index', out.getvalue())
+
@@ -0,0 +1,117 @@
+from datetime import date
+
+from django.test import SimpleTestCase, TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from mentalhealthiq import scoring
+from mentalhealthiq.models import (
+    Assessment,
+    AssessmentCriteria,
+    Facility,
+    Indicator,
+    IndicatorScore,
+    Patient,
+)
+
+NA = None
+
+
+class RoundingTests(SimpleTestCase):
+    """Rounding matches the evaluation screen's Math.round, not Python's round-half-even."""
+
+    def test_round_half_up(self):
+        self.assertEqual(scoring.round_half_up(37.5), 38)
+        self.assertEqual(scoring.round_half_up(36.5), 37)
+        self.assertEqual(scoring.round_half_up(2.25, 1), 2.3)
+        self.assertEqual(scoring.round_half_up(83.333), 83)
+
+    def test_criterion_score(self):
+        self.assertEqual(scoring.criterion_score(250, 3), 83)
+        # Only "not applicable" ratings: the client scores the criterion 0
+        self.assertEqual(scoring.criterion_score(None, None), 0)
+
+
+class WeightedScoresTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.facility = Facility.objects.create(
+            name='Riverside Clinic', facility_type='Clinic', address='1 River Road',
+            district='North', province='Central',
+        )
+        cls.patient = Patient.objects.create(
+            id='SC0000001', first_name='Thandiwe', last_name='Mokoena', date_of_birth=date(1990, 5, 1),
+            gender='F', address='2 Hill Street', facility=cls.facility, registration_date=date(2024, 1, 1),
+        )
+        care = AssessmentCriteria.objects.create(name='Care', category='Clinical', purpose='Assessment')
+        rights = AssessmentCriteria.objects.create(name='Rights', category='Ethical', purpose='Assessment')
+        cls.care = care
+        cls.indicators = [
+            Indicator.objects.create(criteria=care, name='Plan', weight=1),
+            Indicator.objects.create(criteria=care, name='Review', weight=2),
+            Indicator.objects.create(criteria=care, name='Consent', weight=1),
+            Indicator.objects.create(criteria=rights, name='Privacy', weight=1),
+            Indicator.objects.create(criteria=rights, name='Complaints', weight=1),
+        ]
+        # (indicator scores in the order above, expected assessment score)
+        cls.fixtures = {
+            # Care (100*1 + 75*2) / 3 = 83.3 -> 83, N/A left out; Rights 37.5 -> 38
+            'partly_na': ([100, 75, NA, 50, 25], 60.5),
+            # Care only N/A -> 0; Rights 100
+            'all_na_criterion': ([NA, NA, NA, 100, 100], 50.0),
+            # Care (0 + 50*2 + 25) / 4 = 31.25 -> 31; Rights 75 -> (31 + 75) / 2
+            'no_na': ([0, 50, 25, 75, 75], 53.0),
+        }
+        cls.assessments = {}
+        for name, (scores, _expected) in cls.fixtures.items():
+            assessment = cls.create_assessment(status='completed')
+            IndicatorScore.objects.bulk_create([
+                IndicatorScore(assessment=assessment, indicator=indicator, score=score)
+                for indicator, score in zip(cls.indicators, scores)
+            ])
+            cls.assessments[name] = assessment
+
+    @classmethod
+    def create_assessment(cls, **kwargs):
+        return Assessment.objects.create(
+            patient=cls.patient, facility=cls.facility, criteria=cls.care,
+            assessment_date=timezone.now(), **kwargs
+        )
+
+    def test_weighted_scores(self):
+        scores = scoring.weighted_scores([assessment.pk for assessment in self.assessments.values()])
+        self.assertEqual(
+            {name: scores[assessment.pk] for name, assessment in self.assessments.items()},
+            {name: expected for name, (_scores, expected) in self.fixtures.items()},
+        )
+
+    def test_recompute_chunk_stores_changed_scores_only(self):
+        scheduled = self.create_assessment(status='scheduled')
+        IndicatorScore.objects.create(assessment=scheduled, indicator=self.indicators[0], score=100)
+        ids = [assessment.pk for assessment in self.assessments.values()] + [scheduled.pk]
+
+        self.assertEqual(scoring.recompute_chunk(ids), 3)
+        stored = dict(Assessment.objects.filter(pk__in=ids).values_list('pk', 'score'))
+        for name, (_scores, expected) in self.fixtures.items():
+            self.assertEqual(stored[self.assessments[name].pk], expected)
+        # Scheduled assessments keep their score of 0
+        self.assertEqual(stored[scheduled.pk], 0)
+        self.assertEqual(scoring.recompute_chunk(ids), 0)
+
+    def test_bulk_submission_stores_not_applicable_as_null(self):
+        ratings = ['pass', 'high-partial', 'not-applicable']
+        response = APIClient().post('/api/assessments/bulk/', [{
+            'patient': self.patient.pk, 'facility': self.facility.pk, 'criteria': self.care.pk,
+            'status': 'completed', 'assessment_date': timezone.now().isoformat(),
+            'indicator_scores': [
+                # The evaluation screen sends a score of 0 with a "not-applicable" rating
+                {'indicator': indicator.pk, 'score': score, 'rating': rating}
+                for indicator, rating, score in zip(self.indicators, ratings, [100, 75, 0])
+            ],
+        }], format='json')
+        self.assertEqual(response.status_code, 201, response.content)
+        assessment = Assessment.objects.get(pk=response.json()['ids'][0])
+        self.assertIsNone(assessment.indicator_scores.get(indicator=self.indicators[2]).score)
+        # (100*1 + 75*2) / 3 = 83.3 -> 83
+        self.assertEqual(assessment.score, 83.0)
@@ -0,0 +1,65 @@
+from datetime import date, timedelta
+
+from django.contrib import admin
+from django.test import TestCase
+from django.utils import timezone
+
+from mentalhealthiq.models import (
+    Assessment,
+    AssessmentCriteria,
+    Facility,
+    Indicator,
+    IndicatorScore,
+    Patient,
+)
+
+
+class TouchParentTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        facility = Facility.objects.create(
+            name='Riverside Clinic', facility_type='Clinic', address='1 River Road',
+            district='North', province='Central',
+        )
+        patient = Patient.objects.create(
+            id='SG0000001', first_name='Thandiwe', last_name='Mokoena', date_of_birth=date(1990, 5, 1),
+            gender='F', address='2 Hill Street', facility=facility, registration_date=date(2024, 1, 1),
+        )
+        cls.criterion = AssessmentCriteria.objects.create(name='Care', category='Clinical', purpose='Assessment')
+        cls.indicator = Indicator.objects.create(criteria=cls.criterion, name='Plan', weight=1)
+        cls.assessments = Assessment.objects.bulk_create([
+            Assessment(patient=patient, facility=facility, criteria=cls.criterion, status='completed')
+            for _ in range(5)
+        ])
+        IndicatorScore.objects.bulk_create([
+            IndicatorScore(assessment=assessment, indicator=cls.indicator, score=50)
+            for assessment in cls.assessments
+        ])
+
+    def backdate_assessments(self):
+        past = timezone.now() - timedelta(days=1)
+        Assessment.objects.update(updated_at=past)
+        return past
+
+    def test_saving_a_child_touches_its_parent(self):
+        past = self.backdate_assessments()
+        score = IndicatorScore.objects.filter(assessment=self.assessments[0]).get()
+        score.score = 75
+        score.save()
+        self.assertGreater(Assessment.objects.get(pk=self.assessments[0].pk).updated_at, past)
+
+    def test_cascade_is_one_delete_per_table(self):
+        # No per-score UPDATE of the (also deleted) parent assessments
+        with self.assertNumQueries(2):
+            self.indicator.delete()
+        self.assertFalse(IndicatorScore.objects.exists())
+
+    def test_admin_delete_touches_parents_in_one_update(self):
+        past = self.backdate_assessments()
+        model_admin = admin.site._registry[IndicatorScore]
+        scores = IndicatorScore.objects.filter(assessment__in=self.assessments[:2])
+        with self.assertNumQueries(2):
+            model_admin.delete_queryset(None, scores)
+        touched = Assessment.objects.filter(updated_at__gt=past).values_list('pk', flat=True)
+        self.assertCountEqual(touched, [assessment.pk for assessment in self.assessments[:2]])
@@ -17,7 +17,7 @@ Including another URLconf
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 from django.contrib import admin
-from . import views, auth_views, metrics_views, feedback_views, benchmark_views
+from . import views, auth_views, metrics_views, feedback_views, benchmark_views, search_views, sync_views, events_views, perf_views
 
 # Create a router and register our viewsets with it
 router = DefaultRouter()
@@ -55,5 +55,9 @@ urlpatterns = [
     path('auth/check/', auth_views.check_auth_view, name='check-auth'),
 
     # API endpoints
+    path('api/search/', search_views.unified_search_view, name='search'),
+    path('api/sync/', sync_views.sync_view, name='sync'),
+    path('api/events/', events_views.live_events_view, name='live-events'),
+    path('api/_perf/', perf_views.perf_summary_view, name='perf-summary'),
     path('api/', include(router.urls)),
 ]
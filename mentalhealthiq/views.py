@@ -2,8 +2,17 @@ from rest_framework import viewsets, filters, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import AllowAny
+from rest_framework.settings import api_settings
 from django_filters.rest_framework import DjangoFilterBackend
-from django.db.models import Avg, Count
+from django.db import transaction
+from django.db.models import Avg, Count, F, Max, Value
+from django.db.models.functions import Coalesce
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.http import http_date, quote_etag
+import hashlib
+import uuid
+from datetime import timedelta
+from django.utils import timezone
 from .models import (
     Facility,
     Patient,
@@ -13,34 +22,275 @@ from .models import (
     AssessmentCriteria,
     Indicator,
     StaffMember,
-    IndicatorScore,MetricSnapshot
+    IndicatorScore,MetricSnapshot,
+    User
 )
 from .serializers import (
     FacilitySerializer,
+    FacilityListSerializer,
     PatientSerializer,
+    PatientListSerializer,
     AssessmentSerializer,
+    AssessmentListSerializer,
     AuditSerializer,
+    AuditListSerializer,
     ReportSerializer,
     AssessmentCriteriaSerializer,
     IndicatorSerializer,
     StaffMemberSerializer,
-    IndicatorScoreSerializer
+    StaffMemberListSerializer,
+    IndicatorScoreSerializer,
+    BulkAssessmentItemSerializer
 )
-from .pagination import StandardResultsSetPagination
+from .pagination import StandardResultsSetPagination, KeysetPagination, sub_resource_response
+from .filters import PatientSearchFilter
 from django.http import JsonResponse
 from .tasks import update_facility_metrics  # make sure tasks.py is in the same Django app
+from .db_router import use_replica
+from . import scoring
 
 
-class BaseViewSet(viewsets.ModelViewSet):
+class ConditionalGetMixin:
+    """
+    ETag / Last-Modified support for list and retrieve.
+
+    The validator is a fingerprint of the filtered queryset (MAX of the
+    timestamp column plus the row count), the query string, the negotiated
+    media type and the latest change to any model listed in
+    ``conditional_dependencies`` (tables whose columns are rendered through
+    relations, e.g. ``facility_name``). A matching If-None-Match or
+    If-Modified-Since is answered with 304 before the serializer runs.
+    """
+    conditional_timestamp_field = 'updated_at'
+    conditional_dependencies = ()
+
+    def list(self, request, *args, **kwargs):
+        state = self.filter_queryset(self.get_queryset()).order_by().aggregate(
+            last_modified=Max(self.conditional_timestamp_field),
+            count=Count('pk'),
+        )
+        return self._conditional_response(
+            request, state['last_modified'], state['count'],
+            lambda: super(ConditionalGetMixin, self).list(request, *args, **kwargs),
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        last_modified = self.filter_queryset(self.get_queryset()).filter(
+            **{self.lookup_field: kwargs[lookup_url_kwarg]}
+        ).values_list(self.conditional_timestamp_field, flat=True).first()
+        return self._conditional_response(
+            request, last_modified, kwargs[lookup_url_kwarg],
+            lambda: super(ConditionalGetMixin, self).retrieve(request, *args, **kwargs),
+        )
+
+    def _conditional_response(self, request, last_modified, marker, render):
+        if last_modified is None:
+            # Empty list or unknown object: nothing to validate against
+            return render()
+
+        for model in self.conditional_dependencies:
+            dependency = model.objects.aggregate(last=Max('updated_at'))['last']
+            if dependency is not None and dependency > last_modified:
+                last_modified = dependency
+
+        fingerprint = '|'.join([
+            self.get_queryset().model._meta.label,
+            last_modified.isoformat(),
+            str(marker),
+            request.accepted_media_type or '',
+            request.GET.urlencode(),
+        ])
+        etag = quote_etag(hashlib.sha1(fingerprint.encode('utf-8')).hexdigest())
+        timestamp = int(last_modified.timestamp())
+
+        response = get_conditional_response(request._request, etag=etag, last_modified=timestamp)
+        if response is None:
+            response = render()
+            if response.status_code != 200:
+                return response
+            response['ETag'] = etag
+            response['Last-Modified'] = http_date(timestamp)
+
+        # Let browsers keep the copy but revalidate it on every use
+        patch_cache_control(response, private=True, no_cache=True)
+        patch_vary_headers(response, ['Accept'])
+        return response
+
+class AnalyticsReplicaMixin:
+    """
+    Serve read-only requests (GET, HEAD, OPTIONS) from the read replica; see
+    db_router.py. Requests that write, and reads after a write, stay on the
+    primary.
+    """
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.method not in ('GET', 'HEAD', 'OPTIONS'):
+            return super().dispatch(request, *args, **kwargs)
+        with use_replica():
+            return super().dispatch(request, *args, **kwargs)
+
+class BulkStatusMixin:
+    """
+    Set-based status transitions for scheduled work (assessments, audits).
+
+    Each action targets either the "ids" given in the body or the rows matched
+    by the usual list filters in the query string (?facility=3&status=scheduled),
+    and runs as a single UPDATE. Because update() skips save(), the actions
+    write the fields save() would have normalised and bump updated_at
+    themselves. Subclasses set ``bulk_date_field`` (the field holding when the
+    work was actually done) and may add to ``bulk_completion_updates``.
+    """
+    bulk_date_field = None
+    # Fields reset whenever a row goes back to 'scheduled' (mirrors save())
+    bulk_scheduled_resets = {}
+
+    def get_bulk_queryset(self, request):
+        ids = request.data.get('ids') if isinstance(request.data, dict) else None
+        queryset = self.queryset.all()
+        if ids is not None:
+            if not isinstance(ids, list) or not ids:
+                return None, Response({"error": "ids must be a non-empty list"},
+                                      status=status.HTTP_400_BAD_REQUEST)
+            try:
+                ids = [uuid.UUID(str(pk)) for pk in ids]
+            except ValueError:
+                return None, Response({"error": "ids must be UUIDs"},
+                                      status=status.HTTP_400_BAD_REQUEST)
+            return queryset.filter(pk__in=ids), None
+        if not any(request.query_params.get(param) for param in self.bulk_filter_params()):
+            return None, Response({"error": "Pass ids in the body or filter with query parameters"},
+                                  status=status.HTTP_400_BAD_REQUEST)
+        return self.filter_queryset(queryset), None
+
+    def bulk_filter_params(self):
+        """
+        Query parameters that narrow the rows: the filterset fields and the
+        search term. Anything else (?page=, ?format=, ?ordering=) leaves the
+        whole table selected, so it does not count as a filter.
+        """
+        filterset_class = getattr(self, 'filterset_class', None)
+        if filterset_class is not None:
+            params = list(filterset_class.base_filters)
+        else:
+            params = list(getattr(self, 'filterset_fields', None) or ())
+        if getattr(self, 'search_fields', None):
+            params.append(api_settings.SEARCH_PARAM)
+        return params
+
+    def bulk_completion_updates(self, request):
+        """Extra UPDATE values for completed rows; return a Response to reject the request."""
+        return {self.bulk_date_field: Coalesce(F(self.bulk_date_field), Value(timezone.now()))}
+
+    @action(detail=False, methods=['post'], url_path='bulk-reschedule')
+    def bulk_reschedule(self, request):
+        """
+        Shift scheduled or missed rows by days/hours and put them back on the
+        schedule. Rows whose new date would still be in the past are left
+        alone (a scheduled row in the past is overdue, see Audit.save()) and
+        counted as "skipped".
+        """
+        try:
+            offset = timedelta(days=int(request.data.get('days', 0)), hours=int(request.data.get('hours', 0)))
+        except (TypeError, ValueError):
+            return Response({"error": "days and hours must be integers"},
+                            status=status.HTTP_400_BAD_REQUEST)
+        if not offset:
+            return Response({"error": "Provide a non-zero days or hours offset"},
+                            status=status.HTTP_400_BAD_REQUEST)
+        queryset, error = self.get_bulk_queryset(request)
+        if error:
+            return error
+        now = timezone.now()
+        candidates = queryset.exclude(status='completed')
+        # scheduled_date + offset > now, written so the column stays bare
+        movable = candidates.filter(scheduled_date__gt=now - offset)
+        skipped = candidates.filter(scheduled_date__lte=now - offset).count()
+        updated = movable.update(
+            scheduled_date=F('scheduled_date') + offset,
+            status='scheduled',
+            missed_reason=None,
+            updated_at=now,
+            **self.bulk_scheduled_resets
+        )
+        return Response({"updated": updated, "skipped": skipped})
+
+    @action(detail=False, methods=['post'], url_path='bulk-mark-missed')
+    def bulk_mark_missed(self, request):
+        """Mark scheduled rows as missed, optionally recording a reason."""
+        queryset, error = self.get_bulk_queryset(request)
+        if error:
+            return error
+        values = {'status': 'missed', 'updated_at': timezone.now()}
+        if request.data.get('reason'):
+            values['missed_reason'] = request.data['reason']
+        updated = queryset.filter(status='scheduled').update(**values)
+        return Response({"updated": updated})
+
+    @action(detail=False, methods=['post'], url_path='bulk-mark-completed')
+    def bulk_mark_completed(self, request):
+        """Mark scheduled or missed rows as completed."""
+        values = self.bulk_completion_updates(request)
+        if isinstance(values, Response):
+            return values
+        queryset, error = self.get_bulk_queryset(request)
+        if error:
+            return error
+        updated = queryset.exclude(status='completed').update(
+            status='completed', updated_at=timezone.now(), **values
+        )
+        return Response({"updated": updated})
+
+class BaseViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     """Base ViewSet with common configuration"""
     pagination_class = StandardResultsSetPagination
+    keyset_pagination_class = KeysetPagination
+    # Ordering used when a client opts into keyset pagination (?pagination=keyset).
+    # Must end with a unique column and be backed by an index.
+    keyset_ordering = ('-created_at', '-id')
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
     permission_classes = [AllowAny]
+    # Compact serializer used for list requests with ?lean=true
+    list_serializer_class = None
+
+    def get_serializer_class(self):
+        if self.action == 'list' and self.list_serializer_class is not None and self.wants_lean():
+            return self.list_serializer_class
+        return super().get_serializer_class()
+
+    def get_queryset(self):
+        """
+        Load related rows for exactly the fields the serializer will render,
+        so ?fields= / ?omit= / ?lean=true also shrink the SQL.
+        """
+        queryset = super().get_queryset()
+        setup_eager_loading = getattr(self.get_serializer_class(), 'setup_eager_loading', None)
+        if setup_eager_loading is not None and getattr(self, 'request', None) is not None:
+            queryset = setup_eager_loading(queryset, set(self.get_serializer().fields))
+        return queryset
+
+    def wants_lean(self):
+        return self.request.query_params.get('lean', '').lower() in ('1', 'true', 'yes')
+
+    @property
+    def paginator(self):
+        """Use keyset pagination when the request asks for it, page numbers otherwise."""
+        if not hasattr(self, '_paginator'):
+            request = getattr(self, 'request', None)
+            if (self.keyset_pagination_class is not None and request is not None
+                    and self.keyset_pagination_class.is_requested(request)):
+                self._paginator = self.keyset_pagination_class()
+            elif self.pagination_class is None:
+                self._paginator = None
+            else:
+                self._paginator = self.pagination_class()
+        return self._paginator
 
 class FacilityViewSet(BaseViewSet):
     """API endpoints for managing facilities"""
     queryset = Facility.objects.all()
     serializer_class = FacilitySerializer
+    list_serializer_class = FacilityListSerializer
     filterset_fields = ['facility_type', 'district', 'province', 'status']
     search_fields = ['name', 'address', 'contact_name']
     ordering_fields = ['name', 'capacity', 'created_at']
@@ -50,8 +300,8 @@ class FacilityViewSet(BaseViewSet):
         """Get all staff members for a specific facility"""
         facility = self.get_object()
         staff = StaffMember.objects.filter(facility=facility)
-        serializer = StaffMemberSerializer(staff, many=True)
-        return Response(serializer.data)
+        return sub_resource_response(request, staff, StaffMemberSerializer, ('-created_at', '-id'),
+                                     self.get_serializer_context())
     
     
     @action(detail=True, methods=['get'])
@@ -59,23 +309,26 @@ class FacilityViewSet(BaseViewSet):
         """Get all patients for a specific facility"""
         facility = self.get_object()
         patients = Patient.objects.filter(facility=facility)
-        serializer = PatientSerializer(patients, many=True)
-        return Response(serializer.data)
+        return sub_resource_response(request, patients, PatientSerializer, ('-created_at', '-id'),
+                                     self.get_serializer_context())
     
     @action(detail=True, methods=['get'])
     def audits(self, request, pk=None):
         """Get all audits for a specific facility"""
         facility = self.get_object()
         audits = Audit.objects.filter(facility=facility)
-        serializer = AuditSerializer(audits, many=True)
-        return Response(serializer.data)
+        return sub_resource_response(request, audits, AuditSerializer, ('-scheduled_date', '-id'),
+                                     self.get_serializer_context())
 
 class PatientViewSet(BaseViewSet):
     """API endpoints for managing patients"""
     queryset = Patient.objects.all()
     serializer_class = PatientSerializer
+    list_serializer_class = PatientListSerializer
+    conditional_dependencies = (Facility, StaffMember)
+    filter_backends = [DjangoFilterBackend, PatientSearchFilter, filters.OrderingFilter]
     filterset_fields = ['facility', 'gender', 'status']
-    search_fields = ['first_name', 'last_name', 'national_id', 'phone']
+    search_fields = ['first_name', 'last_name', 'national_id', 'phone', 'facility__name']
     ordering_fields = ['registration_date', 'last_name', 'first_name']
     
     @action(detail=True, methods=['get'])
@@ -83,34 +336,164 @@ class PatientViewSet(BaseViewSet):
         """Get all assessments for a specific patient"""
         patient = self.get_object()
         assessments = Assessment.objects.filter(patient=patient)
-        serializer = AssessmentSerializer(assessments, many=True)
-        return Response(serializer.data)
+        return sub_resource_response(request, assessments, AssessmentSerializer, ('-scheduled_date', '-id'),
+                                     self.get_serializer_context())
 
-class AssessmentViewSet(BaseViewSet):
+class AssessmentViewSet(BulkStatusMixin, BaseViewSet):
     """API endpoints for managing assessments"""
     queryset = Assessment.objects.all()
     serializer_class = AssessmentSerializer
+    list_serializer_class = AssessmentListSerializer
+    conditional_dependencies = (Patient, Facility, AssessmentCriteria)
     filterset_fields = ['patient', 'facility', 'status']
     search_fields = ['notes']
     ordering_fields = ['assessment_date', 'created_at']
+    keyset_ordering = ('-scheduled_date', '-id')
+    bulk_max_items = 500
+    bulk_date_field = 'assessment_date'
+    bulk_scheduled_resets = {'assessment_date': None, 'criteria': None, 'evaluator': None, 'score': 0}
+
+    def bulk_completion_updates(self, request):
+        """Completed assessments need criteria; scheduled rows never have one, so take it from the body."""
+        try:
+            criteria = int(request.data.get('criteria'))
+            evaluator = request.data.get('evaluator')
+            evaluator = uuid.UUID(str(evaluator)) if evaluator else None
+        except (TypeError, ValueError):
+            return Response({"error": "criteria (an id) is required to complete assessments"},
+                            status=status.HTTP_400_BAD_REQUEST)
+        if not AssessmentCriteria.objects.filter(pk=criteria, purpose='Assessment').exists():
+            return Response({"error": "Criteria does not exist"}, status=status.HTTP_400_BAD_REQUEST)
+        if evaluator and not User.objects.filter(pk=evaluator).exists():
+            return Response({"error": "Evaluator does not exist"}, status=status.HTTP_400_BAD_REQUEST)
+        values = super().bulk_completion_updates(request)
+        values['criteria'] = Coalesce(F('criteria'), Value(criteria))
+        if evaluator:
+            values['evaluator'] = Coalesce(F('evaluator'), Value(evaluator))
+        return values
+
+    @action(detail=False, methods=['post'], url_path='bulk')
+    def bulk_create(self, request):
+        """
+        Create many assessments, each with nested indicator_scores, in one request.
+
+        Accepts a list or {"assessments": [...]}. Patients, facilities, criteria,
+        indicators and evaluators are looked up once for the whole batch and the
+        rows are written with bulk_create inside a single transaction. Invalid
+        items are reported by index and the valid ones are still saved, unless
+        ?atomic=true is passed, in which case any error saves nothing.
+        Items may carry a client-generated "id"; ids that already exist are
+        listed under "duplicates" so a client can safely retry a batch.
+        Assessments submitted with indicator_scores are scored from the
+        indicator weights (see scoring.py); a score sent with the rating
+        "not-applicable" is stored as null and left out.
+        """
+        items = request.data.get('assessments') if isinstance(request.data, dict) else request.data
+        if not isinstance(items, list) or not items:
+            return Response({"error": "Expected a non-empty list of assessments"},
+                            status=status.HTTP_400_BAD_REQUEST)
+        if len(items) > self.bulk_max_items:
+            return Response({"error": f"At most {self.bulk_max_items} assessments per request"},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        lookups = self._bulk_lookups(items)
+        context = self.get_serializer_context()
+        context['lookups'] = lookups
+
+        assessments, scores, errors, duplicates = [], [], [], []
+        seen_ids = set()
+        for index, item in enumerate(items):
+            serializer = BulkAssessmentItemSerializer(data=item, context=context)
+            if not serializer.is_valid():
+                errors.append({"index": index, "errors": serializer.errors})
+                continue
+            assessment = serializer.validated_data['assessment']
+            if assessment.pk in lookups['existing']:
+                duplicates.append({"index": index, "id": str(assessment.pk)})
+                continue
+            if assessment.pk in seen_ids:
+                errors.append({"index": index, "errors": {"id": ["Duplicate id in this request."]}})
+                continue
+            seen_ids.add(assessment.pk)
+            assessments.append(assessment)
+            scores.extend(serializer.validated_data['indicator_scores'])
+
+        atomic = request.query_params.get('atomic', '').lower() in ('true', '1', 'yes')
+        if errors and (atomic or not assessments):
+            return Response({"created": 0, "ids": [], "duplicates": duplicates, "errors": errors},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        with transaction.atomic():
+            Assessment.objects.bulk_create(assessments, batch_size=self.bulk_max_items)
+            IndicatorScore.objects.bulk_create(scores, batch_size=1000)
+            # Assessments with indicator scores get the weighted score, not the submitted one
+            scoring.recompute_chunk(list({score.assessment_id for score in scores}))
+
+        return Response({
+            "created": len(assessments),
+            "ids": [str(assessment.pk) for assessment in assessments],
+            "duplicates": duplicates,
+            "errors": errors,
+        }, status=status.HTTP_207_MULTI_STATUS if errors else status.HTTP_201_CREATED)
+
+    @staticmethod
+    def _bulk_lookups(items):
+        """Load every row a bulk submission refers to with one query per table."""
+        def collect(key, convert, nested=None):
+            values = set()
+            for item in items:
+                if not isinstance(item, dict):
+                    continue
+                sources = item.get(nested) if nested else [item]
+                for source in sources if isinstance(sources, list) else []:
+                    try:
+                        value = source.get(key) if isinstance(source, dict) else None
+                        if value not in (None, ''):
+                            values.add(convert(value))
+                    except (TypeError, ValueError, AttributeError):
+                        pass
+            return values
+
+        return {
+            'patients': dict(Patient.objects.filter(pk__in=collect('patient', str))
+                             .values_list('id', 'facility_id')),
+            'facilities': set(Facility.objects.filter(pk__in=collect('facility', int))
+                              .values_list('id', flat=True)),
+            'criteria': set(AssessmentCriteria.objects.filter(pk__in=collect('criteria', int),
+                                                              purpose='Assessment')
+                            .values_list('id', flat=True)),
+            'indicators': dict(Indicator.objects.filter(
+                pk__in=collect('indicator', int, nested='indicator_scores'))
+                .values_list('id', 'criteria_id')),
+            'evaluators': set(User.objects.filter(pk__in=collect('evaluator', uuid.UUID))
+                              .values_list('id', flat=True)),
+            'existing': set(Assessment.objects.filter(pk__in=collect('id', uuid.UUID))
+                            .values_list('id', flat=True)),
+        }
 
-class AuditViewSet(BaseViewSet):
+class AuditViewSet(BulkStatusMixin, BaseViewSet):
     """API endpoints for managing audits"""
     queryset = Audit.objects.all()
     serializer_class = AuditSerializer
+    list_serializer_class = AuditListSerializer
+    conditional_dependencies = (Facility,)
     filterset_fields = ['facility', 'status']
     search_fields = ['notes']
     ordering_fields = ['audit_date', 'created_at']
+    keyset_ordering = ('-scheduled_date', '-id')
+    bulk_date_field = 'audit_date'
 
 class StaffViewSet(BaseViewSet):
     """API endpoints for managing staff members"""
     queryset = StaffMember.objects.all()
     serializer_class = StaffMemberSerializer
+    list_serializer_class = StaffMemberListSerializer
+    conditional_dependencies = (Facility,)
     filterset_fields = ['facility', 'position', 'department', 'status']
     search_fields = ['name', 'email', 'phone']
     ordering_fields = ['name', 'join_date', 'position']
 
-class AssessmentCriteriaViewSet(viewsets.ModelViewSet):
+class AssessmentCriteriaViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     """API endpoints for managing assessment criteria"""
     queryset = AssessmentCriteria.objects.filter(purpose='Assessment')
     serializer_class = AssessmentCriteriaSerializer
@@ -126,10 +509,10 @@ class AssessmentCriteriaViewSet(viewsets.ModelViewSet):
         """Get all indicators for a specific assessment criteria"""
         criteria = self.get_object()
         indicators = Indicator.objects.filter(criteria=criteria)
-        serializer = IndicatorSerializer(indicators, many=True)
-        return Response(serializer.data)
+        return sub_resource_response(request, indicators, IndicatorSerializer, ('id',),
+                                     self.get_serializer_context())
 
-class AuditCriteriaViewSet(viewsets.ModelViewSet):
+class AuditCriteriaViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     """API endpoints for managing audit criteria"""
     queryset = AssessmentCriteria.objects.filter(purpose='Audit')
     serializer_class = AssessmentCriteriaSerializer
@@ -145,5 +528,5 @@ class AuditCriteriaViewSet(viewsets.ModelViewSet):
         """Get all indicators for a specific audit criteria"""
         criteria = self.get_object()
         indicators = Indicator.objects.filter(criteria=criteria)
-        serializer = IndicatorSerializer(indicators, many=True)
-        return Response(serializer.data) 
\ No newline at end of file
+        return sub_resource_response(request, indicators, IndicatorSerializer, ('id',),
+                                     self.get_serializer_context()) 
\ No newline at end of file
@@ -13,7 +13,7 @@ django.setup()
 from django.db import transaction
 from mentalhealthiq.models import (
     User, Facility, Patient, AssessmentCriteria, Indicator, 
-    Assessment, IndicatorScore, Audit, AuditCriteria
+    Assessment, IndicatorScore, Audit, AuditCriteria, AuditCriterionName
 )
 
 def clear_assessment_data():
@@ -201,7 +201,7 @@ def create_audits():
                     for score_data in criteria_scores:
                         AuditCriteria.objects.create(
                             audit=audit,
-                            criteria_name=score_data["criterion"].name,
+                            criterion=AuditCriterionName.intern(score_data["criterion"].name),
                             score=score_data["score"],
                             notes=score_data["notes"]
                         )
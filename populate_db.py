@@ -17,7 +17,7 @@ from django.db.utils import IntegrityError
 from mentalhealthiq.models import (
     User, PendingUser, Facility, StaffMember, StaffQualification,
     AssessmentCriteria, Indicator, Patient, Assessment, IndicatorScore,
-    Audit, AuditCriteria, Report
+    Audit, AuditCriteria, AuditCriterionName, Report
 )
 
 User = get_user_model()
@@ -509,7 +509,7 @@ def create_audits(facilities, users, count_per_facility=2):
                     criteria_score = random.randint(max(50, overall_score-20), min(100, overall_score+20))
                     AuditCriteria.objects.create(
                         audit=audit,
-                        criteria_name=criterion.name,
+                        criterion=AuditCriterionName.intern(criterion.name),
                         score=criteria_score,
                         notes=f"Notes for criterion {criterion.name} score."
                     )